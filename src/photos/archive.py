@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import datetime as dt
+import tarfile
+from collections.abc import Iterator
+from dataclasses import dataclass
+from os import utime
+from pathlib import Path, PurePosixPath
+from shutil import copyfileobj
+from tempfile import NamedTemporaryFile
+from time import monotonic
+from typing import Any, BinaryIO
+from zipfile import ZipFile, ZipInfo, is_zipfile
+
+from loguru import logger
+from utilities.pathlib import PathLike
+
+from photos.batch import BatchResult, Decision
+from photos.constants import ARCHIVE_SUFFIXES, PATH_MONTHLY, PATHS_BAD_EXIF
+from photos.headers import HeaderError, parse_header_metadata
+from photos.metadata import get_auto_destination
+from photos.monthly import MonthlyIndex
+from photos.scanner import is_supported
+from photos.takeout import TakeoutIndex
+from photos.timing import timer
+from photos.utilities import compute_path_monthly, get_path_stash, rename
+
+HEAD_SIZE = 1 << 18
+_PATHS_BAD_EXIF = tuple(p.as_posix() for p in PATHS_BAD_EXIF)
+
+
+@dataclass(frozen=True)
+class ArchiveMember:
+    """A regular file within an archive."""
+
+    archive: Path
+    name: str
+    size: int
+    mtime: float
+
+    @property
+    def path(self) -> Path:
+        """The path to the member, as if the archive were a directory."""
+        return self.archive.joinpath(self.name)
+
+
+def decide_member(
+    member: ArchiveMember,
+    head: bytes,
+    /,
+    *,
+    takeout: TakeoutIndex | None = None,
+) -> Decision:
+    """Decide whether to move or stash a member in auto mode.
+
+    Only the leading bytes of the member are parsed. Where they do not reach
+    the tags, the Takeout sidecar and the filename are still consulted.
+    """
+    path = member.path
+    try:
+        header = parse_header_metadata(
+            path,
+            head,
+            truncated=len(head) < member.size,
+        )
+    except HeaderError:
+        tags: dict[str, Any] = {}
+        created = None
+    else:
+        tags, created = header.tags, header.created
+    try:
+        pm = compute_path_monthly(
+            path,
+            tags=tags,
+            created=created,
+            takeout=TakeoutIndex(read=False) if takeout is None else takeout,
+        )
+    except Exception as error:  # noqa: BLE001
+        return Decision(path, None, stash=False, error=repr(error))
+    stash = get_path_stash(path)
+    dest = get_auto_destination(pm, stash, make=tags.get("Make"))
+    return Decision(path, dest, stash=dest == stash)
+
+
+def is_archive(path: PathLike, /) -> bool:
+    """Check if a file is a zip or tar archive."""
+    return Path(path).name.endswith(ARCHIVE_SUFFIXES)
+
+
+def is_supported_member(member: ArchiveMember, /) -> bool:
+    """Check if a member is supported."""
+    return is_supported(member.path) and not any(
+        p.endswith(f"/{member.name}") for p in _PATHS_BAD_EXIF
+    )
+
+
+def iter_members(
+    archive: PathLike,
+    /,
+) -> Iterator[tuple[ArchiveMember, BinaryIO]]:
+    """Iterate over the regular files in an archive, in their stored order.
+
+    Each file object may only be read until the next member is requested.
+    Tar archives, compressed or not, are read as a single forward stream.
+    """
+    archive = Path(archive)
+    if is_zipfile(archive):
+        with ZipFile(archive) as zip_file:
+            for info in zip_file.infolist():
+                if info.is_dir():
+                    continue
+                member = ArchiveMember(
+                    archive,
+                    info.filename,
+                    info.file_size,
+                    _get_zip_mtime(info, archive),
+                )
+                with zip_file.open(info) as file:
+                    yield member, file
+        return
+    with tarfile.open(archive, mode="r|*") as tar_file:
+        for info in tar_file:
+            if (not info.isfile()) or (
+                (file := tar_file.extractfile(info)) is None
+            ):
+                continue
+            member = ArchiveMember(archive, info.name, info.size, info.mtime)
+            with file:
+                yield member, file
+
+
+def organize_archive(
+    archive: PathLike,
+    /,
+    *,
+    report_every: float = 10.0,
+) -> BatchResult:
+    """Organize the members of a Takeout archive in auto mode.
+
+    The archive is streamed once, without being extracted. Each member is
+    decided upon from its leading bytes; only then is it extracted, straight
+    to its destination. The sidecars of a zip archive are read up front, from
+    its central directory. Those of a tar archive tend to follow their files,
+    so the members not yet dated by a sidecar are extracted to the stash, and
+    only decided upon once the rest of their album has been read.
+    """
+    archive = Path(archive)
+    takeout = TakeoutIndex(read=False)
+    preloaded = _read_zip_sidecars(archive, takeout)
+    logger.info("Organizing the members of {}", archive)
+    result = BatchResult()
+    monthly = MonthlyIndex(PATH_MONTHLY)
+    deferred: list[tuple[ArchiveMember, Path]] = []
+    album: PurePosixPath | None = None
+    start = last = monotonic()
+    try:
+        for member, file in iter_members(archive):
+            if (parent := PurePosixPath(member.name).parent) != album:
+                album = parent
+                _place_deferred(deferred, takeout, result, monthly)
+            if member.name.endswith(".json"):
+                if not preloaded:
+                    takeout.add_sidecar(member.path, file.read())
+                continue
+            if not is_supported_member(member):
+                continue
+            head = file.read(HEAD_SIZE)
+            if preloaded or (takeout.get_datetime(member.path) is not None):
+                decision = decide_member(member, head, takeout=takeout)
+                _extract(decision, member, head, file, result, monthly)
+            else:
+                _defer(member, head, file, deferred, result)
+            if (now := monotonic()) - last >= report_every:
+                last = now
+                logger.info(
+                    "{} files; {:.1f} files/s",
+                    result.total,
+                    result.total / (now - start),
+                )
+        _place_deferred(deferred, takeout, result, monthly)
+    finally:
+        for _, temp in deferred:
+            temp.unlink(missing_ok=True)
+    result.duration = monotonic() - start
+    logger.info("Finished:\n{}", result.summary())
+    return result
+
+
+def _defer(
+    member: ArchiveMember,
+    head: bytes,
+    file: BinaryIO,
+    deferred: list[tuple[ArchiveMember, Path]],
+    result: BatchResult,
+    /,
+) -> None:
+    """Extract a member beside its stash path, to be decided upon later."""
+    stash = get_path_stash(member.path)
+    try:
+        temp = _extract_beside(member, head, file, stash)
+    except OSError:
+        logger.exception("Failed to extract {} -> {}", member.path, stash)
+        result.failed += 1
+        return
+    deferred.append((member, temp))
+
+
+def _extract(
+    decision: Decision,
+    member: ArchiveMember,
+    head: bytes,
+    file: BinaryIO,
+    result: BatchResult,
+    monthly: MonthlyIndex,
+    /,
+) -> None:
+    """Extract a member to its destination, as `batch` would rename it.
+
+    The member is extracted beside its destination first, so that collisions
+    in the monthly library can be resolved by contents, as for files on disk.
+    """
+    path = member.path
+    if (dest := decision.destination) is None:
+        logger.error("Failed to process {}: {}", path, decision.error)
+        result.failed += 1
+        return
+    if decision.stash and dest.exists():
+        logger.warning("Skipping {} -> {}", path, dest)
+        result.skipped += 1
+        return
+    try:
+        temp = _extract_beside(member, head, file, dest)
+    except OSError:
+        logger.exception("Failed to extract {} -> {}", path, dest)
+        result.failed += 1
+        return
+    _place(decision, member, temp, result, monthly)
+
+
+def _extract_beside(
+    member: ArchiveMember,
+    head: bytes,
+    file: BinaryIO,
+    dest: Path,
+    /,
+) -> Path:
+    """Extract a member to a hidden file in the directory of `dest`."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    with timer("extract"), NamedTemporaryFile(
+        dir=dest.parent,
+        prefix=".",
+        suffix=dest.suffix,
+        delete=False,
+    ) as out:
+        temp = Path(out.name)
+        try:
+            _ = out.write(head)
+            copyfileobj(file, out)
+        except BaseException:
+            temp.unlink(missing_ok=True)
+            raise
+    utime(temp, (member.mtime, member.mtime))
+    return temp
+
+
+def _get_zip_mtime(info: ZipInfo, archive: Path, /) -> float:
+    """Get the mtime of a zip member, or else that of its archive."""
+    try:
+        date = dt.datetime(*info.date_time)  # noqa: DTZ001
+    except ValueError:
+        return archive.stat().st_mtime
+    return date.timestamp()
+
+
+def _place(
+    decision: Decision,
+    member: ArchiveMember,
+    temp: Path,
+    result: BatchResult,
+    monthly: MonthlyIndex,
+    /,
+) -> None:
+    """Rename an extracted member to its destination; `temp` is consumed."""
+    path = member.path
+    if (dest := decision.destination) is None:
+        logger.error("Failed to process {}: {}", path, decision.error)
+        result.failed += 1
+        temp.unlink(missing_ok=True)
+        return
+    try:
+        present = False
+        if not decision.stash:
+            dest, present = monthly.resolve(temp, dest)
+        if present or dest.exists():
+            logger.warning("Skipping {} -> {}", path, dest)
+            result.skipped += 1
+            return
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        rename(temp, dest)
+    except OSError:
+        logger.exception("Failed to rename {} -> {}", path, dest)
+        result.failed += 1
+        return
+    finally:
+        temp.unlink(missing_ok=True)
+    if decision.stash:
+        result.stashed += 1
+    else:
+        monthly.add(dest)
+        result.moved += 1
+
+
+def _place_deferred(
+    deferred: list[tuple[ArchiveMember, Path]],
+    takeout: TakeoutIndex,
+    result: BatchResult,
+    monthly: MonthlyIndex,
+    /,
+) -> None:
+    """Decide upon the deferred members, and then place them."""
+    for member, temp in deferred:
+        try:
+            with temp.open(mode="rb") as file:
+                head = file.read(HEAD_SIZE)
+        except OSError:
+            logger.exception("Failed to read {}", member.path)
+            result.failed += 1
+            temp.unlink(missing_ok=True)
+            continue
+        decision = decide_member(member, head, takeout=takeout)
+        _place(decision, member, temp, result, monthly)
+    deferred.clear()
+
+
+def _read_zip_sidecars(archive: Path, takeout: TakeoutIndex, /) -> bool:
+    """Read the sidecars of a zip archive; return whether it is one."""
+    if not is_zipfile(archive):
+        return False
+    with ZipFile(archive) as zip_file:
+        for info in zip_file.infolist():
+            if info.filename.endswith(".json"):
+                takeout.add_sidecar(
+                    archive.joinpath(info.filename),
+                    zip_file.read(info),
+                )
+    return True
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing import Pool
+from pathlib import Path
+from time import monotonic
+
+from loguru import logger
+from tabulate import tabulate
+from utilities.pathlib import PathLike
+
+from photos.constants import PATH_CAMERA_UPLOADS, PATH_MONTHLY
+from photos.metadata import Metadata
+from photos.monthly import MonthlyIndex
+from photos.timing import TIMINGS, Histogram
+from photos.utilities import (
+    purge_empty_directories,
+    purge_empty_parents,
+    rename,
+)
+from photos.work_queue import WorkQueue
+
+
+@dataclass(frozen=True)
+class Decision:
+    """The decision made in auto mode for a single file."""
+
+    path: Path
+    destination: Path | None
+    stash: bool
+    error: str | None = None
+
+
+@dataclass
+class BatchResult:
+    """The result of a batch run."""
+
+    moved: int = 0
+    stashed: int = 0
+    deleted: int = 0
+    skipped: int = 0
+    failed: int = 0
+    duration: float = 0.0
+
+    @property
+    def total(self) -> int:
+        """The total number of files processed."""
+        return (
+            self.moved
+            + self.stashed
+            + self.deleted
+            + self.skipped
+            + self.failed
+        )
+
+    @property
+    def throughput(self) -> float:
+        """The number of files processed per second."""
+        return self.total / self.duration if self.duration > 0 else 0.0
+
+    def summary(self) -> str:
+        """A table of the counts, duration and throughput."""
+        return tabulate(
+            [
+                ("moved", self.moved),
+                ("stashed", self.stashed),
+                ("deleted", self.deleted),
+                ("skipped", self.skipped),
+                ("failed", self.failed),
+                ("duration", f"{self.duration:.1f}s"),
+                ("throughput", f"{self.throughput:.1f} files/s"),
+            ],
+        )
+
+
+def decide(path: PathLike, /) -> Decision:
+    """Decide whether to move or stash a file in auto mode."""
+    path = Path(path)
+    try:
+        metadata = Metadata(path, headers_only=True)
+        dest = metadata.auto_destination
+    except Exception as error:  # noqa: BLE001
+        return Decision(path, None, stash=False, error=repr(error))
+    return Decision(path, dest, stash=dest == metadata.path_stash)
+
+
+def _decide_timed(path: Path, /) -> tuple[Decision, dict[str, Histogram]]:
+    """Decide upon a file in a worker, taking the timings it recorded."""
+    decision = decide(path)
+    return decision, TIMINGS.take()
+
+
+def organize_auto(
+    dir_: PathLike = PATH_CAMERA_UPLOADS,
+    /,
+    *,
+    workers: int | None = None,
+    chunksize: int = 16,
+    report_every: float = 10.0,
+    purge_all: bool = True,
+) -> BatchResult:
+    """Organize a directory in auto mode, without any interaction.
+
+    The metadata is extracted, and the decisions made, in a process pool. The
+    renames are then applied by this process alone, in order of completion;
+    the timings recorded by the workers are merged into this process's.
+
+    Upon finishing, the empty directories under `dir_` are purged; if
+    `purge_all` is unset, then only those vacated by this run.
+    """
+    dir_ = Path(dir_)
+    paths = list(WorkQueue(dir_))
+    logger.info("Organizing {} files in {}", len(paths), dir_)
+    result = BatchResult()
+    monthly = MonthlyIndex(PATH_MONTHLY)
+    vacated: set[Path] = set()
+    start = last = monotonic()
+    with Pool(processes=workers) as pool:
+        for decision, timings in pool.imap_unordered(
+            _decide_timed,
+            paths,
+            chunksize=chunksize,
+        ):
+            TIMINGS.merge(timings)
+            if _apply(decision, result, monthly):
+                vacated.add(decision.path.parent)
+            if (now := monotonic()) - last >= report_every:
+                last = now
+                logger.info(
+                    "{}/{} files; {:.1f} files/s",
+                    result.total,
+                    len(paths),
+                    result.total / (now - start),
+                )
+    result.duration = monotonic() - start
+    if purge_all:
+        purge_empty_directories(dir_)
+    else:
+        purge_empty_parents(vacated, root=dir_)
+    logger.info("Finished:\n{}", result.summary())
+    return result
+
+
+def _apply(
+    decision: Decision,
+    result: BatchResult,
+    monthly: MonthlyIndex,
+    /,
+) -> bool:
+    """Apply a decision; return whether the file was renamed.
+
+    Moves into the monthly library have their collisions resolved, and are
+    skipped if an identical file is already in place; stashes are skipped if
+    their destination is taken.
+    """
+    path = decision.path
+    if (dest := decision.destination) is None:
+        logger.error("Failed to process {}: {}", path, decision.error)
+        result.failed += 1
+        return False
+    present = False
+    if not decision.stash:
+        dest, present = monthly.resolve(path, dest)
+    if present or not path.exists() or (decision.stash and dest.exists()):
+        logger.warning("Skipping {} -> {}", path, dest)
+        result.skipped += 1
+        return False
+    try:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        rename(path, dest)
+    except OSError:
+        logger.exception("Failed to rename {} -> {}", path, dest)
+        result.failed += 1
+        return False
+    if decision.stash:
+        result.stashed += 1
+    else:
+        monthly.add(dest)
+        result.moved += 1
+    return True
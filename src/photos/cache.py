@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import pickle
+from collections.abc import Callable
+from functools import cache
+from os import getpid, stat_result
+from pathlib import Path
+from sqlite3 import connect
+from threading import Lock
+from typing import Any, TypeVar
+
+from utilities.pathlib import PathLike
+
+from photos.constants import PATH_METADATA_CACHE
+
+_T = TypeVar("_T")
+
+
+class MetadataCache:
+    """A persistent cache of metadata, keyed by path, size and mtime.
+
+    Entries are invalidated automatically whenever the size or modification
+    time of their file changes.
+    """
+
+    __slots__ = ("_path", "_conn", "_lock")
+
+    def __init__(self, path: PathLike, /) -> None:
+        super().__init__()
+        self._path = path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = connect(
+            path,
+            timeout=60.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        _ = self._conn.execute("PRAGMA journal_mode=WAL")
+        _ = self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS metadata (
+                path TEXT NOT NULL,
+                field TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                value BLOB NOT NULL,
+                PRIMARY KEY (path, field)
+            )
+            """,
+        )
+        self._lock = Lock()
+
+    # properties
+
+    @property
+    def path(self) -> Path:
+        """The path to the database."""
+        return self._path
+
+    # methods
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+    def get(
+        self,
+        path: PathLike,
+        field: str,
+        /,
+        *,
+        stat: stat_result | None = None,
+    ) -> Any:
+        """Get a value; raise KeyError if it is missing or stale."""
+        path = Path(path)
+        stat = path.stat() if stat is None else stat
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, value FROM metadata "
+                "WHERE path = ? AND field = ?",
+                (path.as_posix(), field),
+            ).fetchone()
+        if row is None:
+            raise KeyError(path, field)
+        size, mtime_ns, value = row
+        if (size, mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            raise KeyError(path, field)
+        return pickle.loads(value)
+
+    def get_or_compute(
+        self,
+        path: PathLike,
+        field: str,
+        func: Callable[[], _T],
+        /,
+        *,
+        stat: stat_result | None = None,
+    ) -> _T:
+        """Get a value, computing and storing it if it is missing or stale.
+
+        Files which do not exist are computed but never stored.
+        """
+        path = Path(path)
+        try:
+            stat = path.stat() if stat is None else stat
+        except FileNotFoundError:
+            return func()
+        try:
+            return self.get(path, field, stat=stat)
+        except KeyError:
+            value = func()
+            self.put(path, field, value, stat=stat)
+            return value
+
+    def put(
+        self,
+        path: PathLike,
+        field: str,
+        value: Any,
+        /,
+        *,
+        stat: stat_result | None = None,
+    ) -> None:
+        """Set a value."""
+        path = Path(path)
+        stat = path.stat() if stat is None else stat
+        with self._lock:
+            _ = self._conn.execute(
+                "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?)",
+                (
+                    path.as_posix(),
+                    field,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    pickle.dumps(value),
+                ),
+            )
+
+
+def get_metadata_cache() -> MetadataCache:
+    """Get the metadata cache for the current process."""
+    return _get_metadata_cache(PATH_METADATA_CACHE, getpid())
+
+
+@cache
+def _get_metadata_cache(path: Path, _: int, /) -> MetadataCache:
+    return MetadataCache(path)
@@ -1,33 +1,41 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from contextlib import suppress
-from dataclasses import dataclass
+from dataclasses import InitVar, dataclass
 from enum import Enum, unique
+from functools import partial
 from pathlib import Path
 from typing import Any
 
-from boltons.fileutils import atomic_rename
 from humanize import naturalsize
-from IPython.display import display
 from loguru import logger
+from PIL.Image import Image as PILImage
 from tabulate import tabulate
 from utilities.pathlib import PathLike
 from utilities.typing import never
 
-from photos.constants import PATH_CAMERA_UPLOADS
+from photos.catalog import Catalog, CatalogEntry, get_catalog
+from photos.constants import (
+    PATH_CAMERA_UPLOADS,
+    PATH_JOURNAL,
+    PATH_MONTHLY,
+    PATH_TIMINGS,
+)
+from photos.display import Display, get_display
+from photos.duplicates import DuplicateIndex
+from photos.file_ops import FileOp, FileOpExecutor
+from photos.journal import Journal, JournalEntry, compact_journal
+from photos.metadata import Metadata
+from photos.monthly import MonthlyIndex
+from photos.prefetch import Prefetcher
+from photos.timing import TIMINGS, timer
 from photos.utilities import (
-    get_file_size,
-    get_parsed_exif_tags,
     get_path_monthly,
-    get_path_stash,
-    get_paths_randomly,
-    get_resolution,
-    is_supported,
-    make_thumbnail,
-    open_image_pillow,
     purge_empty_directories,
+    purge_empty_parents,
 )
+from photos.work_queue import EmptyWorkQueueError, WorkQueue
 
 
 @unique
@@ -48,17 +56,54 @@ class _Choice(Enum):
 class Organizer:
     """Base class for the organizer."""
 
-    __slots__ = ("_dir", "_data", "_rotate", "_skips")
+    __slots__ = (
+        "_catalog",
+        "_dir",
+        "_data",
+        "_display",
+        "_duplicates",
+        "_file_ops",
+        "_journal",
+        "_monthly",
+        "_prefetch",
+        "_prefetcher",
+        "_queue",
+        "_rotate",
+        "_rotations",
+        "_skips",
+    )
 
     def __init__(self) -> None:
         super().__init__()
+        self._catalog: Catalog | None = None
         self._dir: Path | None = None
         self._data: _Data | None = None
+        self._display: Display | None = None
+        self._duplicates: DuplicateIndex | None = None
+        self._file_ops: FileOpExecutor | None = None
+        self._journal: Journal | None = None
+        self._monthly: MonthlyIndex | None = None
+        self._prefetch: int = 0
+        self._prefetcher: Prefetcher | None = None
+        self._queue: WorkQueue | None = None
         self._rotate: int = 0
+        self._rotations: dict[Path, int] = {}
         self._skips: set[Path] = set()
 
     # properties
 
+    @property
+    def catalog(self) -> Catalog:
+        """The catalog of the monthly library."""
+        if (catalog := self._catalog) is None:
+            msg = f"{self._catalog=}"
+            raise AttributeError(msg)
+        return catalog
+
+    @catalog.setter
+    def catalog(self, value: Catalog, /) -> None:
+        self._catalog = value
+
     @property
     def data(self) -> _Data:
         """The data."""
@@ -83,6 +128,90 @@ class Organizer:
     def dir_(self, value: Path, /) -> None:
         self._dir = Path(value)
 
+    @property
+    def display(self) -> Display:
+        """The display backend."""
+        if (display := self._display) is None:
+            msg = f"{self._display=}"
+            raise AttributeError(msg)
+        return display
+
+    @display.setter
+    def display(self, value: Display, /) -> None:
+        self._display = value
+
+    @property
+    def duplicates(self) -> DuplicateIndex:
+        """The index of the library, for finding duplicates."""
+        if (duplicates := self._duplicates) is None:
+            msg = f"{self._duplicates=}"
+            raise AttributeError(msg)
+        return duplicates
+
+    @duplicates.setter
+    def duplicates(self, value: DuplicateIndex, /) -> None:
+        self._duplicates = value
+
+    @property
+    def file_ops(self) -> FileOpExecutor:
+        """The executor of the file operations."""
+        if (file_ops := self._file_ops) is None:
+            msg = f"{self._file_ops=}"
+            raise AttributeError(msg)
+        return file_ops
+
+    @file_ops.setter
+    def file_ops(self, value: FileOpExecutor, /) -> None:
+        self._file_ops = value
+
+    @property
+    def journal(self) -> Journal:
+        """The journal of the session."""
+        if (journal := self._journal) is None:
+            msg = f"{self._journal=}"
+            raise AttributeError(msg)
+        return journal
+
+    @journal.setter
+    def journal(self, value: Journal, /) -> None:
+        self._journal = value
+
+    @property
+    def monthly(self) -> MonthlyIndex:
+        """The index of the monthly library."""
+        if (monthly := self._monthly) is None:
+            msg = f"{self._monthly=}"
+            raise AttributeError(msg)
+        return monthly
+
+    @monthly.setter
+    def monthly(self, value: MonthlyIndex, /) -> None:
+        self._monthly = value
+
+    @property
+    def prefetcher(self) -> Prefetcher:
+        """The prefetcher."""
+        if (prefetcher := self._prefetcher) is None:
+            msg = f"{self._prefetcher=}"
+            raise AttributeError(msg)
+        return prefetcher
+
+    @prefetcher.setter
+    def prefetcher(self, value: Prefetcher, /) -> None:
+        self._prefetcher = value
+
+    @property
+    def queue(self) -> WorkQueue:
+        """The work queue."""
+        if (queue := self._queue) is None:
+            msg = f"{self._queue=}"
+            raise AttributeError(msg)
+        return queue
+
+    @queue.setter
+    def queue(self, value: WorkQueue, /) -> None:
+        self._queue = value
+
     @property
     def rotate(self) -> int:
         """Rotate the image."""
@@ -105,41 +234,123 @@ class Organizer:
 
     # methods
 
-    def start(self, dir_: PathLike = PATH_CAMERA_UPLOADS, /) -> None:
-        """Start the organizer."""
+    def start(
+        self,
+        dir_: PathLike = PATH_CAMERA_UPLOADS,
+        /,
+        *,
+        prefetch: int = 4,
+        journal: PathLike = PATH_JOURNAL,
+        resume: bool = True,
+        timings: PathLike = PATH_TIMINGS,
+        display: Display | None = None,
+        catalog: Catalog | None = None,
+        purge_all: bool = True,
+    ) -> None:
+        """Start the organizer.
+
+        The next `prefetch` files are loaded in the background whilst the
+        current file is on screen. Moves, stashes and deletes are performed in
+        the background too; any failures are reported as they arise.
+
+        Every action is recorded in `journal`. If `resume` is set, then the
+        journal is first replayed: skipped files stay skipped, rotations are
+        restored, and operations interrupted by a crash are performed again.
+
+        Upon finishing, the time spent in each stage is reported, and dumped
+        to `timings` as JSON.
+
+        Thumbnails are shown with `display`; by default, a backend is detected
+        from the environment. Moved files are recorded in `catalog`, which by
+        default is the catalog of the monthly library.
+
+        Upon finishing, the empty directories under `dir_` are purged; if
+        `purge_all` is unset, then only those vacated in this session.
+        """
+        TIMINGS.clear()
+        self.display = get_display() if display is None else display
+        self.catalog = get_catalog() if catalog is None else catalog
         self.dir_ = Path(dir_)
+        if not resume:
+            Path(journal).unlink(missing_ok=True)
+        state = compact_journal(journal)
+        self.skips.update(state.skips)
+        self._rotations = state.rotations
+        self.journal = Journal(journal)
+        if self._duplicates is None:
+            self.duplicates = DuplicateIndex.from_library()
+        if self._monthly is None:
+            self.monthly = MonthlyIndex(PATH_MONTHLY)
+        self._prefetch = prefetch
+        self.prefetcher = Prefetcher()
+        self.file_ops = FileOpExecutor()
+        self._resume(state.pending)
+        with timer("scan"):
+            self.queue = WorkQueue(
+                self.dir_,
+                exclude=self.skips | {op.path for op in state.pending},
+            )
+        try:
+            self._loop()
+        finally:
+            self.prefetcher.close()
+            self.file_ops.close()
+            self._report_file_op_failures()
+            self.journal.close()
+        self._purge(purge_all=purge_all)
+        logger.info("\n\nTimings (ms):\n{}\n\n", TIMINGS.summary())
+        TIMINGS.dump(timings)
+
+    def _loop(self) -> None:
         while True:
             try:
                 self._get_next_data()
             except _NoNextFileError:
-                break
-            else:
-                if self._loop_choices() is _Choice.quit_:
-                    break
-        purge_empty_directories(self.dir_)
+                return
+            if self._loop_choices() is _Choice.quit_:
+                return
+
+    def _purge(self, *, purge_all: bool) -> None:
+        if purge_all:
+            purge_empty_directories(self.dir_)
+        else:
+            purge_empty_parents(self.queue.vacated, root=self.dir_)
+
+    def _resume(self, pending: Iterable[FileOp], /) -> None:
+        for op in pending:
+            try:
+                size = op.path.stat().st_size
+            except FileNotFoundError:
+                continue
+            self._submit(op, size=size)
 
     def _choice_auto(self) -> _Choice:
         while True:
             data = self.data
-            dt_data = data.path_monthly
             try:
-                if (dt_data is not None and dt_data.source == "EXIF") or (
-                    data.tags.get("Make") == "Apple"
-                ):
-                    self._choice_move()
+                if data.duplicate is not None:
+                    self._choice_delete(overview=False)
+                elif data.metadata.auto_destination == data.path_stash:
+                    self._choice_stash(overview=False)
                 else:
-                    self._choice_stash()
+                    self._choice_move(overview=False)
             except _NoNextFileError:
                 return _Choice.quit_
 
-    def _choice_delete(self) -> None:
-        path = self.data.path
-        logger.info("\n\nDeleting:\n{}\n\n", tabulate([("path", path)]))
-        path.unlink()
-        self._get_next_data()
+    def _choice_delete(self, *, overview: bool = True) -> None:
+        path = (data := self.data).path
+        logger.info(
+            "\n\nDeleting:\n{}\n\n",
+            tabulate([("path", path), ("duplicate of", data.duplicate)]),
+        )
+        self._submit(FileOp("delete", path, data.duplicate))
+        self.queue.discard(path)
+        self._get_next_data(overview=overview)
 
     def _choice_overview(self) -> None:
-        _ = display(make_thumbnail(self.data.image.rotate(self._rotate)))
+        thumbnail = self.data.metadata.get_thumbnail(rotate=self._rotate)
+        with timer("display"):
+            self.display.show(thumbnail)
 
         def yield_metadata() -> Iterator[tuple[str, Any]]:
             data = self.data
@@ -151,50 +362,66 @@ class Organizer:
             yield "datetime", data.datetime
             yield "source", data.source
             yield "destination", data.destination
+            yield "duplicate of", data.duplicate
 
         logger.info("Metadata:\n{}", tabulate(yield_metadata()))
+        if (duplicate := self.data.duplicate) is not None:
+            logger.info("Duplicate of {}; delete with 'd'", duplicate)
 
-    def _choice_move(self) -> None:
+    def _choice_move(self, *, overview: bool = True) -> None:
         if (dest := (data := self.data).destination) is None:
             msg = "Cannot call 'MOVE' when destination is missing"
             raise RuntimeError(msg)
+        if data.present:
+            # an identical file is already in place; a move would collide
+            self._choice_delete(overview=overview)
+            return
         path = data.path
         logger.info(
             "\n\nMoving:\n{}\n\n",
             tabulate([("from", path), ("destination", dest)]),
         )
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        atomic_rename(path, dest)
-        self._get_next_data()
+        self._submit(
+            FileOp("move", path, dest),
+            size=data.metadata.file_size,
+            metadata=data.metadata,
+        )
+        self.queue.discard(path)
+        self._get_next_data(overview=overview)
 
-    def _choice_rotate_180(self) -> None:
-        self.rotate = 180
+    def _choice_rotate(self, angle: int, /) -> None:
+        self.rotate = angle
+        self.journal.append(
+            JournalEntry("rotate", self.data.path, rotate=self.rotate),
+        )
         self._choice_overview()
 
+    def _choice_rotate_180(self) -> None:
+        self._choice_rotate(180)
+
     def _choice_rotate_clockwise(self) -> None:
-        self.rotate = -90
-        self._choice_overview()
+        self._choice_rotate(-90)
 
     def _choice_rotate_anticlockwise(self) -> None:
-        self.rotate = 90
-        self._choice_overview()
+        self._choice_rotate(90)
 
     def _choice_skip(self) -> None:
         path = self.data.path
         logger.info("\n\nSkipping:\n{}\n\n", tabulate([("path", path)]))
-        self.skips.add(path := self.data.path)
+        self.skips.add(path)
+        self.journal.append(JournalEntry("skip", path))
         self._get_next_data()
 
-    def _choice_stash(self) -> None:
+    def _choice_stash(self, *, overview: bool = True) -> None:
         path = (data := self.data).path
         dest = data.path_stash
         logger.info(
             "\n\nStashing:\n{}\n\n",
             tabulate([("path", path), ("destination", dest)]),
         )
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        atomic_rename(path, dest)
-        self._get_next_data()
+        self._submit(FileOp("stash", path, dest), size=data.metadata.file_size)
+        self.queue.discard(path)
+        self._get_next_data(overview=overview)
 
     def _choice_tags(self) -> None:
         logger.info("Tags:\n{}", tabulate(self.data.tags.items()))
@@ -212,19 +439,68 @@ class Organizer:
             with suppress(KeyError):
                 return _Choice[choices[input("> ").strip()]]
 
-    def _get_next_data(self) -> None:
+    def _get_next_data(self, *, overview: bool = True) -> None:
+        self._report_file_op_failures()
         try:
-            path = next(
-                p
-                for p in get_paths_randomly(self.dir_)
-                if p.is_file() and is_supported(p) and p not in self.skips
-            )
-        except StopIteration:
+            path = self.queue.pop()
+        except EmptyWorkQueueError:
             logger.info("No more files found in {}", self.dir_)
             raise _NoNextFileError from None
         else:
-            self.data = _Data(path)
-            self._choice_overview()
+            self.data = _Data(
+                path,
+                duplicate=self.duplicates.find(path),
+                prefetched=self.prefetcher.get(path),
+                monthly=self.monthly,
+            )
+            self._rotate = self._rotations.pop(path, 0)
+            self.prefetcher.prefetch(
+                self.queue.peek(self._prefetch),
+                thumbnail=overview,
+            )
+            if overview:
+                self._choice_overview()
+
+    def _complete(self, op: FileOp, metadata: Metadata | None, /) -> None:
+        if (op.kind == "move") and ((dest := op.destination) is not None):
+            self.catalog.add(
+                CatalogEntry.from_path(dest)
+                if metadata is None
+                else CatalogEntry.from_metadata(metadata, path=dest),
+            )
+        self.journal.append(JournalEntry("done", op.path))
+
+    def _submit(
+        self,
+        op: FileOp,
+        /,
+        *,
+        size: int | None = None,
+        metadata: Metadata | None = None,
+    ) -> None:
+        self.journal.append(
+            JournalEntry(op.kind, op.path, destination=op.destination),
+        )
+        # catalogued and journalled by the executor, once it has succeeded
+        on_success = partial(self._complete, op, metadata)
+        _ = self.file_ops.submit(op, on_success=on_success)
+        if (op.kind == "delete") or ((dest := op.destination) is None):
+            return
+        if op.kind == "move":
+            self.monthly.add(dest)
+        self.duplicates.add(dest, size=size)
+
+    def _report_file_op_failures(self) -> None:
+        if len(failures := self.file_ops.pop_failures()) >= 1:
+            for failure in failures:
+                self.journal.append(JournalEntry("failed", failure.op.path))
+            logger.error(
+                "\n\nFailed:\n{}\n\n",
+                tabulate(
+                    (f.op.kind, f.op.path, f.op.destination, f.error)
+                    for f in failures
+                ),
+            )
 
     def _loop_choices(self) -> _Choice:  # noqa: C901
         while True:
@@ -261,19 +537,29 @@ class _NoNextFileError(FileNotFoundError):
 @dataclass
 class _Data:
     path: Path
-
-    def __post_init__(self) -> None:
-        self.image = image = open_image_pillow(path := self.path)
-        self.file_size = naturalsize(get_file_size(path))
-        self.resolution = get_resolution(image)
-        self.tags = get_parsed_exif_tags(image)
-        if (tags := self.tags) is None:
-            self.make = None
-            self.model = None
-        else:
-            self.make = tags.get("Make")
-            self.model = tags.get("Model")
-        self.path_monthly = get_path_monthly(path, image=image)
+    duplicate: Path | None = None
+    prefetched: InitVar[Metadata | None] = None
+    monthly: InitVar[MonthlyIndex | None] = None
+
+    def __post_init__(
+        self,
+        prefetched: Metadata | None,
+        monthly: MonthlyIndex | None,
+    ) -> None:
+        self.metadata = metadata = (
+            Metadata(self.path) if prefetched is None else prefetched
+        )
+        self.file_size = naturalsize(metadata.file_size)
+        self.resolution = metadata.resolution
+        fast_tags = metadata.fast_tags
+        self.make = fast_tags.get("Make")
+        self.model = fast_tags.get("Model")
+        self.path_monthly = get_path_monthly(
+            self.path,
+            tags=fast_tags,
+            header=metadata.header,
+        )
+        self.present = False
         if (pm := self.path_monthly) is None:
             self.datetime = None
             self.source = None
@@ -282,7 +568,24 @@ class _Data:
             self.datetime = pm.datetime
             self.source = pm.source
             self.destination = pm.destination
-        self.path_stash = get_path_stash(path)
+            if monthly is not None:
+                self.destination, self.present = monthly.resolve(
+                    self.path,
+                    pm.destination,
+                )
+                if self.present and (self.duplicate is None):
+                    self.duplicate = self.destination
+        self.path_stash = metadata.path_stash
+
+    @property
+    def image(self) -> PILImage:
+        """The image, decoded upon first access."""
+        return self.metadata.pixels
+
+    @property
+    def tags(self) -> dict[str, Any]:
+        """All the tags, parsed upon first access."""
+        return self.metadata.tags
 
 
 ORGANIZER = Organizer()
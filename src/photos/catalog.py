@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import datetime as dt
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from functools import cache
+from os import getpid
+from pathlib import Path
+from sqlite3 import connect
+from threading import Lock
+from typing import Any
+
+from loguru import logger
+from utilities.datetime import UTC
+from utilities.pathlib import PathLike
+
+from photos.constants import PATH_CATALOG, PATH_MONTHLY
+from photos.duplicates import get_full_hash, get_partial_hash
+from photos.metadata import Metadata
+from photos.scanner import scan
+
+_BATCH_SIZE = 1000  # entries added per transaction when building
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """An entry in the catalog."""
+
+    path: Path
+    size: int
+    mtime_ns: int
+    datetime: dt.datetime | None
+    source: str | None
+    make: str | None
+    model: str | None
+    width: int
+    height: int
+    partial_hash: str
+    full_hash: str
+
+    @classmethod
+    def from_metadata(
+        cls,
+        metadata: Metadata,
+        /,
+        *,
+        path: PathLike | None = None,
+    ) -> CatalogEntry:
+        """Make an entry from the metadata of a file.
+
+        The entry may be recorded under another `path`, for a file which has
+        been moved there; the file is then read from there, and only its
+        monthly path is taken from `metadata`.
+        """
+        pm = metadata.path_monthly
+        if path is not None:
+            metadata = Metadata(Path(path))
+        stat, tags = metadata.stat, metadata.tags
+        width, height = metadata.resolution
+        return cls(
+            metadata.path,
+            stat.st_size,
+            stat.st_mtime_ns,
+            None if pm is None else pm.datetime,
+            None if pm is None else pm.source,
+            tags.get("Make"),
+            tags.get("Model"),
+            width,
+            height,
+            get_partial_hash(metadata.path),
+            get_full_hash(metadata.path),
+        )
+
+    @classmethod
+    def from_path(cls, path: PathLike, /) -> CatalogEntry:
+        """Make an entry from a file."""
+        return cls.from_metadata(Metadata(Path(path)))
+
+
+class Catalog:
+    """A queryable catalog of the monthly library, backed by SQLite.
+
+    Dates and cameras are indexed, so that queries need not visit every row.
+    """
+
+    __slots__ = ("_path", "_conn", "_lock")
+
+    def __init__(self, path: PathLike = PATH_CATALOG, /) -> None:
+        super().__init__()
+        self._path = path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = connect(
+            path,
+            timeout=60.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        _ = self._conn.execute("PRAGMA journal_mode=WAL")
+        _ = self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS photos (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                datetime TEXT,
+                source TEXT,
+                make TEXT,
+                model TEXT,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                partial_hash TEXT NOT NULL,
+                full_hash TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS photos_datetime ON photos (datetime);
+            CREATE INDEX IF NOT EXISTS photos_make
+                ON photos (make, datetime);
+            CREATE INDEX IF NOT EXISTS photos_make_model
+                ON photos (make, model, datetime);
+            CREATE INDEX IF NOT EXISTS photos_full_hash ON photos (full_hash);
+            """,
+        )
+        self._lock = Lock()
+
+    def __contains__(self, path: PathLike, /) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM photos WHERE path = ?",
+                (Path(path).as_posix(),),
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM photos",
+            ).fetchone()
+        return count
+
+    # properties
+
+    @property
+    def path(self) -> Path:
+        """The path to the database."""
+        return self._path
+
+    # methods
+
+    def add(self, entry: CatalogEntry, /) -> None:
+        """Add an entry, replacing any under the same path."""
+        self.add_many([entry])
+
+    def add_many(self, entries: Iterable[CatalogEntry], /) -> None:
+        """Add many entries, in a single transaction."""
+        rows = list(map(_to_row, entries))
+        with self._lock:
+            _ = self._conn.execute("BEGIN")
+            try:
+                _ = self._conn.executemany(
+                    f"INSERT OR REPLACE INTO photos VALUES ({_PLACEHOLDERS})",
+                    rows,
+                )
+            except BaseException:
+                _ = self._conn.execute("ROLLBACK")
+                raise
+            _ = self._conn.execute("COMMIT")
+
+    def backfill(
+        self,
+        root: PathLike = PATH_MONTHLY,
+        /,
+        *,
+        workers: int | None = None,
+        chunksize: int = 16,
+    ) -> int:
+        """Catalog the files under a directory, in a process pool.
+
+        Files which are already catalogued, with the same size and
+        modification time, are skipped; entries for files which no longer
+        exist are removed. Return the number of files added.
+        """
+        root = Path(root)
+        with self._lock:
+            known = {
+                Path(p): (s, m)
+                for p, s, m in self._conn.execute(
+                    "SELECT path, size, mtime_ns FROM photos",
+                )
+            }
+        found = {e.path: (e.size, e.mtime_ns) for e in scan(root)}
+        for path in known.keys() - found.keys():
+            if path.is_relative_to(root):
+                self.discard(path)
+        paths = [p for p, key in found.items() if known.get(p) != key]
+        logger.info("Cataloguing {} files in {}", len(paths), root)
+        added = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batch: list[CatalogEntry] = []
+            for entry in pool.map(_try_from_path, paths, chunksize=chunksize):
+                if entry is not None:
+                    batch.append(entry)
+                if len(batch) >= _BATCH_SIZE:
+                    self.add_many(batch)
+                    added += len(batch)
+                    batch.clear()
+            self.add_many(batch)
+            added += len(batch)
+        return added
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+    def discard(self, path: PathLike, /) -> None:
+        """Remove an entry."""
+        with self._lock:
+            _ = self._conn.execute(
+                "DELETE FROM photos WHERE path = ?",
+                (Path(path).as_posix(),),
+            )
+
+    def get(self, path: PathLike, /) -> CatalogEntry:
+        """Get an entry; raise KeyError if it is missing."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM photos WHERE path = ?",
+                (Path(path).as_posix(),),
+            ).fetchone()
+        if row is None:
+            raise KeyError(path)
+        return _from_row(row)
+
+    def query(
+        self,
+        *,
+        start: dt.datetime | None = None,
+        end: dt.datetime | None = None,
+        make: str | None = None,
+        model: str | None = None,
+    ) -> list[CatalogEntry]:
+        """Query the entries, in order of datetime.
+
+        The datetime range is half-open; a model is only matched together
+        with its make.
+        """
+        clauses: list[str] = []
+        params: list[str] = []
+        if make is not None:
+            clauses.append("make = ?")
+            params.append(make)
+            if model is not None:
+                clauses.append("model = ?")
+                params.append(model)
+        if start is not None:
+            clauses.append("datetime >= ?")
+            params.append(_to_text(start))
+        if end is not None:
+            clauses.append("datetime < ?")
+            params.append(_to_text(end))
+        where = " AND ".join(clauses) if len(clauses) >= 1 else "1"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM photos WHERE {where} ORDER BY datetime",
+                params,
+            ).fetchall()
+        return list(map(_from_row, rows))
+
+
+_PLACEHOLDERS = ", ".join("?" for _ in fields(CatalogEntry))
+
+
+def get_catalog() -> Catalog:
+    """Get the catalog of this process."""
+    return _get_catalog(PATH_CATALOG, getpid())
+
+
+@cache
+def _get_catalog(path: Path, _pid: int, /) -> Catalog:
+    return Catalog(path)
+
+
+def _from_row(row: tuple[Any, ...], /) -> CatalogEntry:
+    path, size, mtime_ns, datetime, *rest = row
+    return CatalogEntry(
+        Path(path),
+        size,
+        mtime_ns,
+        None if datetime is None else dt.datetime.fromisoformat(datetime),
+        *rest,
+    )
+
+
+def _to_row(entry: CatalogEntry, /) -> tuple[Any, ...]:
+    datetime = entry.datetime
+    return (
+        entry.path.as_posix(),
+        entry.size,
+        entry.mtime_ns,
+        None if datetime is None else _to_text(datetime),
+        entry.source,
+        entry.make,
+        entry.model,
+        entry.width,
+        entry.height,
+        entry.partial_hash,
+        entry.full_hash,
+    )
+
+
+def _to_text(datetime: dt.datetime, /) -> str:
+    return datetime.astimezone(UTC).isoformat()
+
+
+def _try_from_path(path: Path, /) -> CatalogEntry | None:
+    try:
+        return CatalogEntry.from_path(path)
+    except Exception:
+        logger.exception("Failed to catalog {}", path)
+        return None
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from collections.abc import Sequence
+from pathlib import Path
+
+from photos import __version__
+from photos.constants import (
+    ARCHIVE_SUFFIXES,
+    PATH_CAMERA_UPLOADS,
+    PATH_JOURNAL,
+)
+
+_DISPLAYS = ["auto", "ipython", "kitty", "sixel", "none"]
+
+
+def main(argv: Sequence[str] | None = None, /) -> int:
+    """Run the command line interface.
+
+    The heavy modules are only imported once a command has been parsed, so
+    that `--help` and `--version` return at once.
+    """
+    parser = _get_parser()
+    args = parser.parse_args(argv)
+    if (args.command == "organize") and _is_archive(args.dir):
+        parser.error("archives can only be organized in auto mode")
+    if args.command == "organize":
+        from photos.camera_uploads import Organizer
+        from photos.display import get_display
+
+        Organizer().start(
+            args.dir,
+            prefetch=args.prefetch,
+            journal=args.journal,
+            resume=not args.fresh,
+            display=get_display(args.display),
+        )
+        return 0
+    if _is_archive(args.dir):
+        from photos.archive import organize_archive
+
+        result = organize_archive(args.dir)
+    else:
+        from photos.batch import organize_auto
+
+        result = organize_auto(args.dir, workers=args.workers)
+    return int(result.failed >= 1)
+
+
+def _get_parser() -> ArgumentParser:
+    parser = ArgumentParser(prog="photos", description="Organize photos.")
+    _ = parser.add_argument(
+        "--version",
+        action="version",
+        version=f"%(prog)s {__version__}",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    organize = commands.add_parser("organize", help="organize interactively")
+    _ = organize.add_argument(
+        "dir",
+        nargs="?",
+        default=PATH_CAMERA_UPLOADS,
+        type=Path,
+    )
+    _ = organize.add_argument(
+        "--display",
+        choices=_DISPLAYS,
+        default="auto",
+        help="the backend for showing thumbnails",
+    )
+    _ = organize.add_argument("--prefetch", default=4, type=int)
+    _ = organize.add_argument("--journal", default=PATH_JOURNAL, type=Path)
+    _ = organize.add_argument(
+        "--fresh",
+        action="store_true",
+        help="discard the journal of the previous session",
+    )
+    auto = commands.add_parser(
+        "auto",
+        help="organize in auto mode; a Takeout archive is streamed",
+    )
+    _ = auto.add_argument(
+        "dir",
+        nargs="?",
+        default=PATH_CAMERA_UPLOADS,
+        type=Path,
+    )
+    _ = auto.add_argument("--workers", default=None, type=int)
+    return parser
+
+
+def _is_archive(path: Path, /) -> bool:
+    return path.is_file() and path.name.endswith(ARCHIVE_SUFFIXES)
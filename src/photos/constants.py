@@ -1,503 +1,24 @@
-import datetime as dt
 from pathlib import Path
+from typing import Any
 
-from photos.types import FractionOrZero
-
-EXIF_TAGS_PILLOW = {
-    "Artist": str,
-    "Copyright": str,
-    "CustomRendered": int,
-    "DateTime": dt.datetime,
-    "ExifOffset": int,
-    "ExposureMode": int,
-    "GPSInfo": int,
-    "HostComputer": str,
-    "ImageDescription": str,
-    "ImageLength": int,
-    "ImageWidth": int,
-    "Make": str,
-    "Model": str,
-    "Orientation": int,
-    "PrintImageMatching": bytes,
-    "RelatedImageLength": int,
-    "RelatedImageWidth": int,
-    "ResolutionUnit": int,
-    "Software": str,
-    "TileLength": int,
-    "TileWidth": int,
-    "XResolution": float,
-    "YCbCrPositioning": int,
-    "YCbCrSubSampling": list[int],
-    "YResolution": float,
-}
-EXIF_TAGS_PYEXVI2 = {
-    "Exif.Canon.AFAreaHeights": list[int],
-    "Exif.Canon.AFAreaMode": int,
-    "Exif.Canon.AFAreaWidths": list[int],
-    "Exif.Canon.AFCanonImageHeight": int,
-    "Exif.Canon.AFCanonImageWidth": int,
-    "Exif.Canon.AFImageHeight": int,
-    "Exif.Canon.AFImageWidth": int,
-    "Exif.Canon.AFInfo": list[int],
-    "Exif.Canon.AFInfoSize": int,
-    "Exif.Canon.AFMicroAdj": list[int],
-    "Exif.Canon.AFNumPoints": int,
-    "Exif.Canon.AFPointsInFocus": int,
-    "Exif.Canon.AFPointsSelected": int,
-    "Exif.Canon.AFPointsUnusable": int,
-    "Exif.Canon.AFValidPoints": int,
-    "Exif.Canon.AFXPositions": list[int],
-    "Exif.Canon.AFYPositions": list[int],
-    "Exif.Canon.AspectInfo": list[int],
-    "Exif.Canon.CameraInfo": list[int],
-    "Exif.Canon.ColorData": list[int],
-    "Exif.Canon.ColorSpace": int,
-    "Exif.Canon.ContrastInfo": list[int],
-    "Exif.Canon.CustomFunctions": list[int],
-    "Exif.Canon.CustomPictureStyleFileName": str,
-    "Exif.Canon.DateStampMode": int,
-    "Exif.Canon.DustRemovalData": list[int],
-    "Exif.Canon.FaceDetect1": list[int],
-    "Exif.Canon.FaceDetect2": list[int],
-    "Exif.Canon.FileNumber": int,
-    "Exif.Canon.FirmwareRevision": int,
-    "Exif.Canon.FirmwareVersion": str,
-    "Exif.Canon.FocalLength": list[int],
-    "Exif.Canon.ImageType": str,
-    "Exif.Canon.ImageUniqueID": list[int],
-    "Exif.Canon.InternalSerialNumber": str,
-    "Exif.Canon.LensModel": str,
-    "Exif.Canon.LightingOpt": list[int],
-    "Exif.Canon.MeasuredColor": list[int],
-    "Exif.Canon.ModelID": int,
-    "Exif.Canon.MyColors": list[int],
-    "Exif.Canon.OriginalDecisionDataOffset": int,
-    "Exif.Canon.OwnerName": str,
-    "Exif.Canon.PictureStyleUserDef": list[int],
-    "Exif.Canon.SensorInfo": list[int],
-    "Exif.Canon.SerialNumber": int,
-    "Exif.Canon.SerialNumberFormat": int,
-    "Exif.Canon.ThumbnailImageValidArea": list[int],
-    "Exif.Canon.VRDOffset": int,
-    "Exif.Canon.VignettingCorr": list[int],
-    "Exif.Canon.VignettingCorr2": list[int],
-    "Exif.CanonCs.AESetting": int,
-    "Exif.CanonCs.AFPoint": int,
-    "Exif.CanonCs.ColorTone": int,
-    "Exif.CanonCs.Contrast": int,
-    "Exif.CanonCs.DigitalZoom": int,
-    "Exif.CanonCs.DisplayAperture": int,
-    "Exif.CanonCs.DriveMode": int,
-    "Exif.CanonCs.EasyMode": int,
-    "Exif.CanonCs.ExposureProgram": int,
-    "Exif.CanonCs.FlashActivity": int,
-    "Exif.CanonCs.FlashDetails": int,
-    "Exif.CanonCs.FlashMode": int,
-    "Exif.CanonCs.FocusContinuous": int,
-    "Exif.CanonCs.FocusMode": int,
-    "Exif.CanonCs.FocusType": int,
-    "Exif.CanonCs.ISOSpeed": int,
-    "Exif.CanonCs.ImageSize": int,
-    "Exif.CanonCs.ImageStabilization": int,
-    "Exif.CanonCs.Lens": list[int],
-    "Exif.CanonCs.LensType": int,
-    "Exif.CanonCs.Macro": int,
-    "Exif.CanonCs.ManualFlashOutput": int,
-    "Exif.CanonCs.MaxAperture": int,
-    "Exif.CanonCs.MeteringMode": int,
-    "Exif.CanonCs.MinAperture": int,
-    "Exif.CanonCs.PhotoEffect": int,
-    "Exif.CanonCs.Quality": int,
-    "Exif.CanonCs.RecordMode": int,
-    "Exif.CanonCs.SRAWQuality": int,
-    "Exif.CanonCs.Saturation": int,
-    "Exif.CanonCs.Selftimer": int,
-    "Exif.CanonCs.Sharpness": int,
-    "Exif.CanonCs.SpotMeteringMode": int,
-    "Exif.CanonCs.ZoomSourceWidth": int,
-    "Exif.CanonCs.ZoomTargetWidth": int,
-    "Exif.CanonFi.BracketMode": int,
-    "Exif.CanonFi.BracketShotNumber": int,
-    "Exif.CanonFi.BracketValue": int,
-    "Exif.CanonFi.FileNumber": int,
-    "Exif.CanonFi.FilterEffect": int,
-    "Exif.CanonFi.FlashExposureLock": int,
-    "Exif.CanonFi.FocusDistanceLower": int,
-    "Exif.CanonFi.FocusDistanceUpper": int,
-    "Exif.CanonFi.LiveViewShooting": int,
-    "Exif.CanonFi.MacroMagnification": int,
-    "Exif.CanonFi.NoiseReduction": int,
-    "Exif.CanonFi.RawJpgQuality": int,
-    "Exif.CanonFi.RawJpgSize": int,
-    "Exif.CanonFi.ToningEffect": int,
-    "Exif.CanonFi.WBBracketMode": int,
-    "Exif.CanonFi.WBBracketValueAB": int,
-    "Exif.CanonFi.WBBracketValueGM": int,
-    "Exif.CanonPi.AFPointsUsed": int,
-    "Exif.CanonPi.AFPointsUsed20D": int,
-    "Exif.CanonPi.ImageHeight": int,
-    "Exif.CanonPi.ImageHeightAsShot": int,
-    "Exif.CanonPi.ImageWidth": int,
-    "Exif.CanonPi.ImageWidthAsShot": int,
-    "Exif.CanonPr.ColorTemperature": int,
-    "Exif.CanonPr.DigitalGain": int,
-    "Exif.CanonPr.PictureStyle": int,
-    "Exif.CanonPr.SensorBlueLevel": int,
-    "Exif.CanonPr.SensorRedLevel": int,
-    "Exif.CanonPr.Sharpness": int,
-    "Exif.CanonPr.SharpnessFrequency": int,
-    "Exif.CanonPr.ToneCurve": int,
-    "Exif.CanonPr.WBShiftAB": int,
-    "Exif.CanonPr.WBShiftGM": int,
-    "Exif.CanonPr.WhiteBalance": int,
-    "Exif.CanonPr.WhiteBalanceBlue": int,
-    "Exif.CanonPr.WhiteBalanceRed": int,
-    "Exif.CanonSi.AFPointUsed": int,
-    "Exif.CanonSi.ApertureValue": int,
-    "Exif.CanonSi.AutoExposureBracketing": int,
-    "Exif.CanonSi.AutoISO": int,
-    "Exif.CanonSi.AutoRotate": int,
-    "Exif.CanonSi.BulbDuration": int,
-    "Exif.CanonSi.CameraTemperature": int,
-    "Exif.CanonSi.CameraType": int,
-    "Exif.CanonSi.FlashBias": int,
-    "Exif.CanonSi.FlashGuideNumber": int,
-    "Exif.CanonSi.ISOSpeed": int,
-    "Exif.CanonSi.MeasuredEV": int,
-    "Exif.CanonSi.MeasuredEV2": int,
-    "Exif.CanonSi.Sequence": int,
-    "Exif.CanonSi.ShutterSpeedValue": int,
-    "Exif.CanonSi.SlowShutter": int,
-    "Exif.CanonSi.SubjectDistance": int,
-    "Exif.CanonSi.TargetAperture": int,
-    "Exif.CanonSi.TargetShutterSpeed": int,
-    "Exif.CanonSi.WhiteBalance": int,
-    "Exif.Casio2.AFMode": int,
-    "Exif.Casio2.AFPointPosition": list[int],
-    "Exif.Casio2.ArtMode": int,
-    "Exif.Casio2.AutoISO": int,
-    "Exif.Casio2.BestShotMode": int,
-    "Exif.Casio2.ColorFilter": int,
-    "Exif.Casio2.ColorMode": int,
-    "Exif.Casio2.Contrast2": list[int],
-    "Exif.Casio2.Enhancement": int,
-    "Exif.Casio2.FirmwareDate": str,
-    "Exif.Casio2.FlashDistance": int,
-    "Exif.Casio2.FocusMode2": int,
-    "Exif.Casio2.HometownCity": str,
-    "Exif.Casio2.ISO": int,
-    "Exif.Casio2.ImageStabilization": int,
-    "Exif.Casio2.ObjectDistance": int,
-    "Exif.Casio2.PreviewImageLength": int,
-    "Exif.Casio2.PreviewImageSize": list[int],
-    "Exif.Casio2.PreviewImageStart": int,
-    "Exif.Casio2.Quality": int,
-    "Exif.Casio2.RecordMode": int,
-    "Exif.Casio2.ReleaseMode": int,
-    "Exif.Casio2.Saturation2": list[int],
-    "Exif.Casio2.SequenceNumber": int,
-    "Exif.Casio2.Sharpness2": list[int],
-    "Exif.Casio2.WhiteBalance2": int,
-    "Exif.Casio2.WhiteBalanceBias": list[int],
-    "Exif.GPSInfo.GPSAltitude": FractionOrZero,
-    "Exif.GPSInfo.GPSAltitudeRef": FractionOrZero,
-    "Exif.GPSInfo.GPSAreaInformation": str,
-    "Exif.GPSInfo.GPSDOP": FractionOrZero,
-    "Exif.GPSInfo.GPSDateStamp": dt.date,
-    "Exif.GPSInfo.GPSDestBearing": FractionOrZero,
-    "Exif.GPSInfo.GPSDestBearingRef": str,
-    "Exif.GPSInfo.GPSHPositioningError": FractionOrZero,
-    "Exif.GPSInfo.GPSImgDirection": FractionOrZero,
-    "Exif.GPSInfo.GPSImgDirectionRef": str,
-    "Exif.GPSInfo.GPSLatitude": list[FractionOrZero],
-    "Exif.GPSInfo.GPSLatitudeRef": str,
-    "Exif.GPSInfo.GPSLongitude": list[FractionOrZero],
-    "Exif.GPSInfo.GPSLongitudeRef": str,
-    "Exif.GPSInfo.GPSMapDatum": str,
-    "Exif.GPSInfo.GPSMeasureMode": int,
-    "Exif.GPSInfo.GPSProcessingMethod": str,
-    "Exif.GPSInfo.GPSSatellites": list[int],
-    "Exif.GPSInfo.GPSSpeed": FractionOrZero,
-    "Exif.GPSInfo.GPSSpeedRef": str,
-    "Exif.GPSInfo.GPSStatus": str,
-    "Exif.GPSInfo.GPSTimeStamp": list[FractionOrZero],
-    "Exif.GPSInfo.GPSTrack": FractionOrZero,
-    "Exif.GPSInfo.GPSTrackRef": str,
-    "Exif.GPSInfo.GPSVersionID": list[int],
-    "Exif.Image.Artist": str,
-    "Exif.Image.BitsPerSample": list[int],
-    "Exif.Image.Copyright": str,
-    "Exif.Image.DateTime": dt.datetime,
-    "Exif.Image.ExifTag": int,
-    "Exif.Image.GPSTag": int,
-    "Exif.Image.HostComputer": str,
-    "Exif.Image.ImageDescription": str,
-    "Exif.Image.ImageLength": int,
-    "Exif.Image.ImageWidth": int,
-    "Exif.Image.Make": str,
-    "Exif.Image.Model": str,
-    "Exif.Image.Orientation": int,
-    "Exif.Image.PhotometricInterpretation": int,
-    "Exif.Image.PrintImageMatching": list[int],
-    "Exif.Image.ResolutionUnit": int,
-    "Exif.Image.SamplesPerPixel": int,
-    "Exif.Image.Software": str,
-    "Exif.Image.TileLength": int,
-    "Exif.Image.TileWidth": int,
-    "Exif.Image.XResolution": FractionOrZero,
-    "Exif.Image.YCbCrPositioning": int,
-    "Exif.Image.YCbCrSubSampling": list[int],
-    "Exif.Image.YResolution": FractionOrZero,
-    "Exif.Iop.InteroperabilityIndex": str,
-    "Exif.Iop.InteroperabilityVersion": list[int],
-    "Exif.Iop.RelatedImageLength": int,
-    "Exif.Iop.RelatedImageWidth": int,
-    "Exif.MakerNote.ByteOrder": str,
-    "Exif.MakerNote.Offset": int,
-    "Exif.Nikon3.ActiveDLighting": int,
-    "Exif.Nikon3.AuxiliaryLens": str,
-    "Exif.Nikon3.ColorBalance": list[int],
-    "Exif.Nikon3.ColorMode": str,
-    "Exif.Nikon3.DigitalZoom": FractionOrZero,
-    "Exif.Nikon3.ExposureBracketComp": FractionOrZero,
-    "Exif.Nikon3.FlashBracketComp": list[int],
-    "Exif.Nikon3.FlashExposureComp": list[int],
-    "Exif.Nikon3.FlashInfo": list[int],
-    "Exif.Nikon3.FlashMode": int,
-    "Exif.Nikon3.FlashSetting": str,
-    "Exif.Nikon3.Focus": str,
-    "Exif.Nikon3.FocusDistance": FractionOrZero,
-    "Exif.Nikon3.HighISONoiseReduction": int,
-    "Exif.Nikon3.ISOSelection": str,
-    "Exif.Nikon3.ISOSpeed": list[int],
-    "Exif.Nikon3.ImageAdjustment": str,
-    "Exif.Nikon3.ImageProcessing": str,
-    "Exif.Nikon3.ImageStabilization": str,
-    "Exif.Nikon3.NoiseReduction": str,
-    "Exif.Nikon3.Quality": str,
-    "Exif.Nikon3.RetouchHistory": list[int],
-    "Exif.Nikon3.Saturation": str | list[str],
-    "Exif.Nikon3.SceneAssist": str,
-    "Exif.Nikon3.SceneMode": str,
-    "Exif.Nikon3.Sharpening": str,
-    "Exif.Nikon3.ShotInfo": list[int],
-    "Exif.Nikon3.ToneComp": str,
-    "Exif.Nikon3.Version": list[int],
-    "Exif.Nikon3.WB_RBLevels": list[FractionOrZero],
-    "Exif.Nikon3.WhiteBalance": str,
-    "Exif.Nikon3.WhiteBalanceBias": list[int],
-    "Exif.NikonAf.AFAreaMode": int,
-    "Exif.NikonAf.AFPoint": int,
-    "Exif.NikonAf.AFPointsInFocus": int,
-    "Exif.NikonCb1.Version": list[int],
-    "Exif.NikonCb1.WB_RBGGLevels": list[int],
-    "Exif.NikonIi.ISO": int,
-    "Exif.NikonIi.ISO2": int,
-    "Exif.NikonIi.ISOExpansion": int,
-    "Exif.NikonIi.ISOExpansion2": int,
-    "Exif.Olympus.BWMode": int,
-    "Exif.Olympus.CameraID": list[int],
-    "Exif.Olympus.CameraType": str,
-    "Exif.Olympus.DataDump1": list[int],
-    "Exif.Olympus.DigitalZoom": FractionOrZero,
-    "Exif.Olympus.FocalPlaneDiagonal": FractionOrZero,
-    "Exif.Olympus.LensDistortionParams": list[int],
-    "Exif.Olympus.Macro": int,
-    "Exif.Olympus.OneTouchWB": int,
-    "Exif.Olympus.PictureInfo": str,
-    "Exif.Olympus.PreCaptureFrames": int,
-    "Exif.Olympus.Quality": int,
-    "Exif.Olympus.SpecialMode": list[int],
-    "Exif.Olympus.WhiteBalanceBias": int,
-    "Exif.Olympus.WhiteBalanceBracket": int,
-    "Exif.Olympus.WhiteBoard": int,
-    "Exif.Panasonic.AFAssistLamp": int,
-    "Exif.Panasonic.AFMode": list[int],
-    "Exif.Panasonic.AFPointPosition": list[FractionOrZero],
-    "Exif.Panasonic.AccelerometerX": int,
-    "Exif.Panasonic.AccelerometerY": int,
-    "Exif.Panasonic.AccelerometerZ": int,
-    "Exif.Panasonic.AdvancedSceneType": int,
-    "Exif.Panasonic.Audio": int,
-    "Exif.Panasonic.BabyAge1": dt.datetime,
-    "Exif.Panasonic.BabyAge2": dt.datetime,
-    "Exif.Panasonic.BabyName": list[int],
-    "Exif.Panasonic.BurstMode": int,
-    "Exif.Panasonic.BurstSpeed": int,
-    "Exif.Panasonic.City": list[int],
-    "Exif.Panasonic.City2": list[int],
-    "Exif.Panasonic.ClearRetouch": int,
-    "Exif.Panasonic.ClearRetouchValue": FractionOrZero,
-    "Exif.Panasonic.ColorEffect": int,
-    "Exif.Panasonic.ColorMode": int,
-    "Exif.Panasonic.Contrast": int,
-    "Exif.Panasonic.ConversionLens": int,
-    "Exif.Panasonic.Country": list[int],
-    "Exif.Panasonic.DataDump": list[int],
-    "Exif.Panasonic.ExifVersion": list[int],
-    "Exif.Panasonic.FaceDetInfo": list[int],
-    "Exif.Panasonic.FaceRecInfo": list[int],
-    "Exif.Panasonic.FacesDetected": int,
-    "Exif.Panasonic.FirmwareVersion": list[int],
-    "Exif.Panasonic.FlashBias": int,
-    "Exif.Panasonic.FlashFired": int,
-    "Exif.Panasonic.FlashWarning": int,
-    "Exif.Panasonic.FocusMode": int,
-    "Exif.Panasonic.ImageStabilization": int,
-    "Exif.Panasonic.IntelligentExposure": int,
-    "Exif.Panasonic.IntelligentResolution": int,
-    "Exif.Panasonic.InternalNDFilter": FractionOrZero,
-    "Exif.Panasonic.InternalSerialNumber": list[int],
-    "Exif.Panasonic.Landmark": list[int],
-    "Exif.Panasonic.Location": list[int],
-    "Exif.Panasonic.Macro": int,
-    "Exif.Panasonic.MakerNoteVersion": list[int],
-    "Exif.Panasonic.ManometerPressure": int,
-    "Exif.Panasonic.NoiseReduction": int,
-    "Exif.Panasonic.OpticalZoomMode": int,
-    "Exif.Panasonic.PanoramaFieldOfView": int,
-    "Exif.Panasonic.ProgramISO": int,
-    "Exif.Panasonic.Quality": int,
-    "Exif.Panasonic.Rotation": int,
-    "Exif.Panasonic.SceneMode": int,
-    "Exif.Panasonic.SelfTimer": int,
-    "Exif.Panasonic.SequenceNumber": int,
-    "Exif.Panasonic.ShootingMode": int,
-    "Exif.Panasonic.State": list[int],
-    "Exif.Panasonic.SweepPanoramaDirection": int,
-    "Exif.Panasonic.TextStamp1": int,
-    "Exif.Panasonic.TextStamp2": int,
-    "Exif.Panasonic.TextStamp3": int,
-    "Exif.Panasonic.TextStamp4": int,
-    "Exif.Panasonic.TimeSincePowerOn": int,
-    "Exif.Panasonic.TimerRecording": int,
-    "Exif.Panasonic.Title": list[int],
-    "Exif.Panasonic.Transform1": list[int],
-    "Exif.Panasonic.Transform2": list[int],
-    "Exif.Panasonic.TravelDay": int,
-    "Exif.Panasonic.WBBlueLevel": int,
-    "Exif.Panasonic.WBGreenLevel": int,
-    "Exif.Panasonic.WBRedLevel": int,
-    "Exif.Panasonic.WhiteBalance": int,
-    "Exif.Panasonic.WhiteBalanceBias": int,
-    "Exif.Panasonic.WorldTimeLocation": int,
-    "Exif.Pentax.AFPoint": int,
-    "Exif.Pentax.AFPointInFocus": int,
-    "Exif.Pentax.BlueBalance": int,
-    "Exif.Pentax.CameraInfo": list[int],
-    "Exif.Pentax.Contrast": int,
-    "Exif.Pentax.DSPFirmwareVersion": list[int],
-    "Exif.Pentax.Date": list[int],
-    "Exif.Pentax.Destination": int,
-    "Exif.Pentax.DestinationDST": int,
-    "Exif.Pentax.DigitalZoom": int,
-    "Exif.Pentax.ExposureCompensation": int,
-    "Exif.Pentax.ExposureTime": int,
-    "Exif.Pentax.FNumber": int,
-    "Exif.Pentax.Flash": int,
-    "Exif.Pentax.FocalLength": int,
-    "Exif.Pentax.Focus": int,
-    "Exif.Pentax.Hometown": int,
-    "Exif.Pentax.HometownDST": int,
-    "Exif.Pentax.ISO": int,
-    "Exif.Pentax.ImageProcessing": list[int],
-    "Exif.Pentax.Location": int,
-    "Exif.Pentax.MeteringMode": int,
-    "Exif.Pentax.Mode": int,
-    "Exif.Pentax.ModelID": int,
-    "Exif.Pentax.PreviewLength": int,
-    "Exif.Pentax.PreviewOffset": int,
-    "Exif.Pentax.PreviewResolution": list[int],
-    "Exif.Pentax.Quality": int,
-    "Exif.Pentax.RedBalance": int,
-    "Exif.Pentax.Saturation": int,
-    "Exif.Pentax.Sharpness": int,
-    "Exif.Pentax.Size": int,
-    "Exif.Pentax.Time": list[int],
-    "Exif.Pentax.WhiteBalance": int,
-    "Exif.Pentax.WhiteBalanceMode": int,
-    "Exif.Photo.ApertureValue": FractionOrZero,
-    "Exif.Photo.BodySerialNumber": int,
-    "Exif.Photo.BrightnessValue": FractionOrZero,
-    "Exif.Photo.CFAPattern": list[int],
-    "Exif.Photo.ColorSpace": int,
-    "Exif.Photo.ComponentsConfiguration": list[int],
-    "Exif.Photo.CompositeImage": int,
-    "Exif.Photo.CompressedBitsPerPixel": FractionOrZero,
-    "Exif.Photo.Contrast": int,
-    "Exif.Photo.CustomRendered": int,
-    "Exif.Photo.DateTimeDigitized": dt.datetime,
-    "Exif.Photo.DateTimeOriginal": dt.datetime,
-    "Exif.Photo.DigitalZoomRatio": FractionOrZero,
-    "Exif.Photo.ExifVersion": list[int],
-    "Exif.Photo.ExposureBiasValue": FractionOrZero,
-    "Exif.Photo.ExposureMode": int,
-    "Exif.Photo.ExposureProgram": int,
-    "Exif.Photo.ExposureTime": FractionOrZero,
-    "Exif.Photo.FNumber": FractionOrZero,
-    "Exif.Photo.FileSource": int,
-    "Exif.Photo.Flash": int,
-    "Exif.Photo.FlashpixVersion": list[int],
-    "Exif.Photo.FocalLength": FractionOrZero,
-    "Exif.Photo.FocalLengthIn35mmFilm": int,
-    "Exif.Photo.FocalPlaneResolutionUnit": int,
-    "Exif.Photo.FocalPlaneXResolution": FractionOrZero,
-    "Exif.Photo.FocalPlaneYResolution": FractionOrZero,
-    "Exif.Photo.GainControl": int,
-    "Exif.Photo.ISOSpeedRatings": int,
-    "Exif.Photo.ImageUniqueID": str,
-    "Exif.Photo.InteroperabilityTag": int,
-    "Exif.Photo.LensMake": str,
-    "Exif.Photo.LensModel": str,
-    "Exif.Photo.LensSerialNumber": int,
-    "Exif.Photo.LensSpecification": list[FractionOrZero],
-    "Exif.Photo.LightSource": int,
-    "Exif.Photo.MakerNote": list[int],
-    "Exif.Photo.MaxApertureValue": FractionOrZero,
-    "Exif.Photo.MeteringMode": int,
-    "Exif.Photo.OffsetTime": str,
-    "Exif.Photo.OffsetTimeDigitized": str,
-    "Exif.Photo.OffsetTimeOriginal": str,
-    "Exif.Photo.PixelXDimension": int,
-    "Exif.Photo.PixelYDimension": int,
-    "Exif.Photo.RecommendedExposureIndex": int,
-    "Exif.Photo.Saturation": int,
-    "Exif.Photo.SceneCaptureType": int,
-    "Exif.Photo.SceneType": int,
-    "Exif.Photo.SensingMethod": int,
-    "Exif.Photo.SensitivityType": int,
-    "Exif.Photo.Sharpness": int,
-    "Exif.Photo.ShutterSpeedValue": FractionOrZero,
-    "Exif.Photo.SourceExposureTimesOfCompositeImage": list[int],
-    "Exif.Photo.SourceImageNumberOfCompositeImage": list[int],
-    "Exif.Photo.SubSecTime": int,
-    "Exif.Photo.SubSecTimeDigitized": int,
-    "Exif.Photo.SubSecTimeOriginal": int,
-    "Exif.Photo.SubjectArea": list[int],
-    "Exif.Photo.SubjectDistance": FractionOrZero,
-    "Exif.Photo.SubjectDistanceRange": int,
-    "Exif.Photo.UserComment": str,
-    "Exif.Photo.WhiteBalance": int,
-    "Exif.Thumbnail.Compression": int,
-    "Exif.Thumbnail.JPEGInterchangeFormat": int,
-    "Exif.Thumbnail.JPEGInterchangeFormatLength": int,
-    "Exif.Thumbnail.Orientation": int,
-    "Exif.Thumbnail.ResolutionUnit": int,
-    "Exif.Thumbnail.XResolution": FractionOrZero,
-    "Exif.Thumbnail.YCbCrPositioning": int,
-    "Exif.Thumbnail.YResolution": FractionOrZero,
-}
-
-
+ARCHIVE_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".zip")
 PATH_DROPBOX = Path("/data/derek/Dropbox")
 PATH_CAMERA_UPLOADS = PATH_DROPBOX.joinpath("Camera Uploads")
 PATH_GOOGLE_DOWNLOAD = PATH_DROPBOX.joinpath(
     "Apps",
     "Google Download Your Data",
 )
+PATH_CATALOG = Path.home().joinpath(".cache", "photos", "catalog.sqlite")
+PATH_JOURNAL = Path.home().joinpath(".cache", "photos", "journal.jsonl")
+PATH_METADATA_CACHE = Path.home().joinpath(
+    ".cache",
+    "photos",
+    "metadata.sqlite",
+)
 PATH_PHOTOS = PATH_DROPBOX.joinpath("Photos")
 PATH_MONTHLY = PATH_PHOTOS.joinpath("Monthly")
 PATH_STASH = PATH_PHOTOS.joinpath("Stash")
+PATH_TIMINGS = Path.home().joinpath(".cache", "photos", "timings.json")
 PATHS_BAD_EXIF = {
     PATH_GOOGLE_DOWNLOAD.joinpath(
         "1/Takeout/Google Photos/2011-07-08 - 2011-07-29 — Shanghai, China/2011.07.08-29 — Shanghai — 2011.07.29 13.07.17.jpg",  # noqa: E501
@@ -509,3 +30,13 @@ PATHS_BAD_EXIF = {
 
 
 THUMBNAIL_SIZE = (600, 600)
+
+
+def __getattr__(name: str, /) -> Any:
+    # the EXIF tag tables are large, so are only imported upon first use
+    if name in {"EXIF_TAGS_PILLOW", "EXIF_TAGS_PYEXVI2"}:
+        from photos import exif_tags
+
+        return getattr(exif_tags, name)
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
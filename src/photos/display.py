@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from base64 import standard_b64encode
+from io import BytesIO
+from os import environ
+from re import sub
+from sys import modules, stdout
+from typing import TYPE_CHECKING, Literal, TextIO
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from PIL.Image import Image as PILImage
+
+DisplayName = Literal["auto", "ipython", "kitty", "sixel", "none"]
+_KITTY_CHUNK = 4096
+_SIXEL_COLORS = 256
+
+
+class Display(ABC):
+    """Base class for the display backends."""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def show(self, image: PILImage, /) -> None:
+        """Show an image."""
+
+
+class IPythonDisplay(Display):
+    """Shows images in an IPython front end, such as a Qt console."""
+
+    __slots__ = ()
+
+    def show(self, image: PILImage, /) -> None:
+        """Show an image."""
+        from IPython.display import display
+
+        _ = display(image)
+
+
+class KittyDisplay(Display):
+    """Shows images in a terminal, using the kitty graphics protocol."""
+
+    __slots__ = ("_file",)
+
+    def __init__(self, *, file: TextIO = stdout) -> None:
+        super().__init__()
+        self._file = file
+
+    def show(self, image: PILImage, /) -> None:
+        """Show an image."""
+        buffer = BytesIO()
+        image.save(buffer, format="PNG")
+        data = standard_b64encode(buffer.getvalue()).decode()
+        chunks = [
+            data[i : i + _KITTY_CHUNK]
+            for i in range(0, len(data), _KITTY_CHUNK)
+        ]
+        for i, chunk in enumerate(chunks):
+            more = int(i < len(chunks) - 1)
+            keys = f"a=T,f=100,m={more}" if i == 0 else f"m={more}"
+            _ = self._file.write(f"\x1b_G{keys};{chunk}\x1b\\")
+        _ = self._file.write("\n")
+        self._file.flush()
+
+
+class NullDisplay(Display):
+    """Shows nothing; for batch runs and headless sessions."""
+
+    __slots__ = ()
+
+    def show(self, image: PILImage, /) -> None:
+        """Show an image."""
+
+
+class SixelDisplay(Display):
+    """Shows images in a terminal, using the sixel protocol."""
+
+    __slots__ = ("_file",)
+
+    def __init__(self, *, file: TextIO = stdout) -> None:
+        super().__init__()
+        self._file = file
+
+    def show(self, image: PILImage, /) -> None:
+        """Show an image."""
+        _ = self._file.write(to_sixel(image))
+        _ = self._file.write("\n")
+        self._file.flush()
+
+
+def get_display(name: DisplayName = "auto", /) -> Display:
+    """Get a display backend by name, or detect one from the environment."""
+    if name == "auto":
+        name = _detect()
+    if name == "ipython":
+        return IPythonDisplay()
+    if name == "kitty":
+        return KittyDisplay()
+    if name == "sixel":
+        return SixelDisplay()
+    return NullDisplay()
+
+
+def to_sixel(image: PILImage, /) -> str:
+    """Encode an image as sixels, with an adaptive palette.
+
+    Each band of six rows is encoded one colour at a time, visiting only the
+    colours present in that band; runs are length-encoded.
+    """
+    quantized = image.convert("RGB").quantize(colors=_SIXEL_COLORS)
+    width, height = quantized.size
+    palette = quantized.getpalette() or []
+    pixels = np.full((-(-height // 6) * 6, width), -1, dtype=np.int16)
+    pixels[:height] = np.asarray(quantized, dtype=np.int16)
+    weights = (1 << np.arange(6, dtype=np.int16))[:, np.newaxis]
+    parts = [f'\x1bPq"1;1;{width};{height}']
+    for i in range(len(palette) // 3):
+        r, g, b = (round(100 * c / 255) for c in palette[3 * i : 3 * i + 3])
+        parts.append(f"#{i};2;{r};{g};{b}")
+    for top in range(0, pixels.shape[0], 6):
+        band = pixels[top : top + 6]
+        for color in np.unique(band):
+            if color < 0:
+                continue
+            bits = ((band == color) * weights).sum(axis=0) + 63
+            text = bits.astype(np.uint8).tobytes().decode()
+            parts.append(f"#{color}{_encode_runs(text)}$")
+        parts.append("-")
+    parts.append("\x1b\\")
+    return "".join(parts)
+
+
+def _detect() -> DisplayName:
+    if "IPython" in modules:
+        from IPython import get_ipython
+
+        if get_ipython() is not None:
+            return "ipython"
+    if ("KITTY_WINDOW_ID" in environ) or (environ.get("TERM") == "xterm-kitty"):
+        return "kitty"
+    if environ.get("TERM", "").endswith("sixel"):
+        return "sixel"
+    return "none"
+
+
+def _encode_runs(text: str, /) -> str:
+    return sub(r"(.)\1{3,}", lambda m: f"!{len(m.group())}{m.group(1)}", text)
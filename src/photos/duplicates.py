@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import blake2b
+from pathlib import Path
+
+from utilities.pathlib import PathLike
+
+from photos.cache import get_metadata_cache
+from photos.constants import PATH_MONTHLY, PATH_STASH
+from photos.scanner import scan
+
+_BLOCK_SIZE = 2**16
+_MIN_GROUP_SIZE = 2
+
+
+def find_duplicates(
+    paths: Iterable[PathLike],
+    /,
+    *,
+    workers: int | None = None,
+) -> list[list[Path]]:
+    """Find the groups of identical files.
+
+    Files are grouped by size, then by a hash of their first and last blocks,
+    and only then by a full hash; the hashes are computed in a thread pool.
+    """
+    by_size: defaultdict[int, list[Path]] = defaultdict(list)
+    for path in map(Path, paths):
+        by_size[path.stat().st_size].append(path)
+    groups = [g for g in by_size.values() if len(g) >= _MIN_GROUP_SIZE]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for func in [get_partial_hash, get_full_hash]:
+            groups = _regroup(groups, func, pool)
+    return groups
+
+
+def get_full_hash(path: PathLike, /) -> str:
+    """Get the hash of the entire contents of a file."""
+
+    def compute() -> str:
+        hash_ = blake2b()
+        with Path(path).open(mode="rb") as file:
+            while chunk := file.read(_BLOCK_SIZE):
+                hash_.update(chunk)
+        return hash_.hexdigest()
+
+    return get_metadata_cache().get_or_compute(path, "full_hash", compute)
+
+
+def get_partial_hash(path: PathLike, /) -> str:
+    """Get the hash of the size, and the first and last blocks, of a file."""
+
+    def compute() -> str:
+        with Path(path).open(mode="rb") as file:
+            size = file.seek(0, 2)
+            _ = file.seek(0)
+            hash_ = blake2b(size.to_bytes(8, "little"))
+            hash_.update(file.read(_BLOCK_SIZE))
+            if size > _BLOCK_SIZE:
+                _ = file.seek(max(size - _BLOCK_SIZE, _BLOCK_SIZE))
+                hash_.update(file.read(_BLOCK_SIZE))
+        return hash_.hexdigest()
+
+    return get_metadata_cache().get_or_compute(path, "partial_hash", compute)
+
+
+def is_identical(path: PathLike, other: PathLike, /) -> bool:
+    """Check if two files are identical, by size and then by their hashes.
+
+    Missing files are never identical.
+    """
+    path, other = Path(path), Path(other)
+    try:
+        return (path.stat().st_size == other.stat().st_size) and all(
+            func(path) == func(other)
+            for func in [get_partial_hash, get_full_hash]
+        )
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+
+
+class DuplicateIndex:
+    """An index of the files in a library, for finding duplicates.
+
+    Files are indexed by size alone; hashes are only computed for those files
+    whose sizes collide, and are then persisted in the metadata cache.
+    """
+
+    __slots__ = ("_by_size", "_sizes")
+
+    def __init__(self, paths: Iterable[PathLike] = (), /) -> None:
+        super().__init__()
+        self._by_size: defaultdict[int, set[Path]] = defaultdict(set)
+        self._sizes: dict[Path, int] = {}
+        for path in paths:
+            self.add(path)
+
+    def __contains__(self, path: PathLike, /) -> bool:
+        return Path(path) in self._sizes
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    @classmethod
+    def from_library(
+        cls: type[DuplicateIndex],
+        *dirs: PathLike,
+    ) -> DuplicateIndex:
+        """Build an index of the library, taking sizes from the directory."""
+        index = cls()
+        for dir_ in dirs or (PATH_MONTHLY, PATH_STASH):
+            for entry in scan(dir_):
+                index.add(entry.path, size=entry.size)
+        return index
+
+    def add(self, path: PathLike, /, *, size: int | None = None) -> None:
+        """Add a file to the index."""
+        path = Path(path)
+        size = path.stat().st_size if size is None else size
+        self._by_size[size].add(path)
+        self._sizes[path] = size
+
+    def discard(self, path: PathLike, /) -> None:
+        """Remove a file from the index."""
+        path = Path(path)
+        if (size := self._sizes.pop(path, None)) is not None:
+            self._by_size[size].discard(path)
+
+    def find(self, path: PathLike, /) -> Path | None:
+        """Find a file in the index which is identical to a given file."""
+        path = Path(path)
+        size = path.stat().st_size
+        candidates = [p for p in self._by_size.get(size, ()) if p != path]
+        for func in [get_partial_hash, get_full_hash]:
+            if len(candidates) == 0:
+                return None
+            target = func(path)
+            candidates = [p for p in candidates if _try_hash(func, p) == target]
+        return candidates[0] if len(candidates) >= 1 else None
+
+
+def _regroup(
+    groups: list[list[Path]],
+    func: Callable[[Path], str],
+    pool: ThreadPoolExecutor,
+    /,
+) -> list[list[Path]]:
+    paths = [p for g in groups for p in g]
+    hashes = dict(zip(paths, pool.map(func, paths), strict=True))
+    regrouped: defaultdict[tuple[int, str], list[Path]] = defaultdict(list)
+    for i, group in enumerate(groups):
+        for path in group:
+            regrouped[i, hashes[path]].append(path)
+    return [g for g in regrouped.values() if len(g) >= _MIN_GROUP_SIZE]
+
+
+def _try_hash(func: Callable[[Path], str], path: Path, /) -> str | None:
+    try:
+        return func(path)
+    except FileNotFoundError:
+        return None
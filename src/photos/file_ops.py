@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Literal
+
+from photos.utilities import rename
+
+
+@dataclass(frozen=True)
+class FileOp:
+    """A file operation.
+
+    The destination of a delete is the file which it duplicates.
+    """
+
+    kind: Literal["move", "stash", "delete"]
+    path: Path
+    destination: Path | None = None
+
+    @property
+    def key(self) -> Path:
+        """The key under which operations are ordered."""
+        return self.path if (dest := self.destination) is None else dest
+
+
+@dataclass(frozen=True)
+class FileOpFailure:
+    """A file operation which failed."""
+
+    op: FileOp
+    error: str
+
+
+class FileOpExecutor:
+    """Performs file operations in the background, using asyncio.
+
+    The operations run on an event loop in a dedicated thread, with bounded
+    concurrency. Operations sharing a destination are performed in the order
+    in which they were submitted. Failures are collected, to be reported back
+    by the caller; a failing success callback counts as its operation's.
+    """
+
+    __slots__ = (
+        "_failures",
+        "_failures_lock",
+        "_locks",
+        "_loop",
+        "_pending",
+        "_semaphore",
+        "_thread",
+    )
+
+    def __init__(self, *, max_concurrency: int = 4) -> None:
+        super().__init__()
+        self._failures: list[FileOpFailure] = []
+        self._failures_lock = Lock()
+        self._locks: dict[Path, tuple[asyncio.Lock, int]] = {}
+        self._loop = asyncio.new_event_loop()
+        self._pending: set[Future[None]] = set()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._thread = Thread(
+            target=self._loop.run_forever,
+            name="file-ops",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def close(self) -> None:
+        """Wait for all operations to finish, and then stop."""
+        self.join()
+        _ = self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def join(self) -> None:
+        """Wait for all operations to finish."""
+        while len(pending := set(self._pending)) >= 1:
+            for future in pending:
+                _ = future.exception()
+                self._pending.discard(future)
+
+    def pop_failures(self) -> list[FileOpFailure]:
+        """Pop the failures so far."""
+        with self._failures_lock:
+            failures = self._failures.copy()
+            self._failures.clear()
+        return failures
+
+    def submit(
+        self,
+        op: FileOp,
+        /,
+        *,
+        on_success: Callable[[], None] | None = None,
+    ) -> Future[None]:
+        """Submit an operation.
+
+        If it succeeds, then `on_success` is called in a worker thread, before
+        any later operation sharing its destination is started.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._run(op, on_success=on_success),
+            self._loop,
+        )
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    async def _run(
+        self,
+        op: FileOp,
+        /,
+        *,
+        on_success: Callable[[], None] | None = None,
+    ) -> None:
+        key = op.key
+        try:
+            lock, users = self._locks[key]
+        except KeyError:
+            lock, users = asyncio.Lock(), 0
+        self._locks[key] = lock, users + 1
+        try:
+            async with lock:
+                async with self._semaphore:
+                    await asyncio.to_thread(_perform, op)
+                if on_success is not None:
+                    await asyncio.to_thread(on_success)
+        except Exception as error:  # noqa: BLE001
+            with self._failures_lock:
+                self._failures.append(FileOpFailure(op, repr(error)))
+        finally:
+            lock, users = self._locks.pop(key)
+            if users > 1:
+                self._locks[key] = lock, users - 1
+
+
+def _perform(op: FileOp, /) -> None:
+    if op.kind == "delete":
+        op.path.unlink()
+        return
+    if (dest := op.destination) is None:
+        msg = f"{op=}"
+        raise ValueError(msg)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    rename(op.path, dest)
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import datetime as dt
+from contextlib import suppress
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from io import SEEK_CUR, BytesIO
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from struct import error as StructError  # noqa: N812
+from struct import unpack_from
+from typing import Any, BinaryIO
+
+from utilities.datetime import UTC
+from utilities.pathlib import PathLike
+
+from photos.scanner import is_jpg, is_png
+from photos.utilities import parse_exif_tags_pillow
+
+FAST_TAGS = frozenset(["DateTime", "Make", "Model", "Orientation"])
+_EXIF_HEADER = b"Exif\x00\x00"
+_IFD0_TAGS = {
+    0x010F: "Make",
+    0x0110: "Model",
+    0x0112: "Orientation",
+    0x0132: "DateTime",
+}
+_JPG_APP1 = 0xE1
+_JPG_EOI = 0xD9
+_JPG_PREFIX = 0xFF
+_JPG_SOS = 0xDA
+_PNG_CHUNK_HEAD = 8
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_CREATED = frozenset([b"Creation Time", b"date:create"])
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_TIFF_INLINE = 4
+_TIFF_MAGIC = 42
+_TYPE_ASCII = 2
+_TYPE_LONG = 4
+_TYPE_SHORT = 3
+_TYPE_SIZES = {1: 1, _TYPE_ASCII: 1, _TYPE_SHORT: 2, _TYPE_LONG: 4, 7: 1, 9: 4}
+
+
+@dataclass
+class HeaderMetadata:
+    """The metadata read from the headers of a file alone."""
+
+    tags: dict[str, Any] = field(default_factory=dict)
+    resolution: tuple[int, int] | None = None
+    created: dt.datetime | None = None
+
+
+class HeaderError(ValueError):
+    """Raised when the headers of a file cannot be read."""
+
+
+def read_header_metadata(path: PathLike, /) -> HeaderMetadata:
+    """Read the common tags and the resolution from the headers of a file.
+
+    Only the tags in `FAST_TAGS` are read; they are parsed as Pillow would
+    parse them. For PNGs, any creation time in the text chunks is read too.
+    Raise `HeaderError` for unsupported or malformed files, for which the
+    full parsers should be used instead.
+    """
+    path = Path(path)
+    if is_jpg(path):
+        return _read_jpg(path)
+    if is_png(path):
+        return _read_png(path)
+    raise HeaderError(path)
+
+
+def parse_header_metadata(
+    path: PathLike,
+    data: bytes,
+    /,
+    *,
+    truncated: bool = False,
+) -> HeaderMetadata:
+    """Parse the common tags and the resolution from the leading bytes.
+
+    The type of file is taken from `path`, which need not exist. If the data
+    are `truncated`, then whatever was read before they ran out is returned,
+    rather than raising `HeaderError`.
+    """
+    path = Path(path)
+    try:
+        if is_jpg(path):
+            return _parse_jpg(data, truncated=truncated)
+        if is_png(path):
+            return _parse_png(BytesIO(data), truncated=truncated)
+    except (IndexError, StructError, ValueError) as error:
+        raise HeaderError(path) from error
+    raise HeaderError(path)
+
+
+def _read_jpg(path: Path, /) -> HeaderMetadata:
+    try:
+        with path.open(mode="rb") as file, mmap(
+            file.fileno(),
+            0,
+            access=ACCESS_READ,
+        ) as data:
+            return _parse_jpg(data)
+    except (StructError, ValueError) as error:
+        raise HeaderError(path) from error
+
+
+def _parse_jpg(
+    data: bytes | mmap,
+    /,
+    *,
+    truncated: bool = False,
+) -> HeaderMetadata:
+    """Walk the segments up to the start of frame, reading the first APP1."""
+    if data[:2] != b"\xff\xd8":
+        raise HeaderError
+    result, pos, end = HeaderMetadata(), 2, len(data)
+    while pos + 2 <= end:
+        if data[pos] != _JPG_PREFIX:
+            raise HeaderError
+        if (marker := data[pos + 1]) == _JPG_PREFIX:
+            pos += 1
+            continue
+        if marker in {_JPG_EOI, _JPG_SOS}:
+            break
+        (length,) = unpack_from(">H", data, pos + 2)
+        start = pos + 4
+        if (marker == _JPG_APP1) and (data[start : start + 6] == _EXIF_HEADER):
+            if len(result.tags) == 0:
+                result.tags = _parse_tiff(data, start + len(_EXIF_HEADER))
+        elif marker in _SOF_MARKERS:
+            height, width = unpack_from(">HH", data, start + 1)
+            result.resolution = width, height
+            break
+        pos += 2 + length
+    else:
+        if not truncated:
+            raise HeaderError
+    return result
+
+
+def _parse_tiff(data: bytes | mmap, base: int, /) -> dict[str, Any]:
+    """Read the wanted tags from the 0th IFD of a TIFF structure."""
+    if (order := data[base : base + 2]) == b"II":
+        bo = "<"
+    elif order == b"MM":
+        bo = ">"
+    else:
+        raise HeaderError
+    magic, offset = unpack_from(f"{bo}HI", data, base + 2)
+    if magic != _TIFF_MAGIC:
+        raise HeaderError
+    ifd = base + offset
+    (count,) = unpack_from(f"{bo}H", data, ifd)
+    raw: dict[str, Any] = {}
+    for i in range(count):
+        entry = ifd + 2 + 12 * i
+        tag, type_, n = unpack_from(f"{bo}HHI", data, entry)
+        if (key := _IFD0_TAGS.get(tag)) is None:
+            continue
+        size = _TYPE_SIZES.get(type_, 0) * n
+        if size <= _TIFF_INLINE:
+            value_pos = entry + 8
+        else:
+            (value_offset,) = unpack_from(f"{bo}I", data, entry + 8)
+            value_pos = base + value_offset
+        if type_ == _TYPE_ASCII:
+            text = data[value_pos : value_pos + n]
+            raw[key] = text.split(b"\x00", 1)[0].decode("latin-1")
+        elif type_ == _TYPE_SHORT:
+            (raw[key],) = unpack_from(f"{bo}H", data, value_pos)
+        elif type_ == _TYPE_LONG:
+            (raw[key],) = unpack_from(f"{bo}I", data, value_pos)
+    return parse_exif_tags_pillow(raw)
+
+
+def _read_png(path: Path, /) -> HeaderMetadata:
+    try:
+        with path.open(mode="rb") as file:
+            return _parse_png(file)
+    except (IndexError, StructError, ValueError) as error:
+        raise HeaderError(path) from error
+
+
+def _parse_png(
+    file: BinaryIO,
+    /,
+    *,
+    truncated: bool = False,
+) -> HeaderMetadata:
+    """Walk the chunks, seeking past the image data rather than reading it."""
+    if file.read(8) != _PNG_SIGNATURE:
+        raise HeaderError
+    result = HeaderMetadata()
+    while len(head := file.read(_PNG_CHUNK_HEAD)) == _PNG_CHUNK_HEAD:
+        length, type_ = unpack_from(">I4s", head)
+        if type_ == b"IEND":
+            return result
+        _parse_png_chunk(file, type_, length, result)
+    if truncated:
+        return result
+    raise HeaderError
+
+
+def _parse_png_chunk(
+    file: BinaryIO,
+    type_: bytes,
+    length: int,
+    result: HeaderMetadata,
+    /,
+) -> None:
+    """Read a chunk into the result, leaving the file at the next chunk."""
+    if type_ == b"IHDR":
+        result.resolution = unpack_from(">II", file.read(8))
+        _ = file.seek(length - 8, SEEK_CUR)
+    elif (type_ == b"eXIf") and (len(result.tags) == 0):
+        data = file.read(length)
+        base = len(_EXIF_HEADER) if data.startswith(_EXIF_HEADER) else 0
+        result.tags = _parse_tiff(data, base)
+    elif type_ in {b"tEXt", b"iTXt"}:
+        keyword, text = _parse_png_text(type_, file.read(length))
+        if keyword == b"Raw profile type exif":
+            raise HeaderError
+        if (keyword in _PNG_CREATED) and (result.created is None):
+            result.created = _parse_png_datetime(text)
+    else:
+        _ = file.seek(length, SEEK_CUR)
+    _ = file.seek(4, SEEK_CUR)  # the CRC
+
+
+def _parse_png_datetime(text: str | None, /) -> dt.datetime | None:
+    if text is None:
+        return None
+    text = text.strip()
+    with suppress(ValueError):
+        return dt.datetime.fromisoformat(text).astimezone(UTC)
+    with suppress(TypeError, ValueError):
+        return parsedate_to_datetime(text).astimezone(UTC)
+    with suppress(ValueError):
+        return dt.datetime.strptime(text, "%Y:%m:%d %H:%M:%S").astimezone(UTC)
+    return None
+
+
+def _parse_png_text(type_: bytes, data: bytes, /) -> tuple[bytes, str | None]:
+    """Parse a text chunk; compressed international text is not inflated."""
+    keyword, _, rest = data.partition(b"\x00")
+    if type_ == b"tEXt":
+        return keyword, rest.decode("latin-1")
+    compressed, _, rest = rest[0], rest[1], rest[2:]
+    _, _, rest = rest.partition(b"\x00")
+    _, _, rest = rest.partition(b"\x00")
+    return keyword, None if compressed else rest.decode("utf-8")
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from os import fsync
+from pathlib import Path
+from threading import Lock
+from typing import Literal
+
+from utilities.atomicwrites import writer
+from utilities.pathlib import PathLike
+
+from photos.constants import PATH_JOURNAL
+from photos.duplicates import is_identical
+from photos.file_ops import FileOp
+
+
+@dataclass(frozen=True)
+class JournalEntry:
+    """An entry in the journal."""
+
+    action: Literal[
+        "move",
+        "stash",
+        "delete",
+        "skip",
+        "rotate",
+        "done",
+        "failed",
+    ]
+    path: Path
+    destination: Path | None = None
+    rotate: int = 0
+
+    def to_json(self) -> str:
+        """Serialize the entry as a single line of JSON."""
+        dest = self.destination
+        return json.dumps(
+            {
+                "action": self.action,
+                "path": self.path.as_posix(),
+                "destination": None if dest is None else dest.as_posix(),
+                "rotate": self.rotate,
+            },
+        )
+
+    @classmethod
+    def from_json(cls, line: str, /) -> JournalEntry:
+        """Deserialize an entry from a line of JSON."""
+        data = json.loads(line)
+        dest = data["destination"]
+        return cls(
+            data["action"],
+            Path(data["path"]),
+            destination=None if dest is None else Path(dest),
+            rotate=data["rotate"],
+        )
+
+
+@dataclass
+class JournalState:
+    """The state of a session, as replayed from its journal."""
+
+    skips: set[Path] = field(default_factory=set)
+    pending: list[FileOp] = field(default_factory=list)
+    rotations: dict[Path, int] = field(default_factory=dict)
+
+    def yield_entries(self) -> Iterator[JournalEntry]:
+        """Yield the entries which reproduce this state."""
+        for path in sorted(self.skips):
+            yield JournalEntry("skip", path)
+        for op in self.pending:
+            yield JournalEntry(op.kind, op.path, destination=op.destination)
+        for path, rotate in sorted(self.rotations.items()):
+            yield JournalEntry("rotate", path, rotate=rotate)
+
+
+class Journal:
+    """An append-only journal of the actions taken in a session.
+
+    Entries are flushed as they are appended, but only fsync-ed in batches of
+    `sync_every`, and upon closing. A torn final line, as left by a crash, is
+    ignored upon replay.
+    """
+
+    __slots__ = ("_file", "_lock", "_path", "_sync_every", "_unsynced")
+
+    def __init__(
+        self,
+        path: PathLike = PATH_JOURNAL,
+        /,
+        *,
+        sync_every: int = 16,
+    ) -> None:
+        super().__init__()
+        self._path = path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open(mode="a", encoding="utf-8")
+        self._lock = Lock()
+        self._sync_every = sync_every
+        self._unsynced = 0
+
+    def __enter__(self) -> Journal:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    # properties
+
+    @property
+    def path(self) -> Path:
+        """The path to the journal."""
+        return self._path
+
+    # methods
+
+    def append(self, entry: JournalEntry, /) -> None:
+        """Append an entry to the journal."""
+        with self._lock:
+            _ = self._file.write(f"{entry.to_json()}\n")
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self._sync_every:
+                self._sync()
+
+    def close(self) -> None:
+        """Sync and close the journal."""
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+    def sync(self) -> None:
+        """Sync the journal to disk."""
+        with self._lock:
+            self._sync()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        fsync(self._file.fileno())
+        self._unsynced = 0
+
+
+def read_journal(path: PathLike = PATH_JOURNAL, /) -> Iterator[JournalEntry]:
+    """Read the entries of a journal, skipping any torn or corrupt lines."""
+    try:
+        file = Path(path).open(encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with file:
+        for line in file:
+            try:
+                yield JournalEntry.from_json(line)
+            except (KeyError, TypeError, ValueError):
+                continue
+
+
+def replay_journal(entries: Iterable[JournalEntry], /) -> JournalState:
+    """Replay the entries of a journal.
+
+    The last action on each path wins. Skips and rotations are kept only for
+    files which still exist; moves, stashes and deletes whose source still
+    exists, and whose outcome was never recorded, are returned as pending, to
+    be performed again. Failed operations are dropped, and deletes are only
+    kept if the file they duplicate is still identical.
+    """
+    ops: dict[Path, FileOp | None] = {}  # a skip is denoted by None
+    rotations: dict[Path, int] = {}
+    for entry in entries:
+        path, action = entry.path, entry.action
+        if action == "rotate":
+            rotations[path] = entry.rotate
+            continue
+        _ = rotations.pop(path, None)
+        if action in {"done", "failed"}:
+            _ = ops.pop(path, None)
+        elif action == "skip":
+            ops[path] = None
+        else:
+            ops[path] = FileOp(action, path, destination=entry.destination)
+    state = JournalState(
+        rotations={p: r for p, r in rotations.items() if r and p.exists()},
+    )
+    for path, op in ops.items():
+        if not path.exists():
+            continue
+        if op is None:
+            state.skips.add(path)
+        elif (op.kind != "delete") or _is_duplicate(op):
+            state.pending.append(op)
+    return state
+
+
+def _is_duplicate(op: FileOp, /) -> bool:
+    return (
+        ((dup := op.destination) is not None)
+        and (dup != op.path)
+        and is_identical(op.path, dup)
+    )
+
+
+def compact_journal(path: PathLike = PATH_JOURNAL, /) -> JournalState:
+    """Replay a journal, and then rewrite it with just its live state."""
+    path = Path(path)
+    state = replay_journal(read_journal(path))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with writer(path, overwrite=True) as temp, temp.open(
+        mode="w",
+        encoding="utf-8",
+    ) as file:
+        for entry in state.yield_entries():
+            _ = file.write(f"{entry.to_json()}\n")
+    return state
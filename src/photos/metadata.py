@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass, field
+from functools import cached_property
+from io import BytesIO
+from os import stat_result
+from pathlib import Path
+from typing import Any
+
+from PIL.Image import Image as PILImage
+from PIL.Image import open as _open
+from pyexiv2 import ImageData as pyexiv2ImageData
+
+from photos.cache import get_metadata_cache
+from photos.headers import (
+    FAST_TAGS,
+    HeaderError,
+    HeaderMetadata,
+    parse_header_metadata,
+    read_header_metadata,
+)
+from photos.timing import timer
+from photos.utilities import (
+    PathMonthly,
+    get_path_monthly,
+    get_path_stash,
+    get_raw_exif_tags_pillow,
+    get_raw_exif_tags_pyexiv2,
+    get_resolution,
+    make_thumbnail,
+    parse_exif_tags_pillow,
+    parse_exif_tags_pyexiv2,
+    rotate_image,
+)
+
+
+@dataclass
+class Metadata:
+    """The metadata of a file.
+
+    The metadata cache is consulted first. Otherwise, the file is read
+    exactly once; its bytes are then shared between the header, Pillow and
+    pyexiv2 parsers. The pixels are only decoded upon request. If only the
+    headers are needed, as in auto mode, then set `headers_only`; they are
+    then read from the file directly, without reading all of it.
+    """
+
+    path: Path
+    headers_only: bool = False
+    _thumbnails: dict[int, PILImage] = field(
+        default_factory=dict,
+        init=False,
+        repr=False,
+    )
+
+    def __post_init__(self) -> None:
+        self.path = Path(self.path)
+
+    @cached_property
+    def auto_destination(self) -> Path:
+        """The destination chosen in auto mode.
+
+        Files with a Takeout or EXIF datetime, or taken on an Apple device, are
+        moved to the monthly library; all others, including those dated only by
+        a PNG creation time or their filename, are stashed.
+        """
+        return get_auto_destination(
+            self.path_monthly,
+            self.path_stash,
+            make=self.fast_tags.get("Make"),
+        )
+
+    @cached_property
+    def bytes_(self) -> bytes:
+        """The contents of the file."""
+        with self.path.open(mode="rb") as file:
+            return file.read()
+
+    @cached_property
+    def created(self) -> dt.datetime | None:
+        """The creation time recorded in the headers of a PNG, if any."""
+        return None if (header := self.header) is None else header.created
+
+    @cached_property
+    def fast_tags(self) -> dict[str, Any]:
+        """The common tags, read from the headers alone where possible."""
+        if (header := self.header) is not None:
+            return header.tags
+        return {k: v for k, v in self.tags.items() if k in FAST_TAGS}
+
+    @cached_property
+    def file_size(self) -> int:
+        """The size of the file."""
+        return self.stat.st_size
+
+    @cached_property
+    def header(self) -> HeaderMetadata | None:
+        """The metadata read from the headers, if they are supported."""
+        try:
+            return (
+                read_header_metadata(self.path)
+                if self.headers_only
+                else parse_header_metadata(self.path, self.bytes_)
+            )
+        except HeaderError:
+            return None
+
+    @cached_property
+    def image(self) -> PILImage:
+        """The Pillow image, with only its headers read."""
+        with timer("open_image"):
+            return _open(BytesIO(self.bytes_))
+
+    @cached_property
+    def pixels(self) -> PILImage:
+        """The Pillow image, with its pixels decoded."""
+        image = self.image
+        with timer("decode"):
+            image.load()
+        return image
+
+    @cached_property
+    def thumbnail(self) -> PILImage:
+        """The thumbnail, decoded at a reduced scale where possible."""
+        return make_thumbnail(_open(BytesIO(self.bytes_)))
+
+    def get_thumbnail(self, *, rotate: int = 0) -> PILImage:
+        """Get the thumbnail, rotated anticlockwise; results are cached."""
+        _, rotate = divmod(rotate, 360)
+        try:
+            return self._thumbnails[rotate]
+        except KeyError:
+            thumbnail = self._thumbnails[rotate] = rotate_image(
+                self.thumbnail,
+                rotate,
+            )
+            return thumbnail
+
+    def release(self) -> None:
+        """Release the contents of the file; they are re-read if needed."""
+        for attr in ["bytes_", "image", "pixels"]:
+            _ = self.__dict__.pop(attr, None)
+
+    @cached_property
+    def resolution(self) -> tuple[int, int]:
+        """The resolution of the image, from the headers where possible."""
+        if ((header := self.header) is not None) and (
+            (resolution := header.resolution) is not None
+        ):
+            return resolution
+        return get_metadata_cache().get_or_compute(
+            self.path,
+            "resolution",
+            lambda: get_resolution(self.image),
+            stat=self.stat,
+        )
+
+    @cached_property
+    def stat(self) -> stat_result:
+        """The status of the file."""
+        return self.path.stat()
+
+    @cached_property
+    def tags_pillow(self) -> dict[str, Any]:
+        """The parsed EXIF tags, using Pillow."""
+        image = self.image
+        with timer("exif_pillow"):
+            return parse_exif_tags_pillow(get_raw_exif_tags_pillow(image))
+
+    @cached_property
+    def tags_pyexiv2(self) -> dict[str, Any]:
+        """The parsed EXIF tags, using pyexiv2."""
+        with timer("exif_pyexiv2"):
+            image = pyexiv2ImageData(self.bytes_)
+            try:
+                raw = get_raw_exif_tags_pyexiv2(image)
+            finally:
+                image.close()
+            return parse_exif_tags_pyexiv2(raw)
+
+    @cached_property
+    def tags(self) -> dict[str, Any]:
+        """The parsed EXIF tags."""
+        with timer("exif"):
+            return get_metadata_cache().get_or_compute(
+                self.path,
+                "tags",
+                lambda: self.tags_pillow | self.tags_pyexiv2,
+                stat=self.stat,
+            )
+
+    @cached_property
+    def path_monthly(self) -> PathMonthly | None:
+        """The monthly path, which needs only the common tags."""
+        return get_path_monthly(
+            self.path,
+            tags=self.fast_tags,
+            header=self.header,
+        )
+
+    @cached_property
+    def path_stash(self) -> Path:
+        """The stash path."""
+        return get_path_stash(self.path)
+
+
+def get_auto_destination(
+    path_monthly: PathMonthly | None,
+    path_stash: Path,
+    /,
+    *,
+    make: str | None = None,
+) -> Path:
+    """Choose between the monthly and stash paths, as in auto mode."""
+    if (path_monthly is not None) and (
+        (path_monthly.source in {"Takeout", "EXIF"}) or (make == "Apple")
+    ):
+        return path_monthly.destination
+    return path_stash
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from utilities.pathlib import PathLike
+
+from photos.constants import PATH_MONTHLY
+from photos.duplicates import is_identical
+from photos.scanner import scan
+
+
+class MonthlyIndex:
+    """An index of the files in the monthly library.
+
+    The library is walked once upon construction; thereafter, the index must
+    be kept up-to-date via `add` and `discard`.
+    """
+
+    __slots__ = ("_root", "_paths")
+
+    def __init__(self, root: PathLike = PATH_MONTHLY, /) -> None:
+        super().__init__()
+        self._root = Path(root)
+        self._paths = {e.path for e in scan(self._root, supported=False)}
+
+    def __contains__(self, path: PathLike, /) -> bool:
+        return Path(path) in self._paths
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def add(self, path: PathLike, /) -> None:
+        """Add a file to the index."""
+        self._paths.add(Path(path))
+
+    def discard(self, path: PathLike, /) -> None:
+        """Remove a file from the index."""
+        self._paths.discard(Path(path))
+
+    def resolve(
+        self,
+        path: PathLike,
+        destination: PathLike,
+        /,
+    ) -> tuple[Path, bool]:
+        """Resolve the destination of a file, avoiding collisions.
+
+        Suffixes " (1)", " (2)", ... are tried in turn, until a free name is
+        found. Return the destination, and whether it already holds a file with
+        identical contents; if so, then the file need not be renamed at all.
+        """
+        path, destination = Path(path), Path(destination)
+        candidate, i = destination, 0
+        while candidate in self._paths:
+            if is_identical(path, candidate):
+                return candidate, True
+            i += 1
+            candidate = destination.with_name(
+                f"{destination.stem} ({i}){destination.suffix}",
+            )
+        return candidate, False
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+from PIL.Image import Image as PILImage
+from PIL.Image import Resampling
+from utilities.pathlib import PathLike
+
+from photos.cache import get_metadata_cache
+from photos.metadata import Metadata
+
+_HASH_SIZE = 8
+
+
+def get_dhash(image: PILImage, /) -> int:
+    """Get the 64-bit difference hash of an image."""
+    small = image.convert("L").resize(
+        (_HASH_SIZE + 1, _HASH_SIZE),
+        Resampling.BILINEAR,
+    )
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def get_perceptual_hash(path: PathLike, /) -> int:
+    """Get the perceptual hash of a file, from its thumbnail."""
+    return get_metadata_cache().get_or_compute(
+        path,
+        "dhash",
+        lambda: get_dhash(Metadata(Path(path)).thumbnail),
+    )
+
+
+@dataclass
+class _Node:
+    hash_: int
+    paths: list[Path] = field(default_factory=list)
+    children: dict[int, _Node] = field(default_factory=dict)
+
+
+class BKTree:
+    """A BK-tree of hashes, for nearest neighbour queries under Hamming."""
+
+    __slots__ = ("_root", "_len")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._root: _Node | None = None
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, hash_: int, path: PathLike, /) -> None:
+        """Add a hash to the tree."""
+        path = Path(path)
+        self._len += 1
+        if (node := self._root) is None:
+            self._root = _Node(hash_, [path])
+            return
+        while True:
+            if (dist := (node.hash_ ^ hash_).bit_count()) == 0:
+                node.paths.append(path)
+                return
+            try:
+                node = node.children[dist]
+            except KeyError:
+                node.children[dist] = _Node(hash_, [path])
+                return
+
+    def query(
+        self,
+        hash_: int,
+        /,
+        *,
+        max_distance: int,
+    ) -> list[tuple[Path, int]]:
+        """Get the paths within a given distance, nearest first."""
+        return sorted(
+            self._yield_matches(hash_, max_distance),
+            key=lambda x: x[1],
+        )
+
+    def _yield_matches(
+        self,
+        hash_: int,
+        max_distance: int,
+        /,
+    ) -> Iterator[tuple[Path, int]]:
+        if (root := self._root) is None:
+            return
+        stack = [root]
+        while len(stack) >= 1:
+            node = stack.pop()
+            dist = (node.hash_ ^ hash_).bit_count()
+            if dist <= max_distance:
+                for path in node.paths:
+                    yield path, dist
+            for child_dist, child in node.children.items():
+                if abs(child_dist - dist) <= max_distance:
+                    stack.append(child)
+
+
+class PerceptualIndex:
+    """An index of perceptual hashes, for finding near-duplicates."""
+
+    __slots__ = ("_tree",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._tree = BKTree()
+
+    def __len__(self) -> int:
+        return len(self._tree)
+
+    @classmethod
+    def from_paths(
+        cls,
+        paths: Iterable[PathLike],
+        /,
+        *,
+        workers: int | None = None,
+    ) -> PerceptualIndex:
+        """Build an index, hashing the files in a process pool."""
+        paths = list(map(Path, paths))
+        index = cls()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, hash_ in zip(
+                paths,
+                pool.map(get_perceptual_hash, paths, chunksize=16),
+                strict=True,
+            ):
+                index.add(path, hash_=hash_)
+        return index
+
+    def add(self, path: PathLike, /, *, hash_: int | None = None) -> None:
+        """Add a file to the index."""
+        hash_ = get_perceptual_hash(path) if hash_ is None else hash_
+        self._tree.add(hash_, path)
+
+    def find(
+        self,
+        path: PathLike,
+        /,
+        *,
+        max_distance: int = 10,
+    ) -> list[tuple[Path, int]]:
+        """Find the near-duplicates of a file, nearest first."""
+        path = Path(path)
+        return [
+            (p, d)
+            for p, d in self._tree.query(
+                get_perceptual_hash(path),
+                max_distance=max_distance,
+            )
+            if p != path
+        ]
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from pandas import DataFrame, merge, read_parquet
+from utilities.atomicwrites import writer
+from utilities.pathlib import PathLike
+
+from photos.batch import BatchResult, decide
+from photos.constants import PATH_CAMERA_UPLOADS, PATH_MONTHLY
+from photos.duplicates import DuplicateIndex, is_identical
+from photos.monthly import MonthlyIndex
+from photos.utilities import purge_empty_parents, rename
+from photos.work_queue import WorkQueue
+
+PLAN_COLUMNS = [
+    "path",
+    "size",
+    "mtime_ns",
+    "action",
+    "destination",
+    "duplicate_of",
+    "error",
+]
+
+
+def make_plan(
+    dir_: PathLike = PATH_CAMERA_UPLOADS,
+    /,
+    *,
+    workers: int | None = None,
+    chunksize: int = 16,
+) -> DataFrame:
+    """Make a plan for organizing a directory in auto mode, without acting.
+
+    The metadata is extracted in a process pool; duplicates and collisions in
+    the monthly library are then resolved serially. Later copies of a file
+    are planned for deletion, as duplicates of its destination. The plan is
+    sorted by path, so that plans may be compared across runs.
+    """
+    dir_ = Path(dir_)
+    paths = list(WorkQueue(dir_))
+    logger.info("Planning {} files in {}", len(paths), dir_)
+    duplicates = DuplicateIndex.from_library()
+    monthly = MonthlyIndex(PATH_MONTHLY)
+    planned: dict[Path, Path] = {}
+    rows: list[tuple[Any, ...]] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for decision in pool.map(decide, paths, chunksize=chunksize):
+            path = decision.path
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            key = (path.as_posix(), stat.st_size, stat.st_mtime_ns)
+            if (dest := decision.destination) is None:
+                rows.append((*key, "fail", None, None, decision.error))
+                continue
+            if (dup := duplicates.find(path)) is not None:
+                dup = planned.get(dup, dup)
+                rows.append((*key, "delete", None, dup.as_posix(), None))
+                continue
+            if decision.stash:
+                rows.append((*key, "stash", dest.as_posix(), None, None))
+            else:
+                dest, present = monthly.resolve(path, dest)
+                if present:
+                    rows.append((*key, "delete", None, dest.as_posix(), None))
+                    continue
+                monthly.add(dest)
+                rows.append((*key, "move", dest.as_posix(), None, None))
+            # later copies are deleted, as by the Organizer; the file is
+            # indexed where it is, as its destination does not yet exist
+            duplicates.add(path, size=stat.st_size)
+            planned[path] = dest
+    plan = DataFrame(rows, columns=PLAN_COLUMNS)
+    return plan.sort_values("path", ignore_index=True)
+
+
+def write_plan(plan: DataFrame, path: PathLike, /) -> None:
+    """Write a plan to a Parquet file, atomically."""
+    with writer(Path(path), overwrite=True) as temp:
+        plan.to_parquet(temp, index=False)
+
+
+def read_plan(path: PathLike, /) -> DataFrame:
+    """Read a plan from a Parquet file."""
+    return read_parquet(Path(path), columns=PLAN_COLUMNS)
+
+
+def diff_plans(old: DataFrame, new: DataFrame, /) -> DataFrame:
+    """Get the rows whose action or destination differ between two plans."""
+    cols = ["path", "action", "destination"]
+    merged = merge(
+        old[cols],
+        new[cols],
+        on="path",
+        how="outer",
+        suffixes=("_old", "_new"),
+    )
+    old_key = merged[["action_old", "destination_old"]].fillna("").to_numpy()
+    new_key = merged[["action_new", "destination_new"]].fillna("").to_numpy()
+    return merged[(old_key != new_key).any(axis=1)].reset_index(drop=True)
+
+
+def apply_plan(
+    plan: DataFrame | PathLike,
+    /,
+    *,
+    root: PathLike = PATH_CAMERA_UPLOADS,
+) -> BatchResult:
+    """Apply a plan.
+
+    Applying a plan is idempotent, so that an interrupted run may simply be
+    resumed. Rows whose source has since changed, or whose destination is
+    taken, are skipped. Deletes are applied last, and only if the duplicate
+    is still identical to the file.
+    """
+    plan = plan if isinstance(plan, DataFrame) else read_plan(plan)
+    plan = plan.sort_values(
+        "action",
+        key=lambda actions: actions == "delete",
+        kind="stable",
+    )
+    result = BatchResult()
+    vacated: set[Path] = set()
+    for path, size, mtime_ns, action, dest, dup, _ in plan[
+        PLAN_COLUMNS
+    ].itertuples(index=False, name=None):
+        # missing strings may be read back as NaN
+        dest, dup = (x if isinstance(x, str) else None for x in [dest, dup])
+        if _apply_row(Path(path), size, mtime_ns, action, dest, dup, result):
+            vacated.add(Path(path).parent)
+    purge_empty_parents(vacated, root=root)
+    return result
+
+
+def _apply_row(
+    path: Path,
+    size: int,
+    mtime_ns: int,
+    action: str,
+    dest: str | None,
+    dup: str | None,
+    result: BatchResult,
+    /,
+) -> bool:
+    if action == "fail":
+        result.failed += 1
+        return False
+    if not _is_current(path, size, mtime_ns, action, dest, dup):
+        result.skipped += 1
+        return False
+    try:
+        if action == "delete":
+            path.unlink()
+        elif dest is not None:
+            Path(dest).parent.mkdir(parents=True, exist_ok=True)
+            rename(path, dest)
+    except OSError:
+        logger.exception("Failed to {} {}", action, path)
+        result.failed += 1
+        return False
+    if action == "delete":
+        result.deleted += 1
+    elif action == "stash":
+        result.stashed += 1
+    else:
+        result.moved += 1
+    return True
+
+
+def _is_current(
+    path: Path,
+    size: int,
+    mtime_ns: int,
+    action: str,
+    dest: str | None,
+    dup: str | None,
+    /,
+) -> bool:
+    """Check whether a row of a plan still holds for its file."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return False
+    if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+        logger.warning("Skipping {}; changed since planning", path)
+        return False
+    if action == "delete":
+        if (dup is None) or (Path(dup) == path) or not is_identical(path, dup):
+            logger.warning("Skipping {}; {} is no longer identical", path, dup)
+            return False
+    elif (dest is None) or Path(dest).exists():
+        logger.warning("Skipping {} -> {}", path, dest)
+        return False
+    return True
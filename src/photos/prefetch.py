@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from loguru import logger
+from utilities.pathlib import PathLike
+
+from photos.constants import THUMBNAIL_SIZE
+from photos.metadata import Metadata
+
+_MAX_THUMBNAIL_BYTES = 4 * THUMBNAIL_SIZE[0] * THUMBNAIL_SIZE[1]
+
+
+class Prefetcher:
+    """Prefetches the metadata and thumbnails of upcoming files.
+
+    The work is done in a thread pool, while the current file is on screen.
+    The prefetched files are bounded both in number, by the paths passed to
+    `prefetch`, and in memory, by `max_bytes`. The contents of each file are
+    released once its metadata has been extracted.
+    """
+
+    __slots__ = ("_pool", "_futures", "_max_bytes")
+
+    def __init__(
+        self,
+        *,
+        workers: int = 4,
+        max_bytes: int = 64 * _MAX_THUMBNAIL_BYTES,
+    ) -> None:
+        super().__init__()
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="prefetch",
+        )
+        self._futures: dict[Path, tuple[Future[Metadata], int]] = {}
+        self._max_bytes = max_bytes
+
+    def __len__(self) -> int:
+        return len(self._futures)
+
+    @property
+    def bytes_in_use(self) -> int:
+        """The estimated memory in use by the prefetched files.
+
+        Files being loaded are counted in full, since their contents are held
+        until their metadata has been extracted; their sizes are taken once,
+        upon submission.
+        """
+        return sum(_get_size(f, size) for f, size in self._futures.values())
+
+    def close(self) -> None:
+        """Stop prefetching."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._futures.clear()
+
+    def get(self, path: PathLike, /) -> Metadata:
+        """Get the metadata of a file, prefetched if possible."""
+        path = Path(path)
+        if (item := self._futures.pop(path, None)) is not None:
+            try:
+                return item[0].result()
+            except Exception:
+                logger.exception("Failed to prefetch {}", path)
+        return Metadata(path)
+
+    def prefetch(
+        self,
+        paths: Iterable[PathLike],
+        /,
+        *,
+        thumbnail: bool = True,
+    ) -> None:
+        """Prefetch the given files, dropping all others."""
+        paths = list(map(Path, paths))
+        for path in set(self._futures) - set(paths):
+            future, _ = self._futures.pop(path)
+            _ = future.cancel()
+        for path in paths:
+            if path in self._futures:
+                continue
+            if self.bytes_in_use + _MAX_THUMBNAIL_BYTES > self._max_bytes:
+                break
+            try:
+                size = path.stat().st_size
+            except OSError:
+                size = 0
+            future = self._pool.submit(_load, path, thumbnail=thumbnail)
+            self._futures[path] = future, size
+
+
+def _get_size(future: Future[Metadata], size: int, /) -> int:
+    if future.running():
+        return _MAX_THUMBNAIL_BYTES + size
+    if not future.done() or future.cancelled():
+        return _MAX_THUMBNAIL_BYTES
+    if future.exception() is not None:
+        return 0
+    if (thumbnail := future.result().__dict__.get("thumbnail")) is None:
+        return 0
+    width, height = thumbnail.size
+    return width * height * len(thumbnail.getbands())
+
+
+def _load(path: Path, /, *, thumbnail: bool) -> Metadata:
+    metadata = Metadata(path)
+    _ = metadata.tags
+    _ = metadata.resolution
+    _ = metadata.path_monthly
+    if thumbnail:
+        _ = metadata.thumbnail
+    metadata.release()
+    return metadata
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from os import DirEntry, scandir
+from pathlib import Path, PurePath
+from random import randrange, shuffle
+
+from utilities.pathlib import PathLike
+
+from photos.constants import PATHS_BAD_EXIF
+
+_PATHS_BAD_EXIF = frozenset(p.resolve() for p in PATHS_BAD_EXIF)
+_NAMES_BAD_EXIF = frozenset(p.name for p in _PATHS_BAD_EXIF)
+
+
+class ScanEntry:
+    """A file found by a scan.
+
+    The size and modification time come from the directory entry, which
+    caches the result of its first `stat` call.
+    """
+
+    __slots__ = ("_entry", "_path")
+
+    def __init__(self, entry: DirEntry[str], /) -> None:
+        super().__init__()
+        self._entry = entry
+        self._path: Path | None = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._entry.path!r})"
+
+    # properties
+
+    @property
+    def mtime_ns(self) -> int:
+        """The modification time, in nanoseconds."""
+        return self._entry.stat().st_mtime_ns
+
+    @property
+    def name(self) -> str:
+        """The name of the file."""
+        return self._entry.name
+
+    @property
+    def path(self) -> Path:
+        """The path to the file."""
+        if (path := self._path) is None:
+            self._path = path = Path(self._entry.path)
+        return path
+
+    @property
+    def size(self) -> int:
+        """The size, in bytes."""
+        return self._entry.stat().st_size
+
+
+def is_bad_exif(path: PathLike, /) -> bool:
+    """Check if a path is bad.
+
+    Paths are only resolved if their names match, so that most checks make
+    no system calls.
+    """
+    return (PurePath(path).name in _NAMES_BAD_EXIF) and (
+        Path(path).resolve() in _PATHS_BAD_EXIF
+    )
+
+
+def is_jpg(path: PathLike, /) -> bool:
+    """Check if a file is a JPG."""
+    return PurePath(path).suffix == ".jpg"
+
+
+def is_png(path: PathLike, /) -> bool:
+    """Check if a file is a PNG."""
+    return PurePath(path).suffix == ".png"
+
+
+def is_supported(path: PathLike, /) -> bool:
+    """Check if a file is supported."""
+    return (is_jpg(path) or is_png(path)) and not is_bad_exif(path)
+
+
+def is_supported_entry(entry: DirEntry[str], /) -> bool:
+    """Check if a directory entry is a supported file, without a `stat`."""
+    return is_supported(entry.path) and entry.is_file()
+
+
+def sample(
+    root: PathLike,
+    k: int,
+    /,
+    *,
+    supported: bool = True,
+) -> list[ScanEntry]:
+    """Sample up to `k` files under a directory, uniformly at random.
+
+    Reservoir sampling is used, so only the sample is held in memory.
+    """
+    reservoir: list[ScanEntry] = []
+    for i, entry in enumerate(scan(root, supported=supported)):
+        if i < k:
+            reservoir.append(entry)
+        elif (j := randrange(i + 1)) < k:
+            reservoir[j] = entry
+    shuffle(reservoir)
+    return reservoir
+
+
+def scan(
+    root: PathLike,
+    /,
+    *,
+    supported: bool = True,
+) -> Iterator[ScanEntry]:
+    """Scan the files under a directory, lazily.
+
+    Subdirectories are not followed if they are symlinks. If `supported` is
+    set, then only supported files are yielded; they are filtered by name
+    before any `stat` call is made.
+    """
+    stack = [Path(root).as_posix()]
+    while len(stack) >= 1:
+        try:
+            iterator = scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with iterator:
+            for entry in iterator:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif (
+                    is_supported_entry(entry) if supported else entry.is_file()
+                ):
+                    yield ScanEntry(entry)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from time import monotonic
+
+from loguru import logger
+from tabulate import tabulate
+from utilities.pathlib import PathLike
+
+from photos.utilities import (
+    format_exif_datetime,
+    get_path_monthly,
+    get_raw_exif_tags_pyexiv2,
+    write_exif,
+)
+
+
+@dataclass(frozen=True)
+class WriteResult:
+    """The result of writing EXIF tags to a single file."""
+
+    path: Path
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the tags were written and verified."""
+        return self.error is None
+
+
+def get_datetime_stamp(path: PathLike, /) -> dict[str, str] | None:
+    """Get the EXIF tags to stamp a filename-derived datetime into a file.
+
+    The datetime is written in local time, as EXIF datetimes are read.
+    """
+    if ((pm := get_path_monthly(path)) is None) or (pm.source != "filename"):
+        return None
+    local = pm.datetime.astimezone()
+    return {"Exif.Image.DateTime": format_exif_datetime(local)}
+
+
+def stamp_datetimes(
+    paths: Iterable[PathLike],
+    /,
+    *,
+    workers: int | None = None,
+    chunksize: int = 16,
+) -> list[WriteResult]:
+    """Stamp filename-derived datetimes into the EXIF tags of many files."""
+    paths = list(map(Path, paths))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        stamps = list(pool.map(_try_stamp, paths, chunksize=chunksize))
+    return write_exif_many(
+        [(p, s) for p, s in zip(paths, stamps, strict=True) if s is not None],
+        workers=workers,
+        chunksize=chunksize,
+    )
+
+
+def write_exif_many(
+    items: Iterable[tuple[PathLike, Mapping[str, str]]],
+    /,
+    *,
+    workers: int | None = None,
+    chunksize: int = 16,
+) -> list[WriteResult]:
+    """Write EXIF tags to many files, in a process pool.
+
+    The tags of each file are written with a single open, and then read back
+    to verify them.
+    """
+    items = [(Path(p), dict(u)) for p, u in items]
+    start = monotonic()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_write_and_verify, items, chunksize=chunksize))
+    failures = [r for r in results if not r.ok]
+    logger.info(
+        "\n\nWrote EXIF tags:\n{}\n\n",
+        tabulate(
+            [
+                ("written", len(results) - len(failures)),
+                ("failed", len(failures)),
+                ("duration", f"{monotonic() - start:.1f}s"),
+            ],
+        ),
+    )
+    if len(failures) >= 1:
+        logger.error(
+            "\n\nFailed:\n{}\n\n",
+            tabulate((r.path, r.error) for r in failures),
+        )
+    return results
+
+
+def _try_stamp(path: Path, /) -> dict[str, str] | None:
+    try:
+        return get_datetime_stamp(path)
+    except Exception:
+        logger.exception("Failed to get the datetime of {}", path)
+        return None
+
+
+def _write_and_verify(item: tuple[Path, dict[str, str]], /) -> WriteResult:
+    path, updates = item
+    try:
+        write_exif(path, updates)
+        tags = get_raw_exif_tags_pyexiv2(path)
+    except Exception as error:  # noqa: BLE001
+        return WriteResult(path, error=repr(error))
+    if len(wrong := [k for k, v in updates.items() if tags.get(k) != v]) >= 1:
+        return WriteResult(path, error=f"Verification failed for {wrong}")
+    return WriteResult(path)
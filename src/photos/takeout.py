@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+from collections import defaultdict
+from contextlib import suppress
+from dataclasses import dataclass, field
+from functools import cache
+from os import getpid, scandir
+from pathlib import Path
+from re import search
+from threading import Lock
+
+from utilities.datetime import UTC
+from utilities.pathlib import PathLike
+
+_EDITED = "-edited"
+_PREFIX = 30
+
+
+@dataclass
+class _Album:
+    """The datetimes of the files in a single album."""
+
+    times: dict[str, dt.datetime] = field(default_factory=dict)
+    prefixes: defaultdict[tuple[str, str], list[str]] = field(
+        default_factory=lambda: defaultdict(list),
+    )
+
+    def add(self, name: str, datetime: dt.datetime, /) -> None:
+        self.times[name] = datetime
+        path = Path(name)
+        if len(stem := path.stem) >= _PREFIX:
+            self.prefixes[stem[:_PREFIX], path.suffix].append(name)
+
+    def find(self, name: str, /) -> dt.datetime | None:
+        """Find the datetime of a file, allowing for Takeout's quirks.
+
+        Edited copies share the sidecar of their original. Truncated names
+        are matched against the titles they prefix, if unambiguous.
+        """
+        with suppress(KeyError):
+            return self.times[name]
+        if _EDITED in name:
+            with suppress(KeyError):
+                return self.times[name.replace(_EDITED, "", 1)]
+        path = Path(name)
+        if len(stem := path.stem) < _PREFIX:
+            return None
+        matches = [
+            n
+            for n in self.prefixes.get((stem[:_PREFIX], path.suffix), [])
+            if Path(n).stem.startswith(stem)
+        ]
+        return self.times[matches[0]] if len(matches) == 1 else None
+
+
+class TakeoutIndex:
+    """An index of the datetimes in Google Takeout's JSON sidecars.
+
+    Each album is indexed upon the first lookup of one of its files, in a
+    single pass over its sidecars; thereafter, lookups take constant time.
+    Sidecars are matched by the title within them, rather than by their own
+    names, which Takeout truncates. A "(1)" before ".json" denotes the
+    sidecar of a file whose name has "(1)" before its suffix.
+
+    If `read` is unset, then the albums are not read from disk; they are only
+    populated via `add_sidecar`, as for the members of an archive.
+    """
+
+    __slots__ = ("_albums", "_lock", "_read")
+
+    def __init__(self, *, read: bool = True) -> None:
+        super().__init__()
+        self._albums: dict[Path, _Album] = {}
+        self._lock = Lock()
+        self._read = read
+
+    def __len__(self) -> int:
+        return len(self._albums)
+
+    def add_sidecar(self, path: PathLike, data: bytes | str, /) -> None:
+        """Add the contents of a sidecar, which are ignored if invalid."""
+        path = Path(path)
+        if (parsed := _parse_sidecar(path, data)) is None:
+            return
+        with self._lock:
+            self._albums.setdefault(path.parent, _Album()).add(*parsed)
+
+    def get_datetime(self, path: PathLike, /) -> dt.datetime | None:
+        """Get the datetime of a file from its sidecar, if any."""
+        path = Path(path)
+        parent = path.parent
+        try:
+            album = self._albums[parent]
+        except KeyError:
+            if not self._read:
+                return None
+            with self._lock:
+                if (album := self._albums.get(parent)) is None:
+                    album = self._albums[parent] = _read_album(parent)
+        return album.find(path.name)
+
+
+def get_takeout_index() -> TakeoutIndex:
+    """Get the Takeout index of this process."""
+    return _get_takeout_index(getpid())
+
+
+@cache
+def _get_takeout_index(_pid: int, /) -> TakeoutIndex:
+    return TakeoutIndex()
+
+
+def parse_sidecar(path: PathLike, /) -> tuple[str, dt.datetime] | None:
+    """Parse a sidecar into the name of its file, and when it was taken."""
+    path = Path(path)
+    return _parse_sidecar(path, path.read_bytes())
+
+
+def _parse_sidecar(
+    path: Path,
+    data: bytes | str,
+    /,
+) -> tuple[str, dt.datetime] | None:
+    try:
+        parsed = json.loads(data)
+        title = parsed["title"]
+        timestamp = int(parsed["photoTakenTime"]["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    datetime = dt.datetime.fromtimestamp(timestamp, tz=UTC)
+    if (match := search(r"\((\d+)\)\.json$", path.name)) is not None:
+        title_path = Path(title)
+        title = f"{title_path.stem}({match.group(1)}){title_path.suffix}"
+    return title, datetime
+
+
+def _read_album(dir_: Path, /) -> _Album:
+    album = _Album()
+    try:
+        entries = list(scandir(dir_))
+    except FileNotFoundError:
+        return album
+    for entry in entries:
+        if (
+            entry.name.endswith(".json")
+            and entry.is_file()
+            and ((parsed := parse_sidecar(entry.path)) is not None)
+        ):
+            album.add(*parsed)
+    return album
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from threading import Lock
+from time import perf_counter_ns
+from typing import Any, TypeVar, cast
+
+from tabulate import tabulate
+from utilities.atomicwrites import writer
+from utilities.pathlib import PathLike
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+_N_BUCKETS = 40
+
+
+class Histogram:
+    """A histogram of latencies, in power-of-two nanosecond buckets."""
+
+    __slots__ = ("_buckets", "_count", "_max", "_total")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._buckets = [0] * _N_BUCKETS
+        self._count = 0
+        self._max = 0
+        self._total = 0
+
+    # properties
+
+    @property
+    def count(self) -> int:
+        """The number of samples."""
+        return self._count
+
+    @property
+    def maximum(self) -> int:
+        """The maximum latency, in nanoseconds."""
+        return self._max
+
+    @property
+    def mean(self) -> float:
+        """The mean latency, in nanoseconds."""
+        return self._total / self._count if self._count >= 1 else 0.0
+
+    @property
+    def total(self) -> int:
+        """The total latency, in nanoseconds."""
+        return self._total
+
+    # methods
+
+    def add(self, ns: int, /) -> None:
+        """Add a sample."""
+        self._buckets[min(ns.bit_length(), _N_BUCKETS - 1)] += 1
+        self._count += 1
+        self._max = max(self._max, ns)
+        self._total += ns
+
+    def merge(self, other: Histogram, /) -> None:
+        """Merge the samples of another histogram into this one."""
+        for i, n in enumerate(other._buckets):  # noqa: SLF001
+            self._buckets[i] += n
+        self._count += other.count
+        self._max = max(self._max, other.maximum)
+        self._total += other.total
+
+    def quantile(self, q: float, /) -> int:
+        """Estimate a quantile, as the upper bound of its bucket."""
+        target, seen = q * self._count, 0
+        for i, n in enumerate(self._buckets):
+            if (seen := seen + n) >= target and seen >= 1:
+                return min(2**i, self._max)
+        return 0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a dictionary, for dumping."""
+        return {
+            "count": self._count,
+            "total_ns": self._total,
+            "max_ns": self._max,
+            "buckets": {
+                f"<{2**i}": n for i, n in enumerate(self._buckets) if n >= 1
+            },
+        }
+
+
+class Timings:
+    """Latency histograms of the stages of a session."""
+
+    __slots__ = ("_histograms", "_lock")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._histograms: dict[str, Histogram] = {}
+        self._lock = Lock()
+
+    def __getitem__(self, stage: str, /) -> Histogram:
+        return self._histograms[stage]
+
+    def __len__(self) -> int:
+        return len(self._histograms)
+
+    # methods
+
+    def add(self, stage: str, ns: int, /) -> None:
+        """Record the latency of a stage."""
+        with self._lock:
+            try:
+                histogram = self._histograms[stage]
+            except KeyError:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.add(ns)
+
+    def clear(self) -> None:
+        """Clear all the histograms."""
+        with self._lock:
+            self._histograms.clear()
+
+    def merge(self, histograms: Mapping[str, Histogram], /) -> None:
+        """Merge in histograms, such as those taken from another process."""
+        with self._lock:
+            for stage, other in histograms.items():
+                try:
+                    histogram = self._histograms[stage]
+                except KeyError:
+                    histogram = self._histograms[stage] = Histogram()
+                histogram.merge(other)
+
+    def dump(self, path: PathLike, /) -> None:
+        """Dump the histograms to a JSON file, atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with writer(path, overwrite=True) as temp:
+            _ = temp.write_text(json.dumps(self.to_dict(), indent=2))
+
+    def summary(self) -> str:
+        """Summarize the histograms as a table, in milliseconds."""
+        with self._lock:
+            items = sorted(
+                self._histograms.items(),
+                key=lambda x: x[1].total,
+                reverse=True,
+            )
+            rows = [
+                (
+                    stage,
+                    h.count,
+                    h.total / 1e6,
+                    h.mean / 1e6,
+                    h.quantile(0.5) / 1e6,
+                    h.quantile(0.99) / 1e6,
+                    h.maximum / 1e6,
+                )
+                for stage, h in items
+            ]
+        return tabulate(
+            rows,
+            headers=["stage", "count", "total", "mean", "p50", "p99", "max"],
+            floatfmt=".2f",
+        )
+
+    def take(self) -> dict[str, Histogram]:
+        """Take the histograms, leaving these timings empty."""
+        with self._lock:
+            histograms = self._histograms
+            self._histograms = {}
+        return histograms
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        """Convert to a dictionary, for dumping."""
+        with self._lock:
+            return {k: v.to_dict() for k, v in self._histograms.items()}
+
+
+TIMINGS = Timings()
+
+
+@contextmanager
+def timer(stage: str, /) -> Iterator[None]:
+    """Time a block of code as a stage."""
+    start = perf_counter_ns()
+    try:
+        yield
+    finally:
+        TIMINGS.add(stage, perf_counter_ns() - start)
+
+
+def timed(stage: str, /) -> Callable[[_F], _F]:
+    """Time a function as a stage."""
+
+    def decorator(func: _F, /) -> _F:
+        @wraps(func)
+        def wrapped(*args: Any, **kwargs: Any) -> Any:
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                TIMINGS.add(stage, perf_counter_ns() - start)
+
+        return cast(_F, wrapped)
+
+    return decorator
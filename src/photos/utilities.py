@@ -1,116 +1,217 @@
 from __future__ import annotations
 
 import datetime as dt
+from collections.abc import Callable, Iterable, Mapping
 from contextlib import suppress
 from dataclasses import dataclass
-from datetime.timezone import utc
 from fractions import Fraction
+from functools import cache
+from os import walk
 from pathlib import Path
 from random import shuffle
 from re import search
-from shutil import rmtree
-from typing import Any, Literal, get_args, get_origin
+from typing import TYPE_CHECKING, Any, Literal, get_args, get_origin
 
-import pyexiv2
 from beartype.door import die_if_unbearable
 from beartype.roar import BeartypeAbbyHintViolation
+from boltons.fileutils import atomic_rename
 from loguru import logger
 from PIL.ExifTags import TAGS
 from PIL.Image import Image as PILImage
+from PIL.Image import Transpose
 from PIL.Image import open as _open
 from PIL.ImageOps import contain
 from pyexiv2 import Image as pyexiv2Image
+from pyexiv2 import ImageData as pyexiv2ImageData
+from utilities.datetime import UTC
 from utilities.pathlib import PathLike, ensure_suffix
 from utilities.re import extract_group
 
+from photos.cache import get_metadata_cache
 from photos.constants import (
-    EXIF_TAGS_PYEXVI2,
     PATH_MONTHLY,
     PATH_STASH,
-    PATHS_BAD_EXIF,
     THUMBNAIL_SIZE,
 )
+from photos.scanner import is_png, sample, scan
+from photos.takeout import TakeoutIndex, get_takeout_index
+from photos.timing import timed
 from photos.types import FractionOrZero, Zero
 
+if TYPE_CHECKING:
+    from photos.headers import HeaderMetadata
+
+
+# bumped whenever the sources change, so as not to serve stale paths
+_KEY_PATH_MONTHLY = "path_monthly:3"
+
 
 def get_file_size(path: PathLike, /) -> int:
     """Get the size of a file."""
     return Path(path).stat().st_size
 
 
+@timed("exif")
 def get_parsed_exif_tags(path: PathLike, /) -> dict[str, Any]:
-    """Get the parsed EXIF tags of a file."""
-    return get_parsed_exif_tags_pillow(path) | get_parsed_exif_tags_pyexiv2(
+    """Get the parsed EXIF tags of a file, consulting the cache first."""
+    return get_metadata_cache().get_or_compute(
         path,
+        "tags",
+        lambda: get_parsed_exif_tags_pillow(path)
+        | get_parsed_exif_tags_pyexiv2(path),
     )
 
 
-def get_parsed_exif_tags_pillow(path: PathLike, /) -> dict[str, Any]:
+@timed("exif_pillow")
+def get_parsed_exif_tags_pillow(
+    path: PathLike | PILImage,
+    /,
+) -> dict[str, Any]:
     """Get the parsed EXIF tags of a file using Pillow."""
-    tags = get_raw_exif_tags_pillow(path)
+    return parse_exif_tags_pillow(get_raw_exif_tags_pillow(path))
+
+
+def parse_exif_tags_pillow(raw: Mapping[str, Any], /) -> dict[str, Any]:
+    """Parse the raw EXIF tags from Pillow."""
+    tags = dict(raw)
     for key in {"DateTime"}:
         with suppress(KeyError):
             tags[key] = dt.datetime.strptime(
                 tags[key],
                 "%Y:%m:%d %H:%M:%S",
-            ).astimezone(utc)
+            ).astimezone(UTC)
     for key in {"XResolution", "YResolution"}:
         with suppress(KeyError):
             tags[key] = float(tags[key])
     return tags
 
 
-def get_parsed_exif_tags_pyexiv2(  # noqa: C901
-    path: PathLike,
+@timed("exif_pyexiv2")
+def get_parsed_exif_tags_pyexiv2(
+    path: PathLike | pyexiv2Image | pyexiv2ImageData,
     /,
 ) -> dict[str, Any]:
     """Get the parsed EXIF tags of a file using pyexiv2."""
-    tags = {
-        k: v
-        for k, v in get_raw_exif_tags_pyexiv2(path).items()
-        if not is_hex(k) and v != ""
-    }
-    for key, cls in EXIF_TAGS_PYEXVI2.items():
+    return parse_exif_tags_pyexiv2(get_raw_exif_tags_pyexiv2(path))
+
+
+def parse_exif_tags_pyexiv2(raw: Mapping[str, Any], /) -> dict[str, Any]:
+    """Parse the raw EXIF tags from pyexiv2.
+
+    Only the tags which are present are visited; each is converted using the
+    table compiled from `EXIF_TAGS_PYEXVI2` upon first use.
+    """
+    converters = _get_converters_pyexiv2()
+    tags: dict[str, Any] = {}
+    for key, text in raw.items():
+        if (text == "") or is_hex(key):
+            continue
         try:
-            text = tags[key]
+            convert = converters[key]
         except KeyError:
-            pass
+            tags[key] = text
         else:
-            if cls is int:
-                tags[key] = int(text)
-            elif cls is FractionOrZero:
-                tags[key] = to_fraction_or_zero(text)
-            elif cls is dt.date:
-                tags[key] = to_date(text)
-            elif cls is dt.datetime:
-                tags[key] = to_datetime(text)
-            elif get_origin(cls) is list:
-                (cls,) = get_args(cls)
-                if cls is int:
-                    tags[key] = list(map(int, text.split()))
-                elif cls is FractionOrZero:
-                    tags[key] = list(map(to_fraction_or_zero, text.split()))
+            tags[key] = convert(text)
     return tags
 
 
+def _get_created(
+    path: Path,
+    header: HeaderMetadata | None,
+    /,
+) -> dt.datetime | None:
+    """Get the creation time of a PNG, reading its headers if not given."""
+    from photos.headers import HeaderError, read_header_metadata
+
+    if header is not None:
+        return header.created
+    if not is_png(path):
+        return None
+    try:
+        return read_header_metadata(path).created
+    except HeaderError:
+        return None
+
+
+def _get_converter(cls: Any, /) -> Callable[[str], Any] | None:
+    """Get the converter for a type in the EXIF tags table."""
+    if cls is int:
+        return int
+    if cls is FractionOrZero:
+        return to_fraction_or_zero
+    if cls is dt.date:
+        return to_date
+    if cls is dt.datetime:
+        return to_datetime
+    if get_origin(cls) is list:
+        (inner,) = get_args(cls)
+        if (convert := _get_converter(inner)) is not None:
+            return lambda text: list(map(convert, text.split()))
+    return None
+
+
 def get_datetime(path: PathLike, /) -> dt.datetime | None:
     """Get the datetime of a file."""
     raise NotImplementedError(path)
 
 
-def get_path_monthly(path: PathLike, /) -> PathMonthly | None:
-    """Get the monthly path of a file."""
+def get_path_monthly(
+    path: PathLike,
+    /,
+    *,
+    tags: Mapping[str, Any] | None = None,
+    header: HeaderMetadata | None = None,
+) -> PathMonthly | None:
+    """Get the monthly path of a file, consulting the cache first.
+
+    The sources are ranked: a Google Takeout sidecar, then the EXIF tags, then
+    the creation time of a PNG, and then the filename. If the parsed EXIF tags
+    are already known, then they may be passed in to avoid re-opening the
+    file; likewise the headers, from which the creation time is taken.
+    """
     path = Path(path)
+    return get_metadata_cache().get_or_compute(
+        path,
+        _KEY_PATH_MONTHLY,
+        lambda: compute_path_monthly(
+            path,
+            tags=tags,
+            created=_get_created(path, header),
+        ),
+    )
+
+
+def compute_path_monthly(
+    path: Path,
+    /,
+    *,
+    tags: Mapping[str, Any] | None = None,
+    created: dt.datetime | None = None,
+    takeout: TakeoutIndex | None = None,
+) -> PathMonthly | None:
+    """Compute the monthly path of a file, bypassing the cache.
+
+    The sidecars are looked up in `takeout`, which by default is the Takeout
+    index of this process.
+    """
+    if takeout is None:
+        takeout = get_takeout_index()
+    if (date := takeout.get_datetime(path)) is not None:
+        return PathMonthly(path, date, "Takeout")
+    if tags is None:
+        tags = get_parsed_exif_tags(path)
     with suppress(KeyError):
-        date = get_parsed_exif_tags(path)["DateTime"]
+        date = tags["DateTime"]
         return PathMonthly(path, date, "EXIF")
+    if created is not None:
+        return PathMonthly(path, created, "PNG")
     for pattern, fmt in [
         (r"(\d{4}-\d{2}-\d{2} \d{2}\.\d{2}\.\d{2})", "%Y-%m-%d %H.%M.%S"),
         (r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})", "%Y-%m-%d %H:%M:%S"),
     ]:
         with suppress(ValueError):
             as_str = extract_group(pattern, path.name)
-            date = dt.datetime.strptime(as_str, fmt).astimezone(utc)
+            date = dt.datetime.strptime(as_str, fmt).astimezone(UTC)
             return PathMonthly(path, date, "filename")
     return None
 
@@ -121,7 +222,7 @@ class PathMonthly:
 
     path: Path
     datetime: dt.datetime
-    source: Literal["EXIF", "filename"]
+    source: Literal["Takeout", "EXIF", "PNG", "filename"]
 
     def __post_init__(self) -> None:
         date = self.datetime
@@ -139,35 +240,55 @@ def get_path_stash(path: Path, /) -> Path:
     return PATH_STASH.joinpath(path.name)
 
 
-def get_paths_randomly(path: PathLike, /) -> list[Path]:
-    """Get the paths randomly."""
-    paths = list(Path(path).rglob("*"))
+@timed("scan")
+def get_paths_randomly(
+    path: PathLike,
+    /,
+    *,
+    k: int | None = None,
+) -> list[Path]:
+    """Get the supported paths randomly; a sample of `k` if given."""
+    if k is not None:
+        return [e.path for e in sample(path, k)]
+    paths = [e.path for e in scan(path)]
     shuffle(paths)
     return paths
 
 
-def get_raw_exif_tags_pillow(path: PathLike, /) -> dict[str, Any]:
+def get_raw_exif_tags_pillow(path: PathLike | PILImage, /) -> dict[str, Any]:
     """Get the raw EXIF tags using Pillow."""
-    return {
-        TAGS[k]: v
-        for k, v in open_image_pillow(path).getexif().items()
-        if k in TAGS
-    }
+    if isinstance(path, PILImage):
+        exif = path.getexif()
+    else:
+        with _open(Path(path)) as image:
+            exif = image.getexif()
+    return {TAGS[k]: v for k, v in exif.items() if k in TAGS}
 
 
-def get_raw_exif_tags_pyexiv2(path: PathLike, /) -> dict[str, Any]:
+def get_raw_exif_tags_pyexiv2(
+    path: PathLike | pyexiv2Image | pyexiv2ImageData,
+    /,
+) -> dict[str, Any]:
     """Get the raw EXIF tags using pyexiv2."""
-    return open_image_pyexiv2(path).read_exif()
+    if isinstance(path, pyexiv2Image | pyexiv2ImageData):
+        return path.read_exif()
+    image = open_image_pyexiv2(path)
+    try:
+        return image.read_exif()
+    finally:
+        image.close()
 
 
-def get_resolution(image: PILImage, /) -> tuple[int, int]:
-    """Get the resolution of an image."""
-    return image.size
+def get_resolution(path: PathLike | PILImage, /) -> tuple[int, int]:
+    """Get the resolution of an image, consulting the cache for paths."""
+    if isinstance(path, PILImage):
+        return path.size
 
+    def compute() -> tuple[int, int]:
+        with _open(Path(path)) as image:
+            return image.size
 
-def is_bad_exif(path: PathLike, /) -> bool:
-    """Check if a path is bad."""
-    return Path(path) in PATHS_BAD_EXIF
+    return get_metadata_cache().get_or_compute(path, "resolution", compute)
 
 
 def is_instance(obj: Any, cls: Any, /) -> bool:
@@ -181,25 +302,12 @@ def is_instance(obj: Any, cls: Any, /) -> bool:
 
 
 def is_hex(text: str, /) -> bool:
-    """Check if a str is hex."""
-    return bool(search(r"0x\w{4}", text))
-
-
-def is_jpg(path: PathLike, /) -> bool:
-    """Check if a file is a JPG."""
-    return Path(path).suffix == ".jpg"
-
-
-def is_png(path: PathLike, /) -> bool:
-    """Check if a file is a PNG."""
-    return Path(path).suffix == ".png"
-
-
-def is_supported(path: PathLike, /) -> bool:
-    """Check if a file is supported."""
-    return (is_jpg(path) or is_png(path)) and not is_bad_exif(path)
+    """Check if a str, or the last component of a dotted key, is hex."""
+    _, _, last = text.rpartition(".")
+    return last.startswith("0x")
 
 
+@timed("open_image")
 def open_image_pillow(path: PathLike, /) -> PILImage:
     """Open a Pillow image."""
     with Path(path).open(mode="rb") as file:
@@ -213,25 +321,74 @@ def open_image_pyexiv2(path: PathLike, /) -> pyexiv2Image:
     return pyexiv2Image(Path(path).as_posix())
 
 
-def make_thumbnail(image: PILImage, /) -> PILImage:
-    """Make a thumbnail."""
-    return contain(image, THUMBNAIL_SIZE)
+@timed("thumbnail")
+def make_thumbnail(image: PILImage, /, *, rotate: int = 0) -> PILImage:
+    """Make a thumbnail.
+
+    If the image has yet to be decoded, then JPEGs are decoded at the smallest
+    DCT scale which still covers the thumbnail. Any rotation is applied to the
+    thumbnail, rather than the original.
+    """
+    _ = image.draft(None, THUMBNAIL_SIZE)
+    return rotate_image(contain(image, THUMBNAIL_SIZE), rotate)
 
 
+@timed("purge")
 def purge_empty_directories(path: PathLike, /) -> None:
-    """Purge the empty directories under a path."""
-    while True:
-        try:
-            p = next(
-                p
-                for p in get_paths_randomly(path)
-                if p.is_dir() and len(list(p.iterdir())) == 0
-            )
-        except StopIteration:
-            break
-        else:
-            logger.info("Purging:\n{}", p)
-            rmtree(p)
+    """Purge the empty directories under a path, in a single bottom-up pass."""
+    root = Path(path)
+    purged: set[Path] = set()
+    for dirpath, dirnames, filenames in walk(root, topdown=False):
+        if (
+            ((dir_ := Path(dirpath)) != root)
+            and (len(filenames) == 0)
+            and all(Path(dirpath, d) in purged for d in dirnames)
+            and _purge_directory(dir_)
+        ):
+            purged.add(dir_)
+
+
+@timed("purge")
+def purge_empty_parents(
+    paths: Iterable[PathLike],
+    /,
+    *,
+    root: PathLike,
+) -> None:
+    """Purge the given directories, and their ancestors, if they are empty.
+
+    Only the directories strictly under the root are considered.
+    """
+    root = Path(root)
+    for path in map(Path, paths):
+        for p in [path, *path.parents]:
+            if (root not in p.parents) or not _purge_directory(p):
+                break
+
+
+def _purge_directory(path: Path, /) -> bool:
+    try:
+        path.rmdir()
+    except OSError:
+        return False
+    logger.info("Purging:\n{}", path)
+    return True
+
+
+@timed("rename")
+def rename(path: PathLike, dest: PathLike, /) -> None:
+    """Rename a file atomically."""
+    atomic_rename(Path(path), Path(dest))
+
+
+def rotate_image(image: PILImage, angle: int, /) -> PILImage:
+    """Rotate an image anticlockwise, transposing for right angles."""
+    _, angle = divmod(angle, 360)
+    if angle == 0:
+        return image
+    with suppress(KeyError):
+        return image.transpose(_TRANSPOSES[angle])
+    return image.rotate(angle, expand=True)
 
 
 def to_date(date: str, /) -> dt.date:
@@ -239,10 +396,10 @@ def to_date(date: str, /) -> dt.date:
     if date == "0000:00:00":
         return dt.date.min
     if search(r"^\d{2}\d{2}$", date):
-        return dt.datetime.strptime(date, "%y%m").astimezone(utc).date()
+        return dt.datetime.strptime(date, "%y%m").astimezone(UTC).date()
     if search(r"^\d{4}:\d{2}:\d{3}$", date):
         return to_date(date[:-1])
-    return dt.datetime.strptime(date, "%Y:%m:%d").astimezone(utc).date()
+    return dt.datetime.strptime(date, "%Y:%m:%d").astimezone(UTC).date()
 
 
 def to_datetime(date: str, /) -> dt.datetime:
@@ -251,7 +408,7 @@ def to_datetime(date: str, /) -> dt.datetime:
         return dt.datetime.min
     if date == "9999:99:99 00:00:00":
         return dt.datetime.max
-    return dt.datetime.strptime(date, "%Y:%m:%d %H:%M:%S").astimezone(utc)
+    return dt.datetime.strptime(date, "%Y:%m:%d %H:%M:%S").astimezone(UTC)
 
 
 def to_fraction_or_zero(frac: str, /) -> FractionOrZero:
@@ -262,9 +419,39 @@ def to_fraction_or_zero(frac: str, /) -> FractionOrZero:
         return Zero()
 
 
+def format_exif_datetime(datetime: dt.datetime, /) -> str:
+    """Format a datetime as an EXIF string."""
+    return datetime.strftime("%4Y:%m:%d %H:%M:%S")
+
+
 def write_datetime(path: PathLike, datetime: dt.datetime, /) -> None:
     """Write a datetime to a file."""
-    image = pyexiv2.Image(Path(path).as_posix())
-    image.modify_exif(
-        {"Exif.Image.DateTime": datetime.strftime("%4Y:%m:%d %H:%M:%S")},
-    )
+    write_exif(path, {"Exif.Image.DateTime": format_exif_datetime(datetime)})
+
+
+def write_exif(path: PathLike, updates: Mapping[str, str], /) -> None:
+    """Write EXIF tags to a file, with a single open."""
+    image = open_image_pyexiv2(path)
+    try:
+        image.modify_exif(dict(updates))
+    finally:
+        image.close()
+
+
+@cache
+def _get_converters_pyexiv2() -> dict[str, Callable[[str], Any]]:
+    """Compile the converters from the EXIF tags table."""
+    from photos.exif_tags import EXIF_TAGS_PYEXVI2
+
+    return {
+        key: convert
+        for key, cls in EXIF_TAGS_PYEXVI2.items()
+        if (convert := _get_converter(cls)) is not None
+    }
+
+
+_TRANSPOSES = {
+    90: Transpose.ROTATE_90,
+    180: Transpose.ROTATE_180,
+    270: Transpose.ROTATE_270,
+}
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from os import scandir
+from pathlib import Path
+from random import shuffle
+
+from utilities.pathlib import PathLike
+
+from photos.scanner import is_supported_entry
+
+
+class WorkQueue:
+    """A shuffled queue of the files to be organized.
+
+    The tree is walked once upon construction. Thereafter, the modification
+    times of its directories are used to detect changes, so that only those
+    directories which have changed are re-scanned.
+    """
+
+    __slots__ = ("_root", "_paths", "_seen", "_mtimes", "_vacated")
+
+    def __init__(
+        self,
+        root: PathLike,
+        /,
+        *,
+        exclude: Iterable[Path] = (),
+    ) -> None:
+        super().__init__()
+        self._root = Path(root)
+        self._paths: list[Path] = []
+        self._seen: set[Path] = set(exclude)
+        self._mtimes: dict[Path, int] = {}
+        self._vacated: set[Path] = set()
+        self._scan(self._root)
+        shuffle(self._paths)
+
+    def __iter__(self) -> Iterator[Path]:
+        while True:
+            try:
+                yield self.pop()
+            except EmptyWorkQueueError:
+                return
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    # properties
+
+    @property
+    def root(self) -> Path:
+        """The root directory."""
+        return self._root
+
+    @property
+    def vacated(self) -> set[Path]:
+        """The directories from which files have been discarded."""
+        return self._vacated
+
+    # methods
+
+    def discard(self, path: PathLike, /) -> None:
+        """Record that a file has been moved, stashed or deleted."""
+        path = Path(path)
+        self._seen.add(path)
+        self._vacated.add(parent := path.parent)
+        if parent in self._mtimes:
+            try:
+                self._mtimes[parent] = parent.stat().st_mtime_ns
+            except FileNotFoundError:
+                del self._mtimes[parent]
+
+    def peek(self, n: int, /) -> list[Path]:
+        """Peek at the next files, without popping them."""
+        return self._paths[: -n - 1 : -1] if n >= 1 else []
+
+    def pop(self) -> Path:
+        """Pop the next file."""
+        while True:
+            while len(self._paths) >= 1:
+                if (path := self._paths.pop()).is_file():
+                    return path
+            if not self._refresh():
+                raise EmptyWorkQueueError(self._root)
+
+    def _refresh(self) -> bool:
+        """Re-scan the directories which have changed."""
+        changed: list[Path] = []
+        for dir_, mtime in list(self._mtimes.items()):
+            try:
+                current = dir_.stat().st_mtime_ns
+            except FileNotFoundError:
+                del self._mtimes[dir_]
+            else:
+                if current != mtime:
+                    changed.append(dir_)
+        n = len(self._paths)
+        for dir_ in changed:
+            self._scan(dir_)
+        shuffle(self._paths)
+        return len(self._paths) > n
+
+    def _scan(self, dir_: Path, /) -> None:
+        """Scan a directory, descending only into unseen subdirectories."""
+        try:
+            self._mtimes[dir_] = dir_.stat().st_mtime_ns
+            entries = list(scandir(dir_))
+        except FileNotFoundError:
+            _ = self._mtimes.pop(dir_, None)
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if (path := Path(entry.path)) not in self._mtimes:
+                    self._scan(path)
+            elif is_supported_entry(entry) and (
+                (path := Path(entry.path)) not in self._seen
+            ):
+                self._seen.add(path)
+                self._paths.append(path)
+
+
+class EmptyWorkQueueError(IndexError):
+    """Raised when no supported files remain in a work queue."""
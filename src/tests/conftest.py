@@ -1,4 +1,7 @@
+from collections.abc import Iterator
+
 from hypothesis import settings
+from pytest import MonkeyPatch, TempPathFactory, fixture
 
 settings.register_profile(
     "default",
@@ -7,3 +10,15 @@ settings.register_profile(
     print_blob=True,
 )
 settings.load_profile("default")
+
+
+@fixture(autouse=True, scope="session")
+def _metadata_cache(tmp_path_factory: TempPathFactory) -> Iterator[None]:
+    path = tmp_path_factory.mktemp("cache").joinpath("metadata.sqlite")
+    with MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr("photos.cache.PATH_METADATA_CACHE", path)
+        monkeypatch.setattr(
+            "photos.catalog.PATH_CATALOG",
+            path.with_name("catalog.sqlite"),
+        )
+        yield
@@ -0,0 +1,87 @@
+import datetime as dt
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, get_args, get_origin
+
+from PIL.Image import Exif, effect_noise, merge
+
+from photos.constants import EXIF_TAGS_PYEXVI2
+from photos.types import FractionOrZero
+
+_PREFIXES = {
+    "Apple": ("Exif.Image.", "Exif.Photo.", "Exif.GPSInfo."),
+    "Canon": ("Exif.Image.", "Exif.Photo.", "Exif.Canon", "Exif.Thumbnail."),
+    "Takeout": ("Exif.Image.",),
+}
+_HEX_KEYS = {
+    "Apple": ["Exif.Apple.0x0001", "Exif.Apple.0x0008"],
+    "Canon": ["Exif.Canon.0x0019", "Exif.Canon.0x0031"],
+    "Takeout": [],
+}
+_MODELS = {"Apple": "iPhone 12", "Canon": "Canon EOS 5D Mark IV"}
+_TAG_MAKE, _TAG_MODEL, _TAG_DATETIME = 0x010F, 0x0110, 0x0132
+PROFILES = tuple(_PREFIXES)
+
+
+def _get_text(cls: Any, /) -> str:
+    if cls is int:
+        return "1"
+    if cls is FractionOrZero:
+        return "1/250"
+    if cls is dt.date:
+        return "2020:01:02"
+    if cls is dt.datetime:
+        return "2020:01:02 03:04:05"
+    if get_origin(cls) is list:
+        (inner,) = get_args(cls)
+        return " ".join(_get_text(inner) for _ in range(4))
+    return "text"
+
+
+def get_raw_tags_pyexiv2(profile: str, /) -> dict[str, str]:
+    """Get raw pyexiv2 tags resembling those of a camera profile."""
+    tags = {
+        key: _get_text(cls)
+        for key, cls in EXIF_TAGS_PYEXVI2.items()
+        if key.startswith(_PREFIXES[profile])
+    }
+    tags["Exif.Image.Make"] = profile
+    return tags | {key: "0 0 0 0" for key in _HEX_KEYS[profile]}
+
+
+def make_library(
+    root: Path,
+    /,
+    *,
+    count: int = 20,
+    size: tuple[int, int] = (640, 480),
+    suffixes: Iterable[str] = (".jpg", ".png"),
+    profiles: Iterable[str] = PROFILES,
+    dirs: int = 4,
+) -> list[Path]:
+    """Make a synthetic library of images, cycling through the profiles.
+
+    Canon- and Apple-like files carry an EXIF make, model and datetime;
+    Takeout-like files carry no EXIF, only a datetime in their name.
+    """
+    suffixes, profiles = list(suffixes), list(profiles)
+    start = dt.datetime(2020, 1, 2, 3, 4, 5)  # noqa: DTZ001
+    paths: list[Path] = []
+    for i in range(count):
+        profile = profiles[i % len(profiles)]
+        suffix = suffixes[i % len(suffixes)]
+        datetime = start + dt.timedelta(minutes=i)
+        exif = Exif()
+        if profile == "Takeout":
+            name = f"{datetime:%Y-%m-%d %H.%M.%S}{suffix}"
+        else:
+            name = f"IMG_{i:04}{suffix}"
+            exif[_TAG_MAKE] = profile
+            exif[_TAG_MODEL] = _MODELS[profile]
+            exif[_TAG_DATETIME] = f"{datetime:%Y:%m:%d %H:%M:%S}"
+        path = root.joinpath(f"dir{i % dirs}", name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        image = merge("RGB", [effect_noise(size, 64) for _ in range(3)])
+        image.save(path, exif=exif)
+        paths.append(path)
+    return paths
@@ -0,0 +1,130 @@
+import datetime as dt
+import json
+import tarfile
+from collections.abc import Callable
+from io import BytesIO
+from pathlib import Path
+from zipfile import ZipFile, ZipInfo
+
+from pytest import MonkeyPatch, fixture, mark
+from utilities.datetime import UTC
+
+from photos.archive import (
+    ArchiveMember,
+    decide_member,
+    is_archive,
+    iter_members,
+    organize_archive,
+)
+from photos.takeout import TakeoutIndex
+
+_JPG = b"\xff\xd8\xff\xd9"
+_TIMESTAMP = 1_600_000_000
+_SIDECAR = json.dumps(
+    {"title": "a.jpg", "photoTakenTime": {"timestamp": str(_TIMESTAMP)}},
+).encode()
+_MEMBERS = {
+    "Takeout/Album/a.jpg": _JPG,
+    "Takeout/Album/a.jpg.json": _SIDECAR,
+    "Takeout/Album/b.jpg": _JPG,
+    "Takeout/Album/c.txt": b"text",
+}
+
+
+@fixture(autouse=True)
+def _library(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    for name in ["Monthly", "Stash"]:
+        monkeypatch.setattr(
+            f"photos.utilities.PATH_{name.upper()}",
+            tmp_path.joinpath(name),
+        )
+    monkeypatch.setattr(
+        "photos.archive.PATH_MONTHLY",
+        tmp_path.joinpath("Monthly"),
+    )
+
+
+def _make_zip(path: Path, /) -> Path:
+    with ZipFile(path, mode="w") as zip_file:
+        for name, data in _MEMBERS.items():
+            zip_file.writestr(name, data)
+    return path
+
+
+def _make_tgz(path: Path, /) -> Path:
+    with tarfile.open(path, mode="w:gz") as tar_file:
+        # as in Takeout, each sidecar follows its file
+        for name, data in _MEMBERS.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar_file.addfile(info, BytesIO(data))
+    return path
+
+
+def test_is_archive() -> None:
+    assert is_archive("takeout.zip")
+    assert is_archive("takeout.tar.gz")
+    assert not is_archive("a.jpg")
+
+
+@mark.parametrize("make", [_make_zip, _make_tgz])
+def test_iter_members(tmp_path: Path, make: Callable[[Path], Path]) -> None:
+    archive = make(tmp_path.joinpath("takeout"))
+    members = {m.name: file.read() for m, file in iter_members(archive)}
+    assert members == _MEMBERS
+
+
+def test_iter_members_zeroed_date(tmp_path: Path) -> None:
+    archive = tmp_path.joinpath("takeout.zip")
+    with ZipFile(archive, mode="w") as zip_file:
+        zip_file.writestr(ZipInfo("a.jpg", (1980, 0, 0, 0, 0, 0)), _JPG)
+    ((member, _),) = iter_members(archive)
+    assert member.mtime == archive.stat().st_mtime
+
+
+def test_decide_member_sidecar() -> None:
+    member = ArchiveMember(Path("takeout.zip"), "Album/a.jpg", len(_JPG), 0.0)
+    takeout = TakeoutIndex(read=False)
+    takeout.add_sidecar(member.path.with_name("a.jpg.json"), _SIDECAR)
+    decision = decide_member(member, _JPG, takeout=takeout)
+    assert not decision.stash
+    assert decision.destination is not None
+    assert decision.destination.name == "2020-09-13 12:26:40.jpg"
+
+
+def test_decide_member_stash() -> None:
+    member = ArchiveMember(Path("takeout.zip"), "Album/b.jpg", len(_JPG), 0.0)
+    decision = decide_member(member, _JPG)
+    assert decision.stash
+
+
+@mark.parametrize("make", [_make_zip, _make_tgz])
+def test_organize_archive(
+    tmp_path: Path,
+    make: Callable[[Path], Path],
+) -> None:
+    archive = make(tmp_path.joinpath("takeout"))
+    result = organize_archive(archive)
+    assert (result.moved, result.stashed, result.failed) == (1, 1, 0)
+    datetime = dt.datetime.fromtimestamp(_TIMESTAMP, tz=UTC)
+    (moved,) = tmp_path.joinpath("Monthly").rglob("*.jpg")
+    assert moved.parent.name == datetime.strftime("%Y-%m")
+    assert moved.read_bytes() == _JPG
+    assert tmp_path.joinpath("Stash", "b.jpg").read_bytes() == _JPG
+    assert organize_archive(archive).skipped == 2
+
+
+def test_organize_archive_albums(tmp_path: Path) -> None:
+    archive = tmp_path.joinpath("takeout.tgz")
+    with tarfile.open(archive, mode="w:gz") as tar_file:
+        for name, data in [
+            ("Takeout/Album/a.jpg", _JPG),
+            ("Takeout/Other/b.jpg", _JPG),
+            ("Takeout/Album/a.jpg.json", _SIDECAR),
+        ]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar_file.addfile(info, BytesIO(data))
+    result = organize_archive(archive)
+    assert (result.moved, result.stashed, result.failed) == (0, 2, 0)
+    assert list(tmp_path.joinpath("Stash").glob(".*")) == []
@@ -0,0 +1,115 @@
+from pathlib import Path
+from shutil import copy
+
+from pytest import MonkeyPatch, fixture
+
+from photos.batch import BatchResult, Decision, _apply, decide, organize_auto
+from photos.monthly import MonthlyIndex
+from photos.utilities import get_path_stash
+
+PATH_ASSET = Path(__file__).parent.joinpath("assets", "2020-09-25 20.18.18.png")
+
+
+def _touch(path: Path, /, *, data: bytes = b"") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _ = path.write_bytes(data)
+    return path
+
+
+@fixture()
+def library(tmp_path: Path, monkeypatch: MonkeyPatch) -> Path:
+    root = tmp_path.joinpath("library")
+    for name in ["Monthly", "Stash"]:
+        monkeypatch.setattr(
+            f"photos.utilities.PATH_{name.upper()}",
+            root.joinpath(name),
+        )
+    monkeypatch.setattr("photos.batch.PATH_MONTHLY", root.joinpath("Monthly"))
+    return root
+
+
+def test_decide(tmp_path: Path) -> None:
+    path = tmp_path.joinpath(PATH_ASSET.name)
+    _ = copy(PATH_ASSET, path)
+    decision = decide(path)
+    assert decision.error is None
+    assert decision.stash
+    assert decision.destination == get_path_stash(path)
+
+
+def test_decide_error(tmp_path: Path) -> None:
+    decision = decide(tmp_path.joinpath("missing.jpg"))
+    assert decision.destination is None
+    assert decision.error is not None
+
+
+def test_organize_auto_purges_all(library: Path) -> None:
+    uploads = library.joinpath("uploads")
+    uploads.joinpath("a", "b").mkdir(parents=True)
+    _ = organize_auto(uploads, workers=1)
+    assert list(uploads.iterdir()) == []
+
+
+def test_organize_auto_purges_vacated(library: Path) -> None:
+    uploads = library.joinpath("uploads")
+    uploads.joinpath("a", "b").mkdir(parents=True)
+    _ = organize_auto(uploads, workers=1, purge_all=False)
+    assert uploads.joinpath("a", "b").is_dir()
+
+
+def test_batch_result() -> None:
+    result = BatchResult(moved=1, stashed=2, skipped=3, failed=4, duration=2.0)
+    assert "deleted" in result.summary()
+    assert result.total == 10
+    assert result.throughput == 5.0
+
+
+class TestApply:
+    def test_move(self, tmp_path: Path) -> None:
+        path = _touch(tmp_path.joinpath("uploads", "a.jpg"), data=b"a")
+        dest = tmp_path.joinpath("Monthly", "2020-01", "a.jpg")
+        monthly = MonthlyIndex(tmp_path.joinpath("Monthly"))
+        result = BatchResult()
+        assert _apply(Decision(path, dest, stash=False), result, monthly)
+        assert result.moved == 1
+        assert dest.read_bytes() == b"a"
+        assert dest in monthly
+
+    def test_move_collision_renamed(self, tmp_path: Path) -> None:
+        path = _touch(tmp_path.joinpath("uploads", "a.jpg"), data=b"a")
+        dest = _touch(tmp_path.joinpath("Monthly", "2020-01", "a.jpg"))
+        monthly = MonthlyIndex(tmp_path.joinpath("Monthly"))
+        result = BatchResult()
+        assert _apply(Decision(path, dest, stash=False), result, monthly)
+        assert result.moved == 1
+        assert dest.read_bytes() == b""
+        assert dest.with_name("a (1).jpg").read_bytes() == b"a"
+
+    def test_move_identical_skipped(self, tmp_path: Path) -> None:
+        path = _touch(tmp_path.joinpath("uploads", "a.jpg"), data=b"a")
+        root = tmp_path.joinpath("Monthly")
+        dest = _touch(root.joinpath("2020-01", "a.jpg"), data=b"a")
+        monthly = MonthlyIndex(root)
+        result = BatchResult()
+        assert not _apply(Decision(path, dest, stash=False), result, monthly)
+        assert result.skipped == 1
+        assert path.exists()
+        assert not dest.with_name("a (1).jpg").exists()
+
+    def test_stash_existing_skipped(self, tmp_path: Path) -> None:
+        path = _touch(tmp_path.joinpath("uploads", "a.jpg"), data=b"a")
+        dest = _touch(tmp_path.joinpath("Stash", "a.jpg"), data=b"b")
+        monthly = MonthlyIndex(tmp_path.joinpath("Monthly"))
+        result = BatchResult()
+        assert not _apply(Decision(path, dest, stash=True), result, monthly)
+        assert result.skipped == 1
+        assert path.read_bytes() == b"a"
+        assert dest.read_bytes() == b"b"
+
+    def test_failed(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("a.jpg")
+        monthly = MonthlyIndex(tmp_path.joinpath("Monthly"))
+        result = BatchResult()
+        decision = Decision(path, None, stash=False, error="error")
+        assert not _apply(decision, result, monthly)
+        assert result.failed == 1
@@ -0,0 +1,121 @@
+from collections.abc import Callable
+from itertools import count
+from pathlib import Path
+from shutil import copy, copytree
+from typing import Any
+
+from PIL.Image import open as _open
+from pytest import MonkeyPatch, TempPathFactory, fixture, mark
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from photos.batch import organize_auto
+from photos.headers import read_header_metadata
+from photos.scanner import scan
+from photos.utilities import (
+    get_parsed_exif_tags_pillow,
+    get_parsed_exif_tags_pyexiv2,
+    make_thumbnail,
+    parse_exif_tags_pyexiv2,
+    purge_empty_directories,
+)
+from tests.synthetic import PROFILES, get_raw_tags_pyexiv2, make_library
+
+pytestmark = mark.slow
+
+
+@fixture(scope="module")
+def library(tmp_path_factory: TempPathFactory) -> Path:
+    root = tmp_path_factory.mktemp("library")
+    _ = make_library(root, count=40, size=(1024, 768))
+    return root
+
+
+@mark.parametrize("profile", PROFILES)
+def test_parse_exif_tags_pyexiv2(
+    benchmark: BenchmarkFixture,
+    profile: str,
+) -> None:
+    raw = get_raw_tags_pyexiv2(profile)
+    tags = benchmark(parse_exif_tags_pyexiv2, raw)
+    assert tags["Exif.Image.Make"] == profile
+
+
+def test_scan(benchmark: BenchmarkFixture, library: Path) -> None:
+    entries = benchmark(lambda: [(e.path, e.size) for e in scan(library)])
+    assert len(entries) == 40
+
+
+@mark.parametrize(
+    "func",
+    [get_parsed_exif_tags_pillow, get_parsed_exif_tags_pyexiv2],
+    ids=["pillow", "pyexiv2"],
+)
+def test_get_parsed_exif_tags(
+    benchmark: BenchmarkFixture,
+    library: Path,
+    func: Callable[[Path], dict[str, Any]],
+) -> None:
+    paths = [e.path for e in scan(library)]
+    results = benchmark(lambda: list(map(func, paths)))
+    assert len(results) == len(paths)
+
+
+def test_read_header_metadata(
+    benchmark: BenchmarkFixture,
+    library: Path,
+) -> None:
+    paths = [e.path for e in scan(library)]
+    results = benchmark(lambda: list(map(read_header_metadata, paths)))
+    assert len(results) == len(paths)
+
+
+def test_make_thumbnail(benchmark: BenchmarkFixture, library: Path) -> None:
+    paths = [e.path for e in scan(library)]
+
+    def thumbnail_all() -> set[tuple[int, int]]:
+        sizes: set[tuple[int, int]] = set()
+        for path in paths:
+            with _open(path) as image:
+                sizes.add(make_thumbnail(image).size)
+        return sizes
+
+    assert benchmark(thumbnail_all) == {(600, 450)}
+
+
+def test_organize_auto(
+    benchmark: BenchmarkFixture,
+    library: Path,
+    tmp_path: Path,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    rounds = count()
+
+    def setup() -> tuple[tuple[Any, ...], dict[str, Any]]:
+        root = tmp_path.joinpath(str(next(rounds)))
+        for name in ["Monthly", "Stash"]:
+            monkeypatch.setattr(
+                f"photos.utilities.PATH_{name.upper()}",
+                root.joinpath(name),
+            )
+        uploads = root.joinpath("uploads")
+        _ = copytree(library, uploads, copy_function=copy)
+        return (uploads,), {"workers": 2}
+
+    result = benchmark.pedantic(organize_auto, setup=setup, rounds=3)
+    assert result.failed == 0
+
+
+def test_purge_empty_directories(
+    benchmark: BenchmarkFixture,
+    tmp_path: Path,
+) -> None:
+    rounds = count()
+
+    def setup() -> tuple[tuple[Any, ...], dict[str, Any]]:
+        root = tmp_path.joinpath(str(next(rounds)))
+        for i in range(20):
+            for j in range(20):
+                root.joinpath(str(i), str(j)).mkdir(parents=True)
+        return (root,), {}
+
+    benchmark.pedantic(purge_empty_directories, setup=setup, rounds=5)
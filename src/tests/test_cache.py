@@ -0,0 +1,66 @@
+from os import utime
+from pathlib import Path
+
+from pytest import raises
+
+from photos.cache import MetadataCache, get_metadata_cache
+
+
+class TestMetadataCache:
+    def test_get_and_put(self, tmp_path: Path) -> None:
+        cache = MetadataCache(tmp_path.joinpath("metadata.sqlite"))
+        path = tmp_path.joinpath("file")
+        path.touch()
+        with raises(KeyError):
+            _ = cache.get(path, "field")
+        cache.put(path, "field", {"a": 1})
+        assert cache.get(path, "field") == {"a": 1}
+
+    def test_persistent(self, tmp_path: Path) -> None:
+        db = tmp_path.joinpath("metadata.sqlite")
+        path = tmp_path.joinpath("file")
+        path.touch()
+        MetadataCache(db).put(path, "field", 1)
+        assert MetadataCache(db).get(path, "field") == 1
+
+    def test_invalidated_by_size(self, tmp_path: Path) -> None:
+        cache = MetadataCache(tmp_path.joinpath("metadata.sqlite"))
+        path = tmp_path.joinpath("file")
+        path.touch()
+        cache.put(path, "field", 1)
+        _ = path.write_bytes(b"data")
+        with raises(KeyError):
+            _ = cache.get(path, "field")
+
+    def test_invalidated_by_mtime(self, tmp_path: Path) -> None:
+        cache = MetadataCache(tmp_path.joinpath("metadata.sqlite"))
+        path = tmp_path.joinpath("file")
+        path.touch()
+        cache.put(path, "field", 1)
+        stat = path.stat()
+        utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        with raises(KeyError):
+            _ = cache.get(path, "field")
+
+    def test_get_or_compute(self, tmp_path: Path) -> None:
+        cache = MetadataCache(tmp_path.joinpath("metadata.sqlite"))
+        path = tmp_path.joinpath("file")
+        path.touch()
+        calls: list[None] = []
+
+        def func() -> int:
+            calls.append(None)
+            return 1
+
+        assert cache.get_or_compute(path, "field", func) == 1
+        assert cache.get_or_compute(path, "field", func) == 1
+        assert len(calls) == 1
+
+    def test_get_or_compute_missing_file(self, tmp_path: Path) -> None:
+        cache = MetadataCache(tmp_path.joinpath("metadata.sqlite"))
+        path = tmp_path.joinpath("file")
+        assert cache.get_or_compute(path, "field", lambda: 1) == 1
+
+
+def test_get_metadata_cache() -> None:
+    assert isinstance(get_metadata_cache(), MetadataCache)
@@ -0,0 +1,74 @@
+from pathlib import Path
+from shutil import copy
+
+from pytest import MonkeyPatch
+
+from photos.camera_uploads import Organizer, _Data
+from photos.catalog import Catalog
+from photos.display import NullDisplay
+from photos.duplicates import DuplicateIndex
+from photos.journal import Journal, JournalEntry, read_journal
+from photos.monthly import MonthlyIndex
+
+PATH_ASSET = Path(__file__).parent.joinpath("assets", "2020-09-25 20.18.18.png")
+
+
+def _touch(path: Path, /) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return path
+
+
+class TestData:
+    def test_fast_tags(self, tmp_path: Path) -> None:
+        _ = copy(PATH_ASSET, path := tmp_path.joinpath(PATH_ASSET.name))
+        data = _Data(path)
+        assert data.source == "filename"
+        assert "tags" not in vars(data.metadata)
+        assert data.tags == data.metadata.tags
+
+    def test_present(self, tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+        _ = copy(PATH_ASSET, path := tmp_path.joinpath(PATH_ASSET.name))
+        monthly = tmp_path.joinpath("Monthly")
+        monkeypatch.setattr("photos.utilities.PATH_MONTHLY", monthly)
+        first = _Data(path, monthly=MonthlyIndex(monthly))
+        assert (dest := first.destination) is not None
+        assert not first.present
+        dest.parent.mkdir(parents=True)
+        _ = copy(PATH_ASSET, dest)
+        data = _Data(path, monthly=MonthlyIndex(monthly))
+        assert data.present
+        assert data.destination == data.duplicate == dest
+
+
+class TestOrganizer:
+    def test_resume(self, tmp_path: Path) -> None:
+        dir_ = tmp_path.joinpath("uploads")
+        moved = _touch(dir_.joinpath("a.png"))
+        _ = copy(PATH_ASSET, moved)
+        skipped = _touch(dir_.joinpath("b.jpg"))
+        gone = dir_.joinpath("c.jpg")
+        dest = tmp_path.joinpath("Monthly", "2020-09", "a.png")
+        journal = tmp_path.joinpath("journal.jsonl")
+        with Journal(journal) as j:
+            j.append(JournalEntry("move", moved, destination=dest))
+            j.append(JournalEntry("skip", skipped))
+            j.append(JournalEntry("delete", gone))
+        organizer = Organizer()
+        organizer.duplicates = DuplicateIndex()
+        organizer.monthly = MonthlyIndex(tmp_path.joinpath("Monthly"))
+        catalog = Catalog(tmp_path.joinpath("catalog.sqlite"))
+        organizer.start(
+            dir_,
+            journal=journal,
+            timings=tmp_path.joinpath("timings.json"),
+            display=NullDisplay(),
+            catalog=catalog,
+        )
+        assert not moved.exists()
+        assert dest.exists()
+        assert dest in catalog
+        assert skipped.exists()
+        assert organizer.skips == {skipped}
+        actions = {e.path: e.action for e in read_journal(journal)}
+        assert actions == {moved: "done", skipped: "skip"}
@@ -0,0 +1,92 @@
+import datetime as dt
+from pathlib import Path
+from shutil import copy
+
+from pytest import raises
+from utilities.datetime import UTC
+
+from photos.catalog import Catalog, CatalogEntry
+from photos.metadata import Metadata
+
+PATH_ASSET = Path(__file__).parent.joinpath("assets", "2020-09-25 20.18.18.png")
+
+
+def _entry(
+    name: str,
+    year: int,
+    /,
+    *,
+    make: str | None = None,
+    model: str | None = None,
+) -> CatalogEntry:
+    return CatalogEntry(
+        Path(name),
+        1,
+        2,
+        dt.datetime(year, 1, 1, tzinfo=UTC),
+        "EXIF",
+        make,
+        model,
+        640,
+        480,
+        "partial",
+        "full",
+    )
+
+
+class TestCatalogEntry:
+    def test_from_metadata_moved(self, tmp_path: Path) -> None:
+        _ = copy(PATH_ASSET, path := tmp_path.joinpath(PATH_ASSET.name))
+        metadata = Metadata(path)
+        assert metadata.path_monthly is not None
+        dest = path.rename(tmp_path.joinpath("a.png"))
+        entry = CatalogEntry.from_metadata(metadata, path=dest)
+        assert entry.path == dest
+        assert entry.source == "filename"
+        assert entry.size == dest.stat().st_size
+
+
+class TestCatalog:
+    def test_add_and_get(self, tmp_path: Path) -> None:
+        catalog = Catalog(tmp_path.joinpath("catalog.sqlite"))
+        catalog.add(entry := _entry("a.jpg", 2015, make="Canon"))
+        assert len(catalog) == 1
+        assert "a.jpg" in catalog
+        assert catalog.get("a.jpg") == entry
+
+    def test_discard(self, tmp_path: Path) -> None:
+        catalog = Catalog(tmp_path.joinpath("catalog.sqlite"))
+        catalog.add(_entry("a.jpg", 2015))
+        catalog.discard("a.jpg")
+        with raises(KeyError):
+            _ = catalog.get("a.jpg")
+
+    def test_query(self, tmp_path: Path) -> None:
+        catalog = Catalog(tmp_path.joinpath("catalog.sqlite"))
+        catalog.add_many(
+            [
+                _entry("a.jpg", 2014, make="Canon", model="EOS"),
+                _entry("b.jpg", 2015, make="Canon", model="EOS"),
+                _entry("c.jpg", 2015, make="Apple", model="iPhone"),
+                _entry("d.jpg", 2016, make="Canon", model="PowerShot"),
+            ],
+        )
+        start = dt.datetime(2015, 1, 1, tzinfo=UTC)
+        end = dt.datetime(2016, 1, 1, tzinfo=UTC)
+        result = catalog.query(start=start, end=end, make="Canon")
+        assert [e.path for e in result] == [Path("b.jpg")]
+        result = catalog.query(make="Canon", model="EOS")
+        assert [e.path for e in result] == [Path("a.jpg"), Path("b.jpg")]
+        assert len(catalog.query()) == 4
+
+    def test_backfill(self, tmp_path: Path) -> None:
+        root = tmp_path.joinpath("Monthly")
+        root.mkdir()
+        _ = copy(PATH_ASSET, path := root.joinpath(PATH_ASSET.name))
+        catalog = Catalog(tmp_path.joinpath("catalog.sqlite"))
+        assert catalog.backfill(root, workers=1) == 1
+        assert catalog.get(path).source == "filename"
+        assert catalog.backfill(root, workers=1) == 0
+        path.unlink()
+        assert catalog.backfill(root, workers=1) == 0
+        assert len(catalog) == 0
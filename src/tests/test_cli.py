@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from pytest import CaptureFixture, MonkeyPatch, raises
+
+from photos import __version__
+from photos.cli import main
+
+
+def test_version(capsys: CaptureFixture[str]) -> None:
+    with raises(SystemExit) as error:
+        _ = main(["--version"])
+    assert error.value.code == 0
+    assert __version__ in capsys.readouterr().out
+
+
+def test_auto_empty(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    for name in ["batch", "utilities"]:
+        monkeypatch.setattr(
+            f"photos.{name}.PATH_MONTHLY",
+            tmp_path.joinpath("Monthly"),
+        )
+    assert main(["auto", str(tmp_path), "--workers", "1"]) == 0
+
+
+def test_organize_archive(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("takeout.zip")
+    _ = path.write_bytes(b"")
+    with raises(SystemExit) as error:
+        _ = main(["organize", str(path)])
+    assert error.value.code == 2
@@ -0,0 +1,39 @@
+from io import StringIO
+
+from PIL.Image import new
+from pytest import mark
+
+from photos.display import (
+    Display,
+    DisplayName,
+    KittyDisplay,
+    NullDisplay,
+    SixelDisplay,
+    get_display,
+    to_sixel,
+)
+
+
+@mark.parametrize(
+    ("name", "cls"),
+    [("kitty", KittyDisplay), ("sixel", SixelDisplay), ("none", NullDisplay)],
+)
+def test_get_display(name: DisplayName, cls: type[Display]) -> None:
+    assert isinstance(get_display(name), cls)
+
+
+def test_display_is_abstract() -> None:
+    assert Display.__abstractmethods__ == frozenset({"show"})
+
+
+def test_kitty() -> None:
+    file = StringIO()
+    KittyDisplay(file=file).show(new("RGB", (100, 100), "red"))
+    assert file.getvalue().startswith("\x1b_Ga=T,f=100,m=0;")
+
+
+def test_to_sixel() -> None:
+    sixel = to_sixel(new("RGB", (10, 7), "red"))
+    assert sixel.startswith('\x1bPq"1;1;10;7')
+    assert sixel.endswith("\x1b\\")
+    assert sixel.count("-") == 2
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from photos.duplicates import (
+    DuplicateIndex,
+    find_duplicates,
+    get_full_hash,
+    get_partial_hash,
+)
+
+
+def _write(path: Path, data: bytes, /) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _ = path.write_bytes(data)
+    return path
+
+
+class TestFindDuplicates:
+    def test_main(self, tmp_path: Path) -> None:
+        data = bytes(range(256)) * 1000
+        a = _write(tmp_path.joinpath("a.jpg"), data)
+        b = _write(tmp_path.joinpath("b.jpg"), data)
+        c = _write(tmp_path.joinpath("c.jpg"), data[:-1] + b"x")
+        d = _write(tmp_path.joinpath("d.jpg"), b"other")
+        result = find_duplicates([a, b, c, d])
+        assert [set(g) for g in result] == [{a, b}]
+
+    def test_middle_differs(self, tmp_path: Path) -> None:
+        data = bytearray(2**20)
+        a = _write(tmp_path.joinpath("a.jpg"), bytes(data))
+        data[2**19] = 1
+        b = _write(tmp_path.joinpath("b.jpg"), bytes(data))
+        assert get_partial_hash(a) == get_partial_hash(b)
+        assert get_full_hash(a) != get_full_hash(b)
+        assert find_duplicates([a, b]) == []
+
+
+class TestDuplicateIndex:
+    def test_find(self, tmp_path: Path) -> None:
+        library = tmp_path.joinpath("library")
+        existing = _write(library.joinpath("2020-01", "a.jpg"), b"data")
+        _ = _write(library.joinpath("2020-01", "b.jpg"), b"atad")
+        index = DuplicateIndex.from_library(library)
+        assert len(index) == 2
+        new = _write(tmp_path.joinpath("uploads", "c.jpg"), b"data")
+        assert index.find(new) == existing
+        other = _write(tmp_path.joinpath("uploads", "d.jpg"), b"dat")
+        assert index.find(other) is None
+
+    def test_add_and_discard(self, tmp_path: Path) -> None:
+        path = _write(tmp_path.joinpath("a.jpg"), b"data")
+        index = DuplicateIndex()
+        index.add(path)
+        assert path in index
+        index.discard(path)
+        assert path not in index
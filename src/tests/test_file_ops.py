@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from photos.file_ops import FileOp, FileOpExecutor
+
+
+class TestFileOpExecutor:
+    def test_move(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("a.jpg")
+        path.touch()
+        dest = tmp_path.joinpath("sub", "b.jpg")
+        executor = FileOpExecutor()
+        _ = executor.submit(FileOp("move", path, dest))
+        executor.close()
+        assert not path.exists()
+        assert dest.exists()
+        assert executor.pop_failures() == []
+
+    def test_on_success(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("a.jpg")
+        path.touch()
+        dest = tmp_path.joinpath("b.jpg")
+        succeeded: list[bool] = []
+        executor = FileOpExecutor()
+        for _ in range(2):
+            _ = executor.submit(
+                FileOp("move", path, dest),
+                on_success=lambda: succeeded.append(dest.exists()),
+            )
+        executor.close()
+        assert succeeded == [True]
+        assert len(executor.pop_failures()) == 1
+
+    def test_delete(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("a.jpg")
+        path.touch()
+        executor = FileOpExecutor()
+        _ = executor.submit(FileOp("delete", path))
+        executor.close()
+        assert not path.exists()
+
+    def test_failure(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("a.jpg")
+        executor = FileOpExecutor()
+        _ = executor.submit(FileOp("delete", path))
+        executor.join()
+        (failure,) = executor.pop_failures()
+        assert failure.op.path == path
+        assert "FileNotFoundError" in failure.error
+        assert executor.pop_failures() == []
+        executor.close()
+
+    def test_ordered_per_destination(self, tmp_path: Path) -> None:
+        dest = tmp_path.joinpath("dest.jpg")
+        paths = [tmp_path.joinpath(f"{i}.jpg") for i in range(20)]
+        for i, path in enumerate(paths):
+            _ = path.write_text(str(i))
+        seen: list[str] = []
+        executor = FileOpExecutor(max_concurrency=8)
+        for path in paths:
+            # each move must land before the delete which frees its destination
+            _ = executor.submit(
+                FileOp("move", path, dest),
+                on_success=lambda: seen.append(dest.read_text()),
+            )
+            _ = executor.submit(FileOp("delete", dest))
+        executor.close()
+        assert seen == [str(i) for i in range(20)]
+        assert not dest.exists()
+        assert executor.pop_failures() == []
@@ -0,0 +1,191 @@
+import datetime as dt
+from pathlib import Path
+from struct import pack
+
+from pytest import MonkeyPatch, mark, raises
+from utilities.datetime import UTC
+
+from photos.headers import (
+    FAST_TAGS,
+    HeaderError,
+    parse_header_metadata,
+    read_header_metadata,
+)
+from photos.utilities import (
+    get_parsed_exif_tags_pillow,
+    get_path_monthly,
+    get_resolution,
+)
+from tests.synthetic import make_library
+
+
+def _make_tiff(entries: list[tuple[int, int, bytes]], /) -> bytes:
+    """Make a big-endian TIFF structure with a single IFD."""
+    head = b"MM" + pack(">HI", 42, 8)
+    out_of_line = 8 + 2 + 12 * len(entries) + 4
+    ifd, extra = pack(">H", len(entries)), b""
+    for tag, type_, value in entries:
+        count = len(value) if type_ == 2 else 1
+        if len(value) <= 4:
+            ifd += pack(">HHI", tag, type_, count) + value.ljust(4, b"\x00")
+        else:
+            offset = out_of_line + len(extra)
+            ifd += pack(">HHII", tag, type_, count, offset)
+            extra += value
+    return head + ifd + pack(">I", 0) + extra
+
+
+def _make_jpg(path: Path, tiff: bytes, /) -> Path:
+    app1 = b"Exif\x00\x00" + tiff
+    sof = pack(">BHHB", 8, 480, 640, 3) + b"\x00" * 9
+    _ = path.write_bytes(
+        b"\xff\xd8"
+        b"\xff\xe1"
+        + pack(">H", len(app1) + 2)
+        + app1
+        + b"\xff\xc0"
+        + pack(">H", len(sof) + 2)
+        + sof
+        + b"\xff\xd9",
+    )
+    return path
+
+
+def _make_png(path: Path, *chunks: tuple[bytes, bytes]) -> Path:
+    ihdr = pack(">IIBBBBB", 640, 480, 8, 2, 0, 0, 0)
+    data = b"\x89PNG\r\n\x1a\n"
+    for type_, body in [(b"IHDR", ihdr), *chunks, (b"IEND", b"")]:
+        data += pack(">I", len(body)) + type_ + body + b"\x00" * 4
+    _ = path.write_bytes(data)
+    return path
+
+
+class TestReadHeaderMetadata:
+    def test_jpg(self, tmp_path: Path) -> None:
+        tiff = _make_tiff(
+            [
+                (0x010F, 2, b"Canon\x00"),
+                (0x0112, 3, pack(">H", 6)),
+                (0x0132, 2, b"2020:01:02 03:04:05\x00"),
+                (0x8769, 4, pack(">I", 0)),
+            ],
+        )
+        path = _make_jpg(tmp_path.joinpath("a.jpg"), tiff)
+        header = read_header_metadata(path)
+        assert header.resolution == (640, 480)
+        assert header.tags["Make"] == "Canon"
+        assert header.tags["Orientation"] == 6
+        datetime = dt.datetime(2020, 1, 2, 3, 4, 5)  # noqa: DTZ001
+        assert header.tags["DateTime"] == datetime.astimezone(UTC)
+        assert "ExifOffset" not in header.tags
+
+    def test_jpg_without_exif(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("a.jpg")
+        _ = path.write_bytes(b"\xff\xd8\xff\xd9")
+        header = read_header_metadata(path)
+        assert header.tags == {}
+        assert header.resolution is None
+
+    @mark.parametrize("data", [b"", b"not a jpeg", b"\xff\xd8\x00\x00\x00"])
+    def test_malformed(self, tmp_path: Path, data: bytes) -> None:
+        _ = (path := tmp_path.joinpath("a.jpg")).write_bytes(data)
+        with raises(HeaderError):
+            _ = read_header_metadata(path)
+
+    def test_png(self, tmp_path: Path) -> None:
+        tiff = _make_tiff([(0x010F, 2, b"Apple\x00")])
+        path = _make_png(
+            tmp_path.joinpath("a.png"),
+            (b"tEXt", b"Creation Time\x002020-01-02T03:04:05+00:00"),
+            (b"IDAT", b"not even zlib" * 1000),
+            (b"eXIf", tiff),
+        )
+        header = read_header_metadata(path)
+        assert header.resolution == (640, 480)
+        assert header.tags == {"Make": "Apple"}
+        assert header.created == dt.datetime(2020, 1, 2, 3, 4, 5, tzinfo=UTC)
+
+    def test_png_itxt(self, tmp_path: Path) -> None:
+        text = b"date:create\x00\x00\x00en\x00\x002020-01-02T03:04:05+00:00"
+        path = _make_png(tmp_path.joinpath("a.png"), (b"iTXt", text))
+        header = read_header_metadata(path)
+        assert header.created == dt.datetime(2020, 1, 2, 3, 4, 5, tzinfo=UTC)
+
+    @mark.parametrize(
+        "text",
+        [b"2020-01-02T03:04:05", b"2020:01:02 03:04:05"],
+    )
+    def test_png_naive(self, tmp_path: Path, text: bytes) -> None:
+        path = _make_png(
+            tmp_path.joinpath("a.png"),
+            (b"tEXt", b"Creation Time\x00" + text),
+        )
+        header = read_header_metadata(path)
+        naive = dt.datetime(2020, 1, 2, 3, 4, 5)  # noqa: DTZ001
+        assert header.created == naive.astimezone(UTC)
+        assert header.created is not None
+        assert header.created.tzinfo is UTC
+
+    def test_png_truncated(self, tmp_path: Path) -> None:
+        path = _make_png(tmp_path.joinpath("a.png"))
+        _ = path.write_bytes(path.read_bytes()[:-12])
+        with raises(HeaderError):
+            _ = read_header_metadata(path)
+
+    def test_unsupported(self, tmp_path: Path) -> None:
+        with raises(HeaderError):
+            _ = read_header_metadata(tmp_path.joinpath("a.gif"))
+
+    def test_agrees_with_pillow(self, tmp_path: Path) -> None:
+        for path in make_library(tmp_path, count=6):
+            header = read_header_metadata(path)
+            tags = get_parsed_exif_tags_pillow(path)
+            assert header.tags == {
+                k: v for k, v in tags.items() if k in FAST_TAGS
+            }
+            assert header.resolution == get_resolution(path)
+
+
+class TestParseHeaderMetadata:
+    def test_jpg_truncated(self, tmp_path: Path) -> None:
+        tiff = _make_tiff([(0x010F, 2, b"Canon\x00")])
+        data = _make_jpg(tmp_path.joinpath("a.jpg"), tiff).read_bytes()[:-21]
+        with raises(HeaderError):
+            _ = parse_header_metadata("a.jpg", data)
+        header = parse_header_metadata("a.jpg", data, truncated=True)
+        assert header.tags["Make"] == "Canon"
+        assert header.resolution is None
+
+    @mark.parametrize(
+        "text",
+        [b"2020-01-02T03:04:05", b"2020:01:02 03:04:05"],
+    )
+    def test_png_naive(self, tmp_path: Path, text: bytes) -> None:
+        path = _make_png(
+            tmp_path.joinpath("a.png"),
+            (b"tEXt", b"Creation Time\x00" + text),
+        )
+        header = parse_header_metadata(path, path.read_bytes())
+        naive = dt.datetime(2020, 1, 2, 3, 4, 5)  # noqa: DTZ001
+        assert header.created == naive.astimezone(UTC)
+        assert header.created is not None
+        assert header.created.tzinfo is UTC
+
+    def test_png_truncated(self, tmp_path: Path) -> None:
+        data = _make_png(tmp_path.joinpath("a.png")).read_bytes()[:-12]
+        with raises(HeaderError):
+            _ = parse_header_metadata("a.png", data)
+        header = parse_header_metadata("a.png", data, truncated=True)
+        assert header.resolution == (640, 480)
+
+
+def test_path_monthly_created(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    cache = tmp_path.joinpath("metadata.sqlite")
+    monkeypatch.setattr("photos.cache.PATH_METADATA_CACHE", cache)
+    path = _make_png(
+        tmp_path.joinpath("a.png"),
+        (b"tEXt", b"Creation Time\x002020-01-02T03:04:05+00:00"),
+    )
+    pm = get_path_monthly(path, tags={})
+    assert pm is not None
+    assert pm.source == "PNG"
@@ -0,0 +1,116 @@
+from pathlib import Path
+
+from photos.file_ops import FileOp
+from photos.journal import (
+    Journal,
+    JournalEntry,
+    compact_journal,
+    read_journal,
+    replay_journal,
+)
+
+
+def _touch(path: Path, /) -> Path:
+    path.touch()
+    return path
+
+
+class TestJournal:
+    def test_round_trip(self, tmp_path: Path) -> None:
+        entries = [
+            JournalEntry("move", tmp_path.joinpath("a"), Path("b")),
+            JournalEntry("rotate", tmp_path.joinpath("c"), rotate=90),
+        ]
+        with Journal(path := tmp_path.joinpath("journal.jsonl")) as journal:
+            for entry in entries:
+                journal.append(entry)
+        assert list(read_journal(path)) == entries
+
+    def test_appends_across_sessions(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("journal.jsonl")
+        for name in ["a", "b"]:
+            with Journal(path) as journal:
+                journal.append(JournalEntry("skip", tmp_path.joinpath(name)))
+        assert len(list(read_journal(path))) == 2
+
+    def test_torn_line_ignored(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("journal.jsonl")
+        with Journal(path) as journal:
+            journal.append(entry := JournalEntry("skip", tmp_path))
+        with path.open(mode="a") as file:
+            _ = file.write('{"action": "sk')
+        assert list(read_journal(path)) == [entry]
+
+    def test_missing(self, tmp_path: Path) -> None:
+        assert list(read_journal(tmp_path.joinpath("journal.jsonl"))) == []
+
+
+class TestReplayJournal:
+    def test_skips(self, tmp_path: Path) -> None:
+        kept = _touch(tmp_path.joinpath("a.jpg"))
+        gone = tmp_path.joinpath("b.jpg")
+        state = replay_journal(
+            [JournalEntry("skip", kept), JournalEntry("skip", gone)],
+        )
+        assert state.skips == {kept}
+
+    def test_pending(self, tmp_path: Path) -> None:
+        path = _touch(tmp_path.joinpath("a.jpg"))
+        dest = tmp_path.joinpath("b.jpg")
+        state = replay_journal(
+            [JournalEntry("skip", path), JournalEntry("move", path, dest)],
+        )
+        assert state.skips == set()
+        assert state.pending == [FileOp("move", path, dest)]
+
+    def test_outcomes_dropped(self, tmp_path: Path) -> None:
+        done = _touch(tmp_path.joinpath("a.jpg"))
+        failed = _touch(tmp_path.joinpath("b.jpg"))
+        dest = tmp_path.joinpath("c.jpg")
+        state = replay_journal(
+            [
+                JournalEntry("move", done, dest),
+                JournalEntry("move", failed, dest),
+                JournalEntry("done", done),
+                JournalEntry("failed", failed),
+            ],
+        )
+        assert state.pending == []
+
+    def test_deletes_reverified(self, tmp_path: Path) -> None:
+        kept = tmp_path.joinpath("a.jpg")
+        _ = kept.write_bytes(b"data")
+        changed = tmp_path.joinpath("b.jpg")
+        _ = changed.write_bytes(b"other")
+        dup = tmp_path.joinpath("c.jpg")
+        _ = dup.write_bytes(b"data")
+        state = replay_journal(
+            [
+                JournalEntry("delete", kept, dup),
+                JournalEntry("delete", changed, dup),
+                JournalEntry("delete", dup),
+            ],
+        )
+        assert state.pending == [FileOp("delete", kept, dup)]
+
+    def test_rotations(self, tmp_path: Path) -> None:
+        path = _touch(tmp_path.joinpath("a.jpg"))
+        state = replay_journal(
+            [
+                JournalEntry("rotate", path, rotate=90),
+                JournalEntry("rotate", path, rotate=180),
+            ],
+        )
+        assert state.rotations == {path: 180}
+
+
+def test_compact_journal(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("journal.jsonl")
+    kept = _touch(tmp_path.joinpath("a.jpg"))
+    with Journal(path) as journal:
+        for _ in range(3):
+            journal.append(JournalEntry("skip", kept))
+        journal.append(JournalEntry("skip", tmp_path.joinpath("b.jpg")))
+    state = compact_journal(path)
+    assert state.skips == {kept}
+    assert list(read_journal(path)) == [JournalEntry("skip", kept)]
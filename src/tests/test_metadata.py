@@ -0,0 +1,81 @@
+import io
+from pathlib import Path
+from typing import Any
+
+from pytest import MonkeyPatch, fixture, mark
+
+from photos.constants import THUMBNAIL_SIZE
+from photos.metadata import Metadata
+
+PATH_ASSET = Path(__file__).parent.joinpath("assets", "2020-09-25 20.18.18.png")
+
+
+class _Counter:
+    def __init__(self) -> None:
+        super().__init__()
+        self.opens = 0
+        self.bytes_read = 0
+
+
+@fixture()
+def counter(monkeypatch: MonkeyPatch) -> _Counter:
+    counter = _Counter()
+    open_ = io.open
+
+    class _File(io.BufferedReader):
+        def read(self, size: int | None = -1, /) -> bytes:
+            data = super().read(size)
+            counter.bytes_read += len(data)
+            return data
+
+    def wrapped(file: Any, mode: str = "r", *args: Any, **kwargs: Any) -> Any:
+        counter.opens += 1
+        if mode == "rb":
+            return _File(io.FileIO(file, mode="rb"))
+        return open_(file, mode, *args, **kwargs)
+
+    monkeypatch.setattr(io, "open", wrapped)
+    return counter
+
+
+class TestMetadata:
+    def test_single_open(
+        self,
+        counter: _Counter,
+        monkeypatch: MonkeyPatch,
+        tmp_path: Path,
+    ) -> None:
+        path = tmp_path.joinpath("metadata.sqlite")
+        monkeypatch.setattr("photos.cache.PATH_METADATA_CACHE", path)
+        metadata = Metadata(PATH_ASSET)
+        _ = metadata.resolution
+        _ = metadata.tags
+        _ = metadata.path_monthly
+        assert counter.opens == 1
+        assert counter.bytes_read == PATH_ASSET.stat().st_size
+
+    def test_file_size(self) -> None:
+        assert Metadata(PATH_ASSET).file_size == PATH_ASSET.stat().st_size
+
+    def test_path_monthly(self) -> None:
+        pm = Metadata(PATH_ASSET).path_monthly
+        assert pm is not None
+        assert pm.source == "filename"
+
+    def test_thumbnail(self) -> None:
+        thumbnail = Metadata(PATH_ASSET).thumbnail
+        width, height = thumbnail.size
+        max_width, max_height = THUMBNAIL_SIZE
+        assert width <= max_width
+        assert height <= max_height
+
+    @mark.parametrize("rotate", [0, 90, 180, 270, -90])
+    def test_get_thumbnail(self, rotate: int) -> None:
+        metadata = Metadata(PATH_ASSET)
+        thumbnail = metadata.get_thumbnail(rotate=rotate)
+        width, height = metadata.thumbnail.size
+        if rotate % 180 == 0:
+            assert thumbnail.size == (width, height)
+        else:
+            assert thumbnail.size == (height, width)
+        assert metadata.get_thumbnail(rotate=rotate) is thumbnail
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+from photos.monthly import MonthlyIndex
+
+
+def _write(path: Path, data: bytes, /) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _ = path.write_bytes(data)
+    return path
+
+
+class TestMonthlyIndex:
+    def test_build(self, tmp_path: Path) -> None:
+        path = _write(tmp_path.joinpath("2020-01", "a.jpg"), b"data")
+        index = MonthlyIndex(tmp_path)
+        assert len(index) == 1
+        assert path in index
+
+    def test_resolve_free(self, tmp_path: Path) -> None:
+        index = MonthlyIndex(tmp_path.joinpath("monthly"))
+        src = _write(tmp_path.joinpath("src.jpg"), b"data")
+        dest = tmp_path.joinpath("monthly", "2020-01", "a.jpg")
+        assert index.resolve(src, dest) == (dest, False)
+
+    def test_resolve_collision(self, tmp_path: Path) -> None:
+        monthly = tmp_path.joinpath("monthly")
+        dest = _write(monthly.joinpath("2020-01", "a.jpg"), b"data")
+        _ = _write(monthly.joinpath("2020-01", "a (1).jpg"), b"atad")
+        index = MonthlyIndex(monthly)
+        src = _write(tmp_path.joinpath("src.jpg"), b"other")
+        assert index.resolve(src, dest) == (dest.with_name("a (2).jpg"), False)
+
+    def test_resolve_identical(self, tmp_path: Path) -> None:
+        monthly = tmp_path.joinpath("monthly")
+        dest = _write(monthly.joinpath("2020-01", "a.jpg"), b"data")
+        index = MonthlyIndex(monthly)
+        src = _write(tmp_path.joinpath("src.jpg"), b"data")
+        assert index.resolve(src, dest) == (dest, True)
+
+    def test_add_and_discard(self, tmp_path: Path) -> None:
+        index = MonthlyIndex(tmp_path)
+        path = tmp_path.joinpath("a.jpg")
+        index.add(path)
+        assert path in index
+        index.discard(path)
+        assert path not in index
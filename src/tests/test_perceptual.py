@@ -0,0 +1,99 @@
+from pathlib import Path
+from random import Random
+
+import numpy as np
+from PIL.Image import fromarray
+
+from photos.perceptual import BKTree, PerceptualIndex, get_dhash
+
+
+def _gradient(width: int, height: int, /) -> np.ndarray:
+    xs = np.linspace(0, 255, width)
+    ys = np.linspace(0, 255, height)
+    return (np.add.outer(ys, xs) / 2).astype(np.uint8)
+
+
+def _save(array: np.ndarray, path: Path, /) -> Path:
+    fromarray(array).save(path)
+    return path
+
+
+class TestGetDHash:
+    def test_rescaled_is_near(self) -> None:
+        large = fromarray(_gradient(640, 480))
+        small = large.resize((160, 120))
+        assert (get_dhash(large) ^ get_dhash(small)).bit_count() <= 4
+
+    def test_flipped_is_far(self) -> None:
+        image = fromarray(_gradient(640, 480))
+        flipped = fromarray(_gradient(640, 480)[:, ::-1].copy())
+        assert (get_dhash(image) ^ get_dhash(flipped)).bit_count() >= 32
+
+
+class TestBKTree:
+    def test_query(self) -> None:
+        rng = Random(0)
+        hashes = [rng.getrandbits(64) for _ in range(1000)]
+        tree = BKTree()
+        for i, hash_ in enumerate(hashes):
+            tree.add(hash_, Path(str(i)))
+        assert len(tree) == len(hashes)
+        target = hashes[0] ^ 0b1011
+        result = tree.query(target, max_distance=20)
+        expected = sorted(
+            (
+                (Path(str(i)), d)
+                for i, h in enumerate(hashes)
+                if (d := (h ^ target).bit_count()) <= 20
+            ),
+            key=lambda x: x[1],
+        )
+        assert sorted(result) == sorted(expected)
+        assert result[0] == (Path("0"), 3)
+
+    def test_same_hash(self) -> None:
+        tree = BKTree()
+        tree.add(0, Path("a"))
+        tree.add(0, Path("b"))
+        assert sorted(tree.query(0, max_distance=0)) == [
+            (Path("a"), 0),
+            (Path("b"), 0),
+        ]
+
+    def test_empty(self) -> None:
+        assert BKTree().query(0, max_distance=64) == []
+
+
+class TestPerceptualIndex:
+    def test_near_duplicate_found(self, tmp_path: Path) -> None:
+        gradient = _gradient(640, 480)
+        path = _save(gradient, tmp_path.joinpath("a.png"))
+        rescaled = tmp_path.joinpath("b.png")
+        fromarray(gradient).resize((160, 120)).save(rescaled)
+        index = PerceptualIndex()
+        for p in [path, rescaled]:
+            index.add(p)
+        assert len(index) == 2
+        ((found, distance),) = index.find(path, max_distance=4)
+        assert found == rescaled
+        assert distance <= 4
+
+    def test_distinct_not_found(self, tmp_path: Path) -> None:
+        gradient = _gradient(640, 480)
+        path = _save(gradient, tmp_path.joinpath("a.png"))
+        flipped = _save(
+            gradient[:, ::-1].copy(),
+            tmp_path.joinpath("b.png"),
+        )
+        index = PerceptualIndex()
+        for p in [path, flipped]:
+            index.add(p)
+        assert index.find(path) == []
+
+    def test_from_paths(self, tmp_path: Path) -> None:
+        gradient = _gradient(640, 480)
+        paths = [
+            _save(gradient, tmp_path.joinpath(f"{i}.png")) for i in range(2)
+        ]
+        index = PerceptualIndex.from_paths(paths, workers=1)
+        assert index.find(paths[0]) == [(paths[1], 0)]
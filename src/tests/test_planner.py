@@ -0,0 +1,169 @@
+from pathlib import Path
+from shutil import copy
+
+from pandas import DataFrame
+from pytest import MonkeyPatch
+
+from photos.planner import (
+    PLAN_COLUMNS,
+    apply_plan,
+    diff_plans,
+    make_plan,
+    read_plan,
+    write_plan,
+)
+
+PATH_ASSET = Path(__file__).parent.joinpath("assets", "2020-09-25 20.18.18.png")
+
+
+def _make_plan(*rows: tuple[object, ...]) -> DataFrame:
+    return DataFrame(list(rows), columns=PLAN_COLUMNS)
+
+
+def _row(
+    path: Path,
+    action: str,
+    dest: Path | None,
+    *,
+    dup: Path | None = None,
+) -> tuple[object, ...]:
+    stat = path.stat()
+    return (
+        path.as_posix(),
+        stat.st_size,
+        stat.st_mtime_ns,
+        action,
+        None if dest is None else dest.as_posix(),
+        None if dup is None else dup.as_posix(),
+        None,
+    )
+
+
+class TestApplyPlan:
+    def test_main(self, tmp_path: Path) -> None:
+        root = tmp_path.joinpath("root")
+        root.joinpath("sub").mkdir(parents=True)
+        moved = root.joinpath("sub", "a.jpg")
+        moved.touch()
+        deleted = root.joinpath("b.jpg")
+        deleted.touch()
+        dest = tmp_path.joinpath("monthly", "a.jpg")
+        plan = _make_plan(
+            _row(deleted, "delete", None, dup=dest),
+            _row(moved, "move", dest),
+        )
+        result = apply_plan(plan, root=root)
+        assert (result.moved, result.deleted) == (1, 1)
+        assert dest.exists()
+        assert not deleted.exists()
+        assert not root.joinpath("sub").exists()
+
+    def test_resumable(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("a.jpg")
+        path.touch()
+        plan = _make_plan(_row(path, "move", tmp_path.joinpath("b.jpg")))
+        assert apply_plan(plan, root=tmp_path).moved == 1
+        assert apply_plan(plan, root=tmp_path).skipped == 1
+
+    def test_changed_since_planning(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("a.jpg")
+        path.touch()
+        dup = tmp_path.joinpath("b.jpg")
+        dup.touch()
+        plan = _make_plan(_row(path, "delete", None, dup=dup))
+        _ = path.write_bytes(b"data")
+        assert apply_plan(plan, root=tmp_path).skipped == 1
+        assert path.exists()
+
+    def test_stash_taken(self, tmp_path: Path) -> None:
+        first, second = (tmp_path.joinpath(d, "a.jpg") for d in "xy")
+        for i, path in enumerate([first, second]):
+            path.parent.mkdir()
+            _ = path.write_bytes(bytes([i]))
+        dest = tmp_path.joinpath("stash", "a.jpg")
+        plan = _make_plan(
+            _row(first, "stash", dest),
+            _row(second, "stash", dest),
+        )
+        result = apply_plan(plan, root=tmp_path)
+        assert (result.stashed, result.skipped) == (1, 1)
+        assert dest.read_bytes() == b"\x00"
+        assert second.read_bytes() == b"\x01"
+
+    def test_move_taken(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("a.jpg")
+        _ = path.write_bytes(b"a")
+        dest = tmp_path.joinpath("monthly", "a.jpg")
+        dest.parent.mkdir()
+        _ = dest.write_bytes(b"b")
+        result = apply_plan(_make_plan(_row(path, "move", dest)), root=tmp_path)
+        assert result.skipped == 1
+        assert (path.read_bytes(), dest.read_bytes()) == (b"a", b"b")
+
+    def test_delete_duplicate_changed(self, tmp_path: Path) -> None:
+        path, dup = (tmp_path.joinpath(f"{x}.jpg") for x in "ab")
+        for p in [path, dup]:
+            _ = p.write_bytes(b"data")
+        plan = _make_plan(_row(path, "delete", None, dup=dup))
+        _ = dup.write_bytes(b"other")
+        assert apply_plan(plan, root=tmp_path).skipped == 1
+        assert path.exists()
+
+    def test_delete_duplicate_missing(self, tmp_path: Path) -> None:
+        path, dup = (tmp_path.joinpath(f"{x}.jpg") for x in "ab")
+        path.touch()
+        plan = _make_plan(_row(path, "delete", None, dup=dup))
+        assert apply_plan(plan, root=tmp_path).skipped == 1
+        assert path.exists()
+
+
+class TestMakePlan:
+    def test_duplicates_in_uploads(
+        self,
+        tmp_path: Path,
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        for name in ["Monthly", "Stash"]:
+            for module in ["duplicates", "utilities"]:
+                monkeypatch.setattr(
+                    f"photos.{module}.PATH_{name.upper()}",
+                    tmp_path.joinpath(name),
+                )
+        monkeypatch.setattr(
+            "photos.planner.PATH_MONTHLY",
+            tmp_path.joinpath("Monthly"),
+        )
+        uploads = tmp_path.joinpath("uploads")
+        for dir_ in "ab":
+            uploads.joinpath(dir_).mkdir(parents=True)
+            _ = copy(PATH_ASSET, uploads.joinpath(dir_, PATH_ASSET.name))
+        plan = make_plan(uploads, workers=1)
+        assert sorted(plan["action"]) == ["delete", "stash"]
+        (dest,) = plan.loc[plan["action"] == "stash", "destination"]
+        (dup,) = plan.loc[plan["action"] == "delete", "duplicate_of"]
+        assert dup == dest
+        result = apply_plan(plan, root=uploads)
+        assert (result.stashed, result.deleted) == (1, 1)
+        assert list(uploads.iterdir()) == []
+
+
+def test_write_and_read_plan(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("a.jpg")
+    path.touch()
+    plan = _make_plan(_row(path, "stash", tmp_path.joinpath("stash.jpg")))
+    write_plan(plan, file := tmp_path.joinpath("plan.parquet"))
+    assert read_plan(file).equals(plan)
+
+
+def test_diff_plans(tmp_path: Path) -> None:
+    a, b, c = (tmp_path.joinpath(f"{x}.jpg") for x in "abc")
+    for path in [a, b, c]:
+        path.touch()
+    old = _make_plan(_row(a, "stash", a), _row(b, "move", b))
+    new = _make_plan(
+        _row(a, "stash", a),
+        _row(b, "stash", b),
+        _row(c, "delete", None),
+    )
+    diff = diff_plans(old, new)
+    assert diff["path"].tolist() == [b.as_posix(), c.as_posix()]
@@ -0,0 +1,101 @@
+from concurrent.futures import Future
+from pathlib import Path
+from shutil import copy
+from typing import Any
+
+from loguru import logger
+from pytest import MonkeyPatch
+
+from photos.metadata import Metadata
+from photos.prefetch import _MAX_THUMBNAIL_BYTES, Prefetcher, _get_size
+
+PATH_ASSET = Path(__file__).parent.joinpath("assets", "2020-09-25 20.18.18.png")
+
+
+def _copies(tmp_path: Path, n: int, /) -> list[Path]:
+    paths = [tmp_path.joinpath(f"{i}.png") for i in range(n)]
+    for path in paths:
+        _ = copy(PATH_ASSET, path)
+    return paths
+
+
+class TestPrefetcher:
+    def test_get_prefetched(self, tmp_path: Path) -> None:
+        (path,) = _copies(tmp_path, 1)
+        prefetcher = Prefetcher()
+        try:
+            prefetcher.prefetch([path])
+            assert len(prefetcher) == 1
+            metadata = prefetcher.get(path)
+            assert "thumbnail" in metadata.__dict__
+            assert "bytes_" not in metadata.__dict__
+            assert len(prefetcher) == 0
+        finally:
+            prefetcher.close()
+
+    def test_get_not_prefetched(self, tmp_path: Path) -> None:
+        (path,) = _copies(tmp_path, 1)
+        prefetcher = Prefetcher()
+        try:
+            assert prefetcher.get(path).path == path
+        finally:
+            prefetcher.close()
+
+    def test_drops_stale(self, tmp_path: Path) -> None:
+        first, second = _copies(tmp_path, 2)
+        prefetcher = Prefetcher()
+        try:
+            prefetcher.prefetch([first])
+            prefetcher.prefetch([second])
+            assert len(prefetcher) == 1
+        finally:
+            prefetcher.close()
+
+    def test_max_bytes(self, tmp_path: Path) -> None:
+        paths = _copies(tmp_path, 3)
+        prefetcher = Prefetcher(max_bytes=0)
+        try:
+            prefetcher.prefetch(paths)
+            assert len(prefetcher) == 0
+        finally:
+            prefetcher.close()
+
+    def test_bytes_in_use_without_stat(
+        self,
+        tmp_path: Path,
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        paths = _copies(tmp_path, 2)
+        prefetcher = Prefetcher()
+        try:
+            prefetcher.prefetch(paths)
+
+            def stat(*_: Any, **__: Any) -> None:
+                raise AssertionError
+
+            monkeypatch.setattr(Path, "stat", stat)
+            assert prefetcher.bytes_in_use >= 0
+        finally:
+            monkeypatch.undo()
+            prefetcher.close()
+
+    def test_failure_logged(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("a.png")
+        _ = path.write_bytes(b"not a png")
+        messages: list[str] = []
+        handler = logger.add(messages.append, level="ERROR")
+        prefetcher = Prefetcher()
+        try:
+            prefetcher.prefetch([path])
+            assert prefetcher.get(path).path == path
+        finally:
+            prefetcher.close()
+            logger.remove(handler)
+        assert any(str(path) in m for m in messages)
+
+
+def test_get_size_running() -> None:
+    future: Future[Metadata] = Future()
+    assert _get_size(future, 100) == _MAX_THUMBNAIL_BYTES
+    assert future.set_running_or_notify_cancel()
+    assert _get_size(future, 100) == _MAX_THUMBNAIL_BYTES + 100
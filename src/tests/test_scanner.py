@@ -0,0 +1,81 @@
+from pathlib import Path
+
+from pytest import MonkeyPatch
+
+from photos.scanner import is_bad_exif, is_supported, sample, scan
+
+
+def _touch(path: Path, /, *, data: bytes = b"") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _ = path.write_bytes(data)
+    return path
+
+
+class TestScan:
+    def test_supported(self, tmp_path: Path) -> None:
+        expected = {
+            _touch(tmp_path.joinpath("a.jpg")),
+            _touch(tmp_path.joinpath("sub", "sub", "b.png")),
+        }
+        _ = _touch(tmp_path.joinpath("c.txt"))
+        _ = _touch(tmp_path.joinpath(".jpg"))
+        assert {e.path for e in scan(tmp_path)} == expected
+
+    def test_all(self, tmp_path: Path) -> None:
+        paths = {_touch(tmp_path.joinpath(n)) for n in ["a.jpg", "b.txt"]}
+        assert {e.path for e in scan(tmp_path, supported=False)} == paths
+
+    def test_stat(self, tmp_path: Path) -> None:
+        path = _touch(tmp_path.joinpath("a.jpg"), data=b"data")
+        (entry,) = scan(tmp_path)
+        assert entry.size == 4
+        assert entry.mtime_ns == path.stat().st_mtime_ns
+
+    def test_symlinked_dirs_not_followed(self, tmp_path: Path) -> None:
+        _ = _touch(tmp_path.joinpath("dir", "a.jpg"))
+        tmp_path.joinpath("link").symlink_to(tmp_path.joinpath("dir"))
+        assert len(list(scan(tmp_path))) == 1
+
+    def test_missing(self, tmp_path: Path) -> None:
+        assert list(scan(tmp_path.joinpath("missing"))) == []
+
+    def test_bad_exif_relative_root(
+        self,
+        tmp_path: Path,
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        bad = _touch(tmp_path.joinpath("dir", "bad.jpg"))
+        good = _touch(tmp_path.joinpath("dir", "good.jpg"))
+        monkeypatch.setattr("photos.scanner._PATHS_BAD_EXIF", {bad.resolve()})
+        monkeypatch.setattr("photos.scanner._NAMES_BAD_EXIF", {bad.name})
+        monkeypatch.chdir(tmp_path)
+        assert [e.name for e in scan("dir")] == [good.name]
+
+
+class TestIsSupported:
+    def test_main(self) -> None:
+        assert is_supported("a.jpg")
+        assert is_supported(Path("dir", "a.png"))
+        assert not is_supported("a.txt")
+        assert not is_supported(".jpg")
+
+    def test_bad_exif(self, tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+        bad = tmp_path.joinpath("bad.jpg")
+        monkeypatch.setattr("photos.scanner._PATHS_BAD_EXIF", {bad.resolve()})
+        monkeypatch.setattr("photos.scanner._NAMES_BAD_EXIF", {bad.name})
+        monkeypatch.chdir(tmp_path)
+        assert is_bad_exif("bad.jpg")
+        assert not is_supported("bad.jpg")
+        assert not is_bad_exif(tmp_path.joinpath("other", "bad.jpg"))
+
+
+class TestSample:
+    def test_main(self, tmp_path: Path) -> None:
+        paths = {_touch(tmp_path.joinpath(f"{i}.jpg")) for i in range(10)}
+        sampled = [e.path for e in sample(tmp_path, 3)]
+        assert len(sampled) == len(set(sampled)) == 3
+        assert set(sampled) <= paths
+
+    def test_fewer_than_k(self, tmp_path: Path) -> None:
+        path = _touch(tmp_path.joinpath("a.jpg"))
+        assert [e.path for e in sample(tmp_path, 3)] == [path]
@@ -0,0 +1,43 @@
+from pathlib import Path
+from shutil import copy
+
+from photos.stamp import get_datetime_stamp, stamp_datetimes, write_exif_many
+from photos.utilities import (
+    get_parsed_exif_tags,
+    get_raw_exif_tags_pyexiv2,
+    write_exif,
+)
+
+PATH_ASSET = Path(__file__).parent.joinpath("assets", "2020-09-25 20.18.18.png")
+
+
+def test_get_datetime_stamp(tmp_path: Path) -> None:
+    _ = copy(PATH_ASSET, path := tmp_path.joinpath(PATH_ASSET.name))
+    assert get_datetime_stamp(path) == {
+        "Exif.Image.DateTime": "2020:09:25 20:18:18",
+    }
+
+
+def test_stamp_datetimes(tmp_path: Path) -> None:
+    _ = copy(PATH_ASSET, path := tmp_path.joinpath(PATH_ASSET.name))
+    (result,) = stamp_datetimes([path], workers=1)
+    assert result.ok
+    tags = get_raw_exif_tags_pyexiv2(path)
+    assert tags["Exif.Image.DateTime"] == "2020:09:25 20:18:18"
+    assert get_datetime_stamp(path) is None
+
+
+def test_write_exif_many_failure(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("missing.png")
+    (result,) = write_exif_many([(path, {"Exif.Image.Make": "x"})], workers=1)
+    assert not result.ok
+
+
+def test_write_exif(tmp_path: Path) -> None:
+    _ = copy(PATH_ASSET, dest := tmp_path.joinpath("temp.png"))
+    write_exif(
+        dest,
+        {"Exif.Image.Make": "Make", "Exif.Image.Model": "Model"},
+    )
+    tags = get_parsed_exif_tags(dest)
+    assert (tags["Make"], tags["Model"]) == ("Make", "Model")
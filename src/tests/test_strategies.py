@@ -19,7 +19,8 @@ from photos.constants import (
     PATH_GOOGLE_DOWNLOAD,
     PATH_PHOTOS,
 )
-from photos.utilities import is_supported, open_image_pillow
+from photos.scanner import is_supported
+from photos.utilities import open_image_pillow
 
 
 class GetPaths(Task):
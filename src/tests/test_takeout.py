@@ -0,0 +1,118 @@
+import datetime as dt
+import json
+from pathlib import Path
+from shutil import copy
+
+from pytest import MonkeyPatch
+from utilities.datetime import UTC
+
+from photos.metadata import Metadata
+from photos.takeout import TakeoutIndex, parse_sidecar
+from photos.utilities import get_path_monthly
+
+PATH_ASSET = Path(__file__).parent.joinpath("assets", "2020-09-25 20.18.18.png")
+
+_TIMESTAMP = 1_600_000_000
+_DATETIME = dt.datetime.fromtimestamp(_TIMESTAMP, tz=UTC)
+
+
+def _sidecar(path: Path, title: str, /, *, timestamp: int = _TIMESTAMP) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"title": title, "photoTakenTime": {"timestamp": str(timestamp)}}
+    _ = path.write_text(json.dumps(data))
+    return path
+
+
+class TestParseSidecar:
+    def test_main(self, tmp_path: Path) -> None:
+        path = _sidecar(tmp_path.joinpath("a.jpg.json"), "a.jpg")
+        assert parse_sidecar(path) == ("a.jpg", _DATETIME)
+
+    def test_numbered(self, tmp_path: Path) -> None:
+        path = _sidecar(tmp_path.joinpath("a.jpg(1).json"), "a.jpg")
+        assert parse_sidecar(path) == ("a(1).jpg", _DATETIME)
+
+    def test_invalid(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("metadata.json")
+        _ = path.write_text(json.dumps({"title": "Album"}))
+        assert parse_sidecar(path) is None
+
+
+class TestTakeoutIndex:
+    def test_main(self, tmp_path: Path) -> None:
+        _ = _sidecar(tmp_path.joinpath("a.jpg.json"), "a.jpg")
+        index = TakeoutIndex()
+        assert index.get_datetime(tmp_path.joinpath("a.jpg")) == _DATETIME
+        assert index.get_datetime(tmp_path.joinpath("b.jpg")) is None
+        assert len(index) == 1
+
+    def test_edited(self, tmp_path: Path) -> None:
+        _ = _sidecar(tmp_path.joinpath("a.jpg.json"), "a.jpg")
+        path = tmp_path.joinpath("a-edited.jpg")
+        assert TakeoutIndex().get_datetime(path) == _DATETIME
+
+    def test_numbered(self, tmp_path: Path) -> None:
+        _ = _sidecar(tmp_path.joinpath("a.jpg.json"), "a.jpg", timestamp=0)
+        _ = _sidecar(tmp_path.joinpath("a.jpg(1).json"), "a.jpg")
+        path = tmp_path.joinpath("a(1).jpg")
+        assert TakeoutIndex().get_datetime(path) == _DATETIME
+
+    def test_truncated(self, tmp_path: Path) -> None:
+        title = f"{'x' * 60}.jpg"
+        _ = _sidecar(tmp_path.joinpath(f"{'x' * 40}.json"), title)
+        path = tmp_path.joinpath(f"{'x' * 47}.jpg")
+        assert TakeoutIndex().get_datetime(path) == _DATETIME
+
+    def test_truncated_ambiguous(self, tmp_path: Path) -> None:
+        for suffix in ["a", "b"]:
+            title = f"{'x' * 50}{suffix}.jpg"
+            _ = _sidecar(tmp_path.joinpath(f"{suffix}.json"), title)
+        path = tmp_path.joinpath(f"{'x' * 47}.jpg")
+        assert TakeoutIndex().get_datetime(path) is None
+
+    def test_no_sidecars(self, tmp_path: Path) -> None:
+        assert TakeoutIndex().get_datetime(tmp_path.joinpath("a.jpg")) is None
+
+    def test_add_sidecar(self, tmp_path: Path) -> None:
+        data = _sidecar(tmp_path.joinpath("a.jpg.json"), "a.jpg").read_bytes()
+        index = TakeoutIndex(read=False)
+        path = Path("archive.zip", "album", "a.jpg")
+        assert index.get_datetime(path) is None
+        index.add_sidecar(path.with_name("a.jpg.json"), data)
+        assert index.get_datetime(path) == _DATETIME
+
+    def test_no_read(self, tmp_path: Path) -> None:
+        _ = _sidecar(tmp_path.joinpath("a.jpg.json"), "a.jpg")
+        index = TakeoutIndex(read=False)
+        assert index.get_datetime(tmp_path.joinpath("a.jpg")) is None
+        assert len(index) == 0
+
+
+class TestPathMonthly:
+    def test_sidecar_over_exif(
+        self,
+        tmp_path: Path,
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr("photos.utilities.PATH_MONTHLY", tmp_path)
+        _ = _sidecar(tmp_path.joinpath("Album", "a.jpg.json"), "a.jpg")
+        (path := tmp_path.joinpath("Album", "a.jpg")).touch()
+        tags = {"DateTime": _DATETIME.replace(year=2010)}
+        pm = get_path_monthly(path, tags=tags)
+        assert pm is not None
+        assert pm.source == "Takeout"
+        assert pm.datetime == _DATETIME
+
+    def test_auto_destination(
+        self,
+        tmp_path: Path,
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        monthly = tmp_path.joinpath("Monthly")
+        monkeypatch.setattr("photos.utilities.PATH_MONTHLY", monthly)
+        album = tmp_path.joinpath("Album")
+        _ = _sidecar(album.joinpath("a.png.json"), "a.png")
+        _ = copy(PATH_ASSET, path := album.joinpath("a.png"))
+        dest = Metadata(path).auto_destination
+        assert dest.relative_to(monthly)
+        assert dest.parent.name == _DATETIME.strftime("%Y-%m")
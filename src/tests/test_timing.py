@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+
+from photos.timing import TIMINGS, Histogram, Timings, timed, timer
+
+
+class TestHistogram:
+    def test_main(self) -> None:
+        histogram = Histogram()
+        for ns in [1, 2, 3, 1000]:
+            histogram.add(ns)
+        assert histogram.count == 4
+        assert histogram.total == 1006
+        assert histogram.maximum == 1000
+        assert histogram.quantile(0.5) == 4
+        assert histogram.quantile(1.0) == 1000
+
+    def test_empty(self) -> None:
+        histogram = Histogram()
+        assert histogram.mean == 0.0
+        assert histogram.quantile(0.5) == 0
+
+    def test_merge(self) -> None:
+        histogram, other = Histogram(), Histogram()
+        histogram.add(1)
+        other.add(1000)
+        histogram.merge(other)
+        assert histogram.count == 2
+        assert histogram.total == 1001
+        assert histogram.maximum == 1000
+        assert histogram.quantile(1.0) == 1000
+
+
+class TestTimings:
+    def test_summary_and_dump(self, tmp_path: Path) -> None:
+        timings = Timings()
+        timings.add("stage", 1_000_000)
+        assert "stage" in timings.summary()
+        timings.dump(path := tmp_path.joinpath("timings.json"))
+        data = json.loads(path.read_text())
+        assert data["stage"]["count"] == 1
+
+    def test_clear(self) -> None:
+        timings = Timings()
+        timings.add("stage", 1)
+        timings.clear()
+        assert len(timings) == 0
+
+    def test_take_and_merge(self) -> None:
+        worker, timings = Timings(), Timings()
+        worker.add("stage", 1)
+        timings.add("stage", 2)
+        taken = worker.take()
+        assert len(worker) == 0
+        timings.merge(taken)
+        timings.merge(taken)
+        assert timings["stage"].count == 3
+        assert timings["stage"].total == 4
+
+
+def test_timer_and_timed() -> None:
+    TIMINGS.clear()
+
+    @timed("timed")
+    def func(x: int, /) -> int:
+        return x + 1
+
+    assert func(1) == 2
+    with timer("timer"):
+        pass
+    assert TIMINGS["timed"].count == TIMINGS["timer"].count == 1
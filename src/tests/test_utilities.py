@@ -1,5 +1,4 @@
 import datetime as dt
-from datetime.timezone import utc
 from itertools import chain
 from pathlib import Path
 from re import search
@@ -11,6 +10,7 @@ from hypothesis.strategies import datetimes
 from PIL.Image import Image
 from pytest import mark
 from tabulate import tabulate
+from utilities.datetime import UTC
 from utilities.hypothesis import assume_does_not_raise, temp_dirs
 from utilities.tempfile import TemporaryDirectory, gettempdir
 
@@ -20,8 +20,10 @@ from photos.constants import (
     PATH_MONTHLY,
     PATH_STASH,
 )
+from photos.takeout import TakeoutIndex
 from photos.utilities import (
     PathMonthly,
+    compute_path_monthly,
     get_file_size,
     get_parsed_exif_tags,
     get_parsed_exif_tags_pillow,
@@ -34,10 +36,16 @@ from photos.utilities import (
     is_hex,
     is_instance,
     open_image_pillow,
+    parse_exif_tags_pyexiv2,
+    purge_empty_directories,
+    purge_empty_parents,
     write_datetime,
 )
+from tests.synthetic import PROFILES, get_raw_tags_pyexiv2
 from tests.test_strategies import images, paths
 
+PATH_ASSET = Path(__file__).parent.joinpath("assets", "2020-09-25 20.18.18.png")
+
 
 @given(path=paths())
 def test_get_file_sizes(path: Path) -> None:
@@ -93,7 +101,7 @@ class TestGetPathMonthly:
         assert result is not None
         expected = PathMonthly(
             path,
-            dt.datetime(2000, 1, 1, 12, 34, 56).astimezone(utc),
+            dt.datetime(2000, 1, 1, 12, 34, 56).astimezone(UTC),
             "filename",
         )
         assert result == expected
@@ -102,6 +110,27 @@ class TestGetPathMonthly:
             "2000-01-01 12:34:56.txt",
         )
 
+    def test_png_created(self) -> None:
+        path = Path("2000-01-01 12:34:56.png")
+        created = dt.datetime(2020, 1, 2, 3, 4, 5, tzinfo=UTC)
+        takeout = TakeoutIndex(read=False)
+        result = compute_path_monthly(
+            path,
+            tags={},
+            created=created,
+            takeout=takeout,
+        )
+        assert result == PathMonthly(path, created, "PNG")
+        tags = {"DateTime": created.replace(year=2021)}
+        result = compute_path_monthly(
+            path,
+            tags=tags,
+            created=created,
+            takeout=takeout,
+        )
+        assert result is not None
+        assert result.source == "EXIF"
+
 
 @given(path=paths())
 def test_get_path_stash(path: Path) -> None:
@@ -129,7 +158,15 @@ def test_get_resolution(image: Image) -> None:
         _ = get_resolution(image)
 
 
-@mark.parametrize(("text", "expected"), [("0xc6d2", True), ("GPSTag", False)])
+@mark.parametrize(
+    ("text", "expected"),
+    [
+        ("0xc6d2", True),
+        ("GPSTag", False),
+        ("Exif.Canon.0x0019", True),
+        ("Exif.Image.GPSTag", False),
+    ],
+)
 def test_is_hex(text: str, expected: bool) -> None:
     assert is_hex(text) is expected
 
@@ -154,6 +191,44 @@ def test_open_image(path: Path) -> None:
         _ = open_image_pillow(path)
 
 
+@mark.parametrize("profile", PROFILES)
+def test_parse_exif_tags_pyexiv2(profile: str) -> None:
+    tags = parse_exif_tags_pyexiv2(get_raw_tags_pyexiv2(profile))
+    for key, value in tags.items():
+        assert not is_hex(key), f"Hex key: {key}"
+        assert key in EXIF_TAGS_PYEXVI2
+        assert is_instance(value, EXIF_TAGS_PYEXVI2[key])
+
+
+def test_purge_empty_directories(tmp_path: Path) -> None:
+    tmp_path.joinpath("a", "b", "c").mkdir(parents=True)
+    tmp_path.joinpath("d", "e").mkdir(parents=True)
+    tmp_path.joinpath("d", "f.jpg").touch()
+    purge_empty_directories(tmp_path)
+    assert tmp_path.exists()
+    assert not tmp_path.joinpath("a").exists()
+    assert not tmp_path.joinpath("d", "e").exists()
+    assert tmp_path.joinpath("d", "f.jpg").exists()
+
+
+def test_purge_empty_parents(tmp_path: Path) -> None:
+    tmp_path.joinpath("a", "b", "c").mkdir(parents=True)
+    tmp_path.joinpath("a", "d.jpg").touch()
+    tmp_path.joinpath("e").mkdir()
+    purge_empty_parents([tmp_path.joinpath("a", "b", "c")], root=tmp_path)
+    assert not tmp_path.joinpath("a", "b").exists()
+    assert tmp_path.joinpath("a", "d.jpg").exists()
+    assert tmp_path.joinpath("e").exists()
+
+
+def test_purge_empty_parents_keeps_root(tmp_path: Path) -> None:
+    root = tmp_path.joinpath("root")
+    root.joinpath("a").mkdir(parents=True)
+    purge_empty_parents([root.joinpath("a")], root=root)
+    assert root.exists()
+    assert not root.joinpath("a").exists()
+
+
 @given(
     temp_dir=temp_dirs(),
     datetime=datetimes().filter(lambda x: x.microsecond == 0),
@@ -162,9 +237,7 @@ def test_write_datetime(
     temp_dir: TemporaryDirectory,
     datetime: dt.datetime,
 ) -> None:
-    repo = Repo(".", search_parent_directories=True)
-    assert (root := repo.working_tree_dir) is not None
-    src = Path(root, "src", "tests", "assets", "2020-09-25 20.18.18.png")
+    src = PATH_ASSET
     dest = temp_dir.name.joinpath("temp")
     copy(src, dest)
     tags1 = get_parsed_exif_tags(open_image_pillow(dest))
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+from pytest import raises
+
+from photos.work_queue import EmptyWorkQueueError, WorkQueue
+
+
+def _touch(path: Path, /) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return path
+
+
+class TestWorkQueue:
+    def test_pop(self, tmp_path: Path) -> None:
+        expected = {
+            _touch(tmp_path.joinpath("a.jpg")),
+            _touch(tmp_path.joinpath("sub", "b.png")),
+        }
+        _ = _touch(tmp_path.joinpath("c.txt"))
+        queue = WorkQueue(tmp_path)
+        assert len(queue) == 2
+        assert {queue.pop(), queue.pop()} == expected
+        with raises(EmptyWorkQueueError):
+            _ = queue.pop()
+
+    def test_exclude(self, tmp_path: Path) -> None:
+        path = _touch(tmp_path.joinpath("a.jpg"))
+        queue = WorkQueue(tmp_path, exclude={path})
+        with raises(EmptyWorkQueueError):
+            _ = queue.pop()
+
+    def test_new_files_found(self, tmp_path: Path) -> None:
+        _ = _touch(tmp_path.joinpath("a.jpg"))
+        queue = WorkQueue(tmp_path)
+        _ = queue.pop()
+        new = _touch(tmp_path.joinpath("sub", "b.jpg"))
+        assert queue.pop() == new
+
+    def test_discarded_files_skipped(self, tmp_path: Path) -> None:
+        path = _touch(tmp_path.joinpath("a.jpg"))
+        queue = WorkQueue(tmp_path)
+        path.unlink()
+        queue.discard(path)
+        with raises(EmptyWorkQueueError):
+            _ = queue.pop()
+
+    def test_peek(self, tmp_path: Path) -> None:
+        for name in ["a.jpg", "b.jpg", "c.jpg"]:
+            _ = _touch(tmp_path.joinpath(name))
+        queue = WorkQueue(tmp_path)
+        peeked = queue.peek(2)
+        assert len(peeked) == 2
+        assert len(queue) == 3
+        assert [queue.pop(), queue.pop()] == peeked
+        assert queue.peek(0) == []
+
+    def test_iter(self, tmp_path: Path) -> None:
+        expected = {_touch(tmp_path.joinpath(f"{x}.jpg")) for x in "abc"}
+        queue = WorkQueue(tmp_path)
+        assert set(queue) == expected
+        assert len(queue) == 0